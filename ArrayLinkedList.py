@@ -0,0 +1,258 @@
+#!/usr/bin/python
+
+'''
+File: ArrayLinkedList.py
+Author: Nicholas Russo
+Description: This class is a singly linked list with the same API as
+LinkedList, but without node objects. Nodes live in a pool of two
+parallel array.array columns, one for the data and one for the index of
+the next node (NIL at the end), so each node costs 16 bytes instead of
+a Python object plus its boxed value. Removed slots are chained into a
+free list and reused by the next insertion. Data must fit the typecode
+given to the constructor ("q", int64, by default). Where LinkedList
+hands out Node objects, this class uses slot indices; append, prepend
+and insert accept either a value or a Node, whose data is copied.
+Reading an array element boxes it into a new int, so in CPython a
+traversal is slower than following Node references; the pool trades
+that for a fraction of the memory. Run this file to compare the two.
+'''
+
+import sys
+import time
+import tracemalloc
+from array import array
+
+from LinkedList import LinkedList, Node
+
+class ArrayLinkedList:
+
+    # Index meaning "no node", as None does in LinkedList
+    NIL = -1
+
+    def __init__(self, *datalist, typecode="q"):
+        self.typecode = typecode
+        self.data = array( typecode )
+        self.next = array( "q" )
+        self.free = ArrayLinkedList.NIL
+        self.head = ArrayLinkedList.NIL
+        self.tail = ArrayLinkedList.NIL
+        self.size = 0
+
+        # Sanity check; stop processing on empty input
+        if( datalist == None or len(datalist) == 0 ):
+            return
+
+        # Bulk load: slot i links to slot i + 1
+        values = [d.data if isinstance( d, Node ) else d for d in datalist]
+        n = len( values )
+        self.data.extend( values )
+        self.next.extend( range( 1, n + 1 ) )
+        self.next[n - 1] = ArrayLinkedList.NIL
+        self.head = 0
+        self.tail = n - 1
+        self.size = n
+
+    def clone(self):
+        return ArrayLinkedList( *self.make_list(), typecode=self.typecode )
+
+    def __str__(self):
+        result = " ".join( str( d ) for d in self.make_list() )
+        result += " (h={0} t={1} n={2})".format(self.get_data( self.head ), self.get_data( self.tail ), self.size)
+        return result
+
+    def __len__(self):
+        return self.size
+
+    def __add__(self, other):
+        # Append other to the end of self, copying its values
+        if( other == None ):
+            return None
+
+        for d in other.make_list():
+            self.append( d )
+        return self
+
+    '''
+    Return the data held by a slot index, or None for NIL.
+    '''
+    def get_data(self, i):
+        if( i == ArrayLinkedList.NIL ):
+            return None
+        return self.data[i]
+
+    '''
+    Return the slot index following slot i, or NIL.
+    '''
+    def get_next(self, i):
+        return self.next[i]
+
+    def get_head(self):
+        return self.head
+
+    def get_tail(self):
+        return self.tail
+
+    '''
+    Take a slot for value "d" linked to "nxt": the head of the free list
+    if there is one, otherwise a new slot at the end of the pool.
+    '''
+    def _allocate(self, d, nxt):
+        if( isinstance( d, Node ) ):
+            d = d.data
+
+        i = self.free
+        if( i == ArrayLinkedList.NIL ):
+            i = len( self.data )
+            self.data.append( d )
+            self.next.append( nxt )
+        else:
+            self.free = self.next[i]
+            self.data[i] = d
+            self.next[i] = nxt
+        return i
+
+    '''
+    Return slot i to the free list.
+    '''
+    def _release(self, i):
+        self.next[i] = self.free
+        self.free = i
+
+    def append(self, n):
+        i = self._allocate( n, ArrayLinkedList.NIL )
+        if( self.tail == ArrayLinkedList.NIL ):
+            self.head = i
+        else:
+            self.next[self.tail] = i
+        self.tail = i
+        self.size += 1
+        return self.size
+
+    def prepend(self, n):
+        i = self._allocate( n, self.head )
+        self.head = i
+        if( self.tail == ArrayLinkedList.NIL ):
+            self.tail = i
+        self.size += 1
+        return self.size
+
+    '''
+    Same placement as LinkedList.insert: the new node follows the node
+    reached after i steps from the head.
+    '''
+    def insert(self, n, i):
+        if( i < 0 ):
+            return self.prepend( n )
+        elif( i >= self.size ):
+            return self.append( n )
+
+        nxt = self.next
+        cur = self.head
+        j = 0
+        while j < i:
+            j += 1
+            cur = nxt[cur]
+
+        new = self._allocate( n, nxt[cur] )
+        nxt[cur] = new
+        if( cur == self.tail ):
+            self.tail = new
+        self.size += 1
+        return self.size
+
+    '''
+    Remove the first node holding d. Returns the new size, or -1 if no
+    node holds d. The slot is reused by a later insertion.
+    '''
+    def remove(self, d):
+        data = self.data
+        nxt = self.next
+        prev = ArrayLinkedList.NIL
+        cur = self.head
+
+        while cur != ArrayLinkedList.NIL:
+            if( data[cur] == d ):
+                if( prev == ArrayLinkedList.NIL ):
+                    self.head = nxt[cur]
+                else:
+                    nxt[prev] = nxt[cur]
+                if( cur == self.tail ):
+                    self.tail = prev
+                self._release( cur )
+                self.size -= 1
+                return self.size
+
+            prev = cur
+            cur = nxt[cur]
+
+        return -1
+
+    def find_data(self, d):
+        data = self.data
+        nxt = self.next
+        cur = self.head
+        i = 0
+        while cur != ArrayLinkedList.NIL:
+            if ( data[cur] == d ):
+                return i
+            i += 1
+            cur = nxt[cur]
+        return -1
+
+    def make_list(self):
+        result = list()
+        append = result.append
+        data = self.data
+        nxt = self.next
+        cur = self.head
+        while cur != ArrayLinkedList.NIL:
+            append( data[cur] )
+            cur = nxt[cur]
+        return result
+
+    def make_tuple(self):
+        return tuple( self.make_list() )
+
+    def make_set(self):
+        return set( self.make_list() )
+
+'''
+Measure the memory per element and the time of a full traversal
+(find_data for a missing value) of a list of n integers built by
+"factory".
+'''
+def measure( factory, n ):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    lst = factory( n )
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    lst.find_data( -1 )
+    elapsed = time.perf_counter() - start
+    return used / n, elapsed
+
+def main():
+    al = ArrayLinkedList(1,4,2,6,5)
+    print(al)
+
+    al.append(Node(9))
+    al.prepend(-55)
+    al.insert(3,3)
+    print(al)
+
+    print( al.remove(-55), al.remove(9), al.remove(3) )
+    al.append(7)
+    print(al, len( al.data ), "slots")
+
+    # Compare against the node-based list
+    n = int( sys.argv[1] ) if len( sys.argv ) > 1 else 1000000
+    for name, factory in (
+            ( "LinkedList", lambda n: LinkedList( *range( 1000, n + 1000 ) ) ),
+            ( "ArrayLinkedList", lambda n: ArrayLinkedList( *range( 1000, n + 1000 ) ) )):
+        per_element, elapsed = measure( factory, n )
+        print( "{0}: {1:.1f} bytes/element, traversal {2:.1f} ms".format( name, per_element, elapsed * 1000 ) )
+
+if __name__ == "__main__":
+    main()
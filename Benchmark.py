@@ -0,0 +1,194 @@
+#!/usr/bin/python
+
+'''
+File: Benchmark.py
+Author: Nicholas Russo
+Description: This class measures a single piece of work repeatedly
+using the high resolution perf_counter_ns() clock. Each measurement
+starts with untimed warm-up runs, then repeats the timed run until the
+95% confidence interval of the mean is within the requested relative
+width (or a repeat/time budget runs out). Work too short to time on its
+own can be run several times per sample, so that every sample lasts at
+least a minimum time and the clock's resolution and jitter are spread
+over many runs. Garbage collection can be disabled while timing so that
+collector pauses do not land in random samples. The resulting Stats
+object summarizes the samples.
+'''
+
+import gc
+import math
+import sys
+import time
+
+class Benchmark:
+
+    # z-score used for the 95% confidence interval of the mean
+    Z95 = 1.96
+
+    # Most runs batched into one sample by min_sample_time, and the most
+    #  memory (by sys.getsizeof()) the prepared arguments of a batch may use
+    MAX_LOOPS = 1000000
+    MAX_BATCH_BYTES = 64 * 1024 * 1024
+
+    '''
+    Constructor stores the measurement policy. "confidence" is the
+    target half-width of the 95% confidence interval relative to the
+    mean, so 0.02 asks for the mean to be known within +/- 2%.
+    "max_time" bounds the timed phase in seconds so that slow algorithms
+    on big inputs still terminate after min_repeats samples. With a
+    "min_sample_time" (seconds), runs are batched so that each sample
+    takes at least that long, and the sample is the mean of its runs.
+    '''
+    def __init__(self, warmup=3, min_repeats=5, max_repeats=1000,
+        confidence=0.02, max_time=2.0, disable_gc=True, min_sample_time=0.0):
+
+        if( min_repeats < 2 or max_repeats < min_repeats ):
+            raise ValueError( "need 2 <= min_repeats <= max_repeats: {0}, {1}".format(
+                min_repeats, max_repeats ) )
+
+        self.warmup = warmup
+        self.min_repeats = min_repeats
+        self.max_repeats = max_repeats
+        self.confidence = confidence
+        self.max_time = max_time
+        self.disable_gc = disable_gc
+        self.min_sample_time = min_sample_time
+
+    '''
+    Measure "func". Before every run (warm-up or timed), setup() is
+    called outside of the timer to produce the argument passed to func;
+    this lets in-place algorithms receive a fresh copy each time. When
+    runs are batched, the arguments of a whole batch are prepared before
+    its timer starts.
+    Returns a tuple of (last result, Stats).
+    '''
+    def measure(self, func, setup):
+        clock = time.perf_counter_ns
+        result = None
+
+        for i in range( self.warmup ):
+            result = func( setup() )
+        loops = self._loops( func, setup ) if self.min_sample_time > 0 else 1
+
+        gc_was_enabled = gc.isenabled()
+        if( self.disable_gc ):
+            gc.collect()
+            gc.disable()
+
+        samples = list()
+        deadline = clock() + int( self.max_time * 1e9 )
+        try:
+            while len( samples ) < self.max_repeats:
+                if( loops == 1 ):
+                    arg = setup()
+                    start = clock()
+                    result = func( arg )
+                    end = clock()
+                    samples.append( end - start )
+                else:
+                    args = [setup() for i in range( loops )]
+                    start = clock()
+                    for arg in args:
+                        result = func( arg )
+                    end = clock()
+                    samples.append( ( end - start ) / loops )
+
+                # Stop once enough samples exist and either the interval
+                #  is tight enough or the time budget is exhausted
+                if( len( samples ) >= self.min_repeats ):
+                    if( end > deadline or Stats.relative_ci( samples ) <= self.confidence ):
+                        break
+        finally:
+            if( self.disable_gc and gc_was_enabled ):
+                gc.enable()
+
+        return result, Stats( samples )
+
+    '''
+    Return how many runs of func make a sample of at least
+    min_sample_time, by timing growing batches (which also warms up).
+    Batches stop growing once their arguments would exceed
+    MAX_BATCH_BYTES, so fast work on big inputs gets shorter samples.
+    '''
+    def _loops(self, func, setup):
+        target = self.min_sample_time * 1e9
+        limit = min( Benchmark.MAX_LOOPS, max( 1, Benchmark.MAX_BATCH_BYTES // sys.getsizeof( setup() ) ) )
+        loops = 1
+        while( loops < limit ):
+            args = [setup() for i in range( loops )]
+            start = time.perf_counter_ns()
+            for arg in args:
+                func( arg )
+            elapsed = time.perf_counter_ns() - start
+            if( elapsed >= target ):
+                break
+
+            # Aim a little past the target; at least double each time
+            grow = 2 if elapsed == 0 else math.ceil( 1.2 * target / elapsed )
+            loops = min( limit, loops * max( 2, grow ) )
+        return loops
+
+'''
+Summary of a list of timing samples in nanoseconds. All attributes
+are in nanoseconds except "relative_error", which is the half-width of
+the 95% confidence interval of the mean divided by the mean.
+'''
+class Stats:
+
+    def __init__(self, samples):
+        if( len( samples ) == 0 ):
+            raise ValueError( "no samples to summarize" )
+
+        ordered = sorted( samples )
+        self.samples = ordered
+        self.count = len( ordered )
+        self.min = ordered[0]
+        self.max = ordered[-1]
+        self.mean = sum( ordered ) / self.count
+        self.median = Stats.percentile( ordered, 50 )
+        self.p95 = Stats.percentile( ordered, 95 )
+        self.p99 = Stats.percentile( ordered, 99 )
+        self.stddev = Stats.stddev_of( ordered, self.mean )
+        self.relative_error = Stats.relative_ci( ordered )
+
+    '''
+    Linear-interpolated percentile of an already sorted list.
+    '''
+    @staticmethod
+    def percentile( ordered, pct ):
+        if( len( ordered ) == 1 ):
+            return ordered[0]
+        rank = ( len( ordered ) - 1 ) * pct / 100
+        low = int( rank )
+        high = min( low + 1, len( ordered ) - 1 )
+        return ordered[low] + ( ordered[high] - ordered[low] ) * ( rank - low )
+
+    '''
+    Sample standard deviation (n-1 denominator).
+    '''
+    @staticmethod
+    def stddev_of( samples, mean ):
+        if( len( samples ) < 2 ):
+            return 0.0
+        total = sum( ( s - mean ) ** 2 for s in samples )
+        return math.sqrt( total / ( len( samples ) - 1 ) )
+
+    '''
+    Half-width of the 95% confidence interval of the mean, relative
+    to the mean. Used by Benchmark.measure() as its stopping rule.
+    '''
+    @staticmethod
+    def relative_ci( samples ):
+        n = len( samples )
+        mean = sum( samples ) / n
+        if( n < 2 or mean == 0 ):
+            return 0.0
+        return Benchmark.Z95 * Stats.stddev_of( samples, mean ) / math.sqrt( n ) / mean
+
+    '''
+    Return a one-line summary in microseconds.
+    '''
+    def __str__(self):
+        return "min {0:.3f} med {1:.3f} p95 {2:.3f} p99 {3:.3f} sd {4:.3f} us (n={5}, ci +/-{6:.1f}%)".format(
+            self.min / 1000, self.median / 1000, self.p95 / 1000, self.p99 / 1000,
+            self.stddev / 1000, self.count, self.relative_error * 100 )
@@ -0,0 +1,297 @@
+#!/usr/bin/python
+
+'''
+File: ExternalSort.py
+Author: Nicholas Russo
+Description: This class sorts integer data larger than memory. Values
+are read in chunks sized by the memory budget, each chunk is sorted in
+memory with a configurable algorithm (any Sort work method) and spilled
+as a run of raw native int64 values to a temporary file. Runs are then
+combined by a k-way heap merge reading every run through a fixed-size
+buffer; with more runs than the fan-in, groups of runs are first merged
+into longer runs, pass after pass. Input that fits in one chunk never
+touches the disk. Bytes written and read and the time spent in each
+phase (excluding time the consumer holds the output) are accumulated
+and shown by report(). Values must fit in int64.
+
+An ExternalSort object is also a work method: Sort(path, ExternalSort())
+sorts every job externally. Each call starts from zeroed counters, so
+Worker shows the report of every test next to its timings.
+'''
+
+import heapq
+import itertools
+import os
+import tempfile
+import time
+from array import array
+
+from Worker import Worker
+
+class ExternalSort:
+
+    # Approximate bytes held per value of a chunk: a list slot plus an int
+    BYTES_PER_VALUE = 40
+    ITEM_SIZE = array( "q" ).itemsize
+
+    # Bytes read from text input at a time
+    TEXT_CHUNK = 1024 * 1024
+
+    INT64_MIN = -2**63
+    INT64_MAX = 2**63 - 1
+
+    '''
+    "sort_method" sorts a list in place or returns it sorted; None means
+    list.sort(). "memory_budget" (bytes) bounds the chunk size and the
+    merge buffers, "fan_in" is the number of runs merged at once, and
+    runs are written to "temp_dir" (the system default if None).
+    '''
+    def __init__(self, sort_method=None, memory_budget=64 * 1024 * 1024, fan_in=16, temp_dir=None):
+        self.sort_method = sort_method
+        self.memory_budget = memory_budget
+        self.fan_in = max( 2, fan_in )
+        self.temp_dir = temp_dir
+        self.__name__ = "external_sort({0})".format( getattr( sort_method, "__name__", "list.sort" ) )
+        self.reset()
+
+    '''
+    Zero the I/O and phase counters.
+    '''
+    def reset(self):
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.runs = 0
+        self.merge_passes = 0
+        self.run_time = 0
+        self.sort_time = 0
+        self.merge_time = 0
+
+    '''
+    Number of values sorted in memory at a time.
+    '''
+    def chunk_values(self):
+        return max( 1, self.memory_budget // ExternalSort.BYTES_PER_VALUE )
+
+    '''
+    Bytes of read buffer given to each run during a merge, so that all
+    fan_in buffers plus the output buffer fit in the memory budget.
+    '''
+    def buffer_bytes(self):
+        size = self.memory_budget // ( 2 * ( self.fan_in + 1 ) )
+        return max( ExternalSort.ITEM_SIZE, size - size % ExternalSort.ITEM_SIZE )
+
+    '''
+    Work method form: sort one job and return it as a list. The counters
+    are reset first, so report() describes this job only. Raises
+    ValueError for values outside int64 (see sort_iter()).
+    '''
+    def __call__(self, array):
+        self.reset()
+        return list( self.sort_iter( array ) )
+
+    '''
+    Yield the values of any iterable of ints in ascending order. Only
+    one chunk, or the merge buffers, are held in memory at a time. Each
+    chunk is checked for values outside int64 before it is sorted
+    (raising ValueError); an input which fits in one chunk, even
+    exactly, is sorted in memory and never spilled.
+    '''
+    def sort_iter(self, values):
+        paths = list()
+        try:
+            start = time.perf_counter()
+            last = None
+            for chunk, final in self._chunks( values ):
+                ExternalSort._check_range( chunk )
+                last = self._sort_chunk( chunk )
+                if( len( paths ) > 0 or not final ):
+                    paths.append( self._spill( last ) )
+                    last = None
+            self.run_time += time.perf_counter() - start
+
+            # Everything fit in a single chunk (or there was nothing)
+            if( not paths ):
+                yield from last or ()
+                return
+
+            start = time.perf_counter()
+            while( len( paths ) > self.fan_in ):
+                paths = self._merge_pass( paths )
+            self.merge_passes += 1
+            merged = heapq.merge( *[self._read_run( p ) for p in paths] )
+            self.merge_time += time.perf_counter() - start
+
+            # Merge into an output buffer and hand it over untimed, so the
+            #  consumer's time between values is not charged to the merge
+            limit = self.buffer_bytes() // ExternalSort.ITEM_SIZE
+            while True:
+                start = time.perf_counter()
+                block = array( "q", itertools.islice( merged, limit ) )
+                self.merge_time += time.perf_counter() - start
+                if( not block ):
+                    break
+                yield from block
+        finally:
+            for path in paths:
+                if( os.path.exists( path ) ):
+                    os.remove( path )
+
+    '''
+    Sort "values" into the raw int64 file "out_path" with buffered
+    writes. Returns the number of values written.
+    '''
+    def sort_to_file(self, values, out_path):
+        count = 0
+        buffer = array( "q" )
+        limit = self.buffer_bytes() // ExternalSort.ITEM_SIZE
+        with open( out_path, "wb" ) as handle:
+            for value in self.sort_iter( values ):
+                buffer.append( value )
+                if( len( buffer ) >= limit ):
+                    count += self._flush( buffer, handle )
+            count += self._flush( buffer, handle )
+        return count
+
+    '''
+    Yield the whitespace separated ints of a text file, read TEXT_CHUNK
+    bytes at a time, so a single row larger than memory can be sorted.
+    '''
+    @staticmethod
+    def iter_text_values( path ):
+        tail = b""
+        with open( path, "rb" ) as handle:
+            while True:
+                block = handle.read( ExternalSort.TEXT_CHUNK )
+                if( not block ):
+                    break
+                block = tail + block
+                tokens = block.split()
+
+                # A block which ends inside a number keeps it for the next one
+                tail = tokens.pop() if tokens and not block[-1:].isspace() else b""
+                yield from map( int, tokens )
+        if( tail ):
+            yield int( tail )
+
+    '''
+    Yield the values of a raw int64 file, such as sort_to_file() output.
+    '''
+    @staticmethod
+    def iter_binary_values( path, buffer_bytes=1024 * 1024 ):
+        with open( path, "rb" ) as handle:
+            while True:
+                data = handle.read( buffer_bytes )
+                if( not data ):
+                    break
+                values = array( "q" )
+                values.frombytes( data )
+                yield from values
+
+    '''
+    Summary of the I/O and phase times since the last reset().
+    '''
+    def report(self):
+        return "External sort: {0} runs, {1} merge passes, {2} bytes written, {3} bytes read\n".format(
+            self.runs, self.merge_passes, self.bytes_written, self.bytes_read ) + \
+            "  run phase {0} us (sorting {1} us), merge phase {2} us".format(
+            self.run_time * Worker.MICRO, self.sort_time * Worker.MICRO, self.merge_time * Worker.MICRO )
+
+    '''
+    Raise ValueError if a sequence holds a value outside int64, which
+    could not be written to a run.
+    '''
+    @staticmethod
+    def _check_range( values ):
+        if( len( values ) == 0 ):
+            return
+        low, high = min( values ), max( values )
+        if( low < ExternalSort.INT64_MIN or high > ExternalSort.INT64_MAX ):
+            raise ValueError( "values must fit in int64: {0}..{1}".format( low, high ) )
+
+    '''
+    Yield (chunk, final) for lists of up to chunk_values() values, where
+    "final" is True for the last one. A full chunk is only handed over
+    once the value after it has been read, so an input of exactly one
+    chunk is known to be final.
+    '''
+    def _chunks(self, values):
+        size = self.chunk_values()
+        chunk = list()
+        for value in values:
+            if( len( chunk ) == size ):
+                yield chunk, False
+                chunk = list()
+            chunk.append( value )
+        if( chunk ):
+            yield chunk, True
+
+    def _sort_chunk(self, chunk):
+        start = time.perf_counter()
+        if( self.sort_method is None ):
+            chunk.sort()
+        else:
+            chunk = self.sort_method( chunk ) or chunk
+        self.sort_time += time.perf_counter() - start
+        return chunk
+
+    '''
+    Write one sorted run to a new temporary file and return its path.
+    '''
+    def _spill(self, run):
+        handle, path = tempfile.mkstemp( suffix=".run", dir=self.temp_dir )
+        with os.fdopen( handle, "wb" ) as out:
+            self._flush( array( "q", run ), out )
+        self.runs += 1
+        return path
+
+    '''
+    Yield the values of a run through a buffer_bytes() read buffer.
+    '''
+    def _read_run(self, path):
+        buffer_bytes = self.buffer_bytes()
+        with open( path, "rb" ) as handle:
+            while True:
+                data = handle.read( buffer_bytes )
+                if( not data ):
+                    break
+                self.bytes_read += len( data )
+                values = array( "q" )
+                values.frombytes( data )
+                yield from values
+
+    '''
+    Merge groups of fan_in runs into longer runs. The merged runs are
+    deleted; returns the paths of the new ones.
+    '''
+    def _merge_pass(self, paths):
+        merged = list()
+        limit = self.buffer_bytes() // ExternalSort.ITEM_SIZE
+        for g in range( 0, len( paths ), self.fan_in ):
+            group = paths[g:g + self.fan_in]
+            handle, path = tempfile.mkstemp( suffix=".run", dir=self.temp_dir )
+            merged.append( path )
+
+            buffer = array( "q" )
+            with os.fdopen( handle, "wb" ) as out:
+                for value in heapq.merge( *[self._read_run( p ) for p in group] ):
+                    buffer.append( value )
+                    if( len( buffer ) >= limit ):
+                        self._flush( buffer, out )
+                self._flush( buffer, out )
+
+            for p in group:
+                os.remove( p )
+            self.runs += 1
+        self.merge_passes += 1
+        return merged
+
+    '''
+    Write and empty an array buffer, counting the bytes. Returns the
+    number of values written.
+    '''
+    def _flush(self, buffer, handle):
+        count = len( buffer )
+        buffer.tofile( handle )
+        self.bytes_written += count * ExternalSort.ITEM_SIZE
+        del buffer[:]
+        return count
@@ -0,0 +1,264 @@
+#!/usr/bin/python
+
+'''
+File: Graph.py
+Author: Nicholas Russo
+Description: This class extends Worker by adding a source vertex used
+by the graph traversals. Jobs are adjacency matrices read from a
+GRAPH_MATRIX input file, each held as a DenseGraph or SparseGraph
+(see GraphData.py) according to its edge density. It defines several
+static methods which can be passed to the constructor for execution
+during a test series. Every method takes (graph, source); the all-pairs
+and whole-graph methods ignore the source. Unreachable vertices are
+reported with distance -1.
+'''
+
+import heapq
+from collections import deque
+
+from GraphBackend import GraphBackend
+from Heap import DaryHeap
+from Worker import Worker
+from Trace import Trace
+eprint = Worker.eprint
+
+@Trace.traceable
+class Graph(Worker):
+
+    # Distance placeholder for unreachable vertices inside the algorithms
+    INFINITY = float( "inf" )
+
+    '''
+    Breadth-first search from the source. Returns the number of edges on
+    the shortest path to every vertex, or -1 where there is no path.
+    Characteristics:
+        time complexity: O(V + E) sparse, O(V^2) dense
+        space complexity: O(V)
+    '''
+    @staticmethod
+    @Worker.register
+    def bfs( graph, source ):
+        hops = [-1] * len( graph )
+        hops[source] = 0
+        queue = deque( [source] )
+        while queue:
+            u = queue.popleft()
+            for v, w in graph.neighbors( u ):
+                if( hops[v] == -1 ):
+                    hops[v] = hops[u] + 1
+                    queue.append( v )
+        eprint("bfs from {0}: {1}".format(source, hops), level=Trace.VERBOSE)
+        return hops
+
+    '''
+    Depth-first search from the source with an explicit stack, so deep
+    graphs cannot exhaust the recursion limit. Returns the vertices in
+    the order they were first visited, taking neighbours in ascending
+    order as a recursive DFS would.
+    Characteristics:
+        time complexity: O(V + E) sparse, O(V^2) dense
+        space complexity: O(V + E)
+    '''
+    @staticmethod
+    @Worker.register
+    def dfs( graph, source ):
+        visited = [False] * len( graph )
+        order = list()
+        stack = [source]
+        while stack:
+            u = stack.pop()
+            if( visited[u] ):
+                continue
+            visited[u] = True
+            order.append( u )
+
+            # Push in reverse so the smallest neighbour is popped first
+            for v, w in reversed( graph.neighbors( u ) ):
+                if( not visited[v] ):
+                    stack.append( v )
+        eprint("dfs from {0}: {1}".format(source, order), level=Trace.VERBOSE)
+        return order
+
+    '''
+    Dijkstra's single-source shortest paths with a binary heap (heapq).
+    Stale heap entries are skipped rather than decreased in place.
+    Weights must not be negative. Returns the distance to every vertex,
+    or -1 where there is no path.
+    Characteristics:
+        time complexity: O((V + E) logV)
+        space complexity: O(V + E)
+    '''
+    @staticmethod
+    @Worker.register
+    def dijkstra( graph, source ):
+        dist = [Graph.INFINITY] * len( graph )
+        dist[source] = 0
+        heap = [( 0, source )]
+        while heap:
+            d, u = heapq.heappop( heap )
+            if( d > dist[u] ):
+                continue
+            for v, w in graph.neighbors( u ):
+                nd = d + w
+                if( nd < dist[v] ):
+                    dist[v] = nd
+                    heapq.heappush( heap, ( nd, v ) )
+        eprint("dijkstra from {0}: {1}".format(source, dist), level=Trace.VERBOSE)
+        return [d if d != Graph.INFINITY else -1 for d in dist]
+
+    '''
+    Dijkstra's algorithm on a 4-ary DaryHeap (see Heap.py). Each vertex
+    is queued at most once and relaxing an edge lowers its key in place
+    (decrease-key), so the heap never holds stale entries. Same result
+    as dijkstra().
+    Characteristics:
+        time complexity: O((V + E) logV)
+        space complexity: O(V)
+    '''
+    @staticmethod
+    @Worker.register
+    def dijkstra_dary( graph, source ):
+        dist = [Graph.INFINITY] * len( graph )
+        dist[source] = 0
+        heap = DaryHeap( 4, [( 0, source )] )
+        while heap:
+            d, u = heap.pop()
+            for v, w in graph.neighbors( u ):
+                nd = d + w
+                if( nd < dist[v] ):
+                    dist[v] = nd
+                    heap.push_or_decrease( v, nd )
+        eprint("dijkstra_dary from {0}: {1}".format(source, dist), level=Trace.VERBOSE)
+        return [d if d != Graph.INFINITY else -1 for d in dist]
+
+    '''
+    Floyd-Warshall all-pairs shortest paths. For every intermediate
+    vertex k, each row i is relaxed through row k with one list
+    comprehension, and rows which cannot reach k are skipped. Returns
+    the distance matrix as a list of rows, with -1 where there is no
+    path.
+    Characteristics:
+        time complexity: Θ(V^3)
+        space complexity: Θ(V^2)
+    '''
+    @staticmethod
+    @Worker.register
+    def floyd_warshall( graph, source=None ):
+        INF = Graph.INFINITY
+        dist = graph.to_rows( INF )
+        for k in range( len( graph ) ):
+            row_k = dist[k]
+            for i in range( len( graph ) ):
+                d_ik = dist[i][k]
+                if( d_ik == INF or i == k ):
+                    continue
+                dist[i] = [a if a <= d_ik + b else d_ik + b for a, b in zip( dist[i], row_k )]
+            eprint("floyd_warshall after k={0}".format(k))
+        return [[d if d != INF else -1 for d in row] for row in dist]
+
+    '''
+    Label the weakly connected components (edges taken as undirected)
+    with union-find, using path halving and union by size. Returns the
+    component number of every vertex, numbered in order of each
+    component's smallest vertex.
+    Characteristics:
+        time complexity: O(E α(V)) plus the edge scan
+        space complexity: O(V)
+    '''
+    @staticmethod
+    @Worker.register
+    def connected_components( graph, source=None ):
+        parent = list( range( len( graph ) ) )
+        size = [1] * len( graph )
+
+        def find( x ):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for u, v, w in graph.edges():
+            a, b = find( u ), find( v )
+            if( a != b ):
+                if( size[a] < size[b] ):
+                    a, b = b, a
+                parent[b] = a
+                size[a] += size[b]
+
+        labels = dict()
+        components = list()
+        for u in range( len( graph ) ):
+            components.append( labels.setdefault( find( u ), len( labels ) ) )
+        eprint("connected_components: {0}".format(components), level=Trace.VERBOSE)
+        return components
+
+    '''
+    Floyd-Warshall on the NumPy backend: blocked, vectorized, exact int64
+    min-plus updates over a matrix which is memory-mapped when large (see
+    GraphBackend.py). Returns the same rows as floyd_warshall(), which is
+    also what runs without NumPy.
+    Characteristics:
+        time complexity: Θ(V^3), in V^2 / BLOCK_SIZE vectorized steps
+        space complexity: Θ(V^2), one tile and one band resident
+    '''
+    @staticmethod
+    @Worker.register
+    def blocked_floyd_warshall( graph, source=None ):
+        if( not GraphBackend.available() ):
+            return Graph.floyd_warshall( graph )
+        return GraphBackend.floyd_warshall( graph )
+
+    '''
+    Breadth-first search which expands a whole frontier per step with
+    NumPy gathers, or with int bitsets when NumPy is missing. Returns
+    the same hop counts as bfs().
+    Characteristics:
+        time complexity: O(V + E) per BFS, in O(depth) vectorized steps
+        space complexity: O(V) plus the dense boolean matrix if dense
+    '''
+    @staticmethod
+    @Worker.register
+    def frontier_bfs( graph, source ):
+        return GraphBackend.frontier_bfs( graph, source )
+
+    '''
+    Constructor is a pass-through for Worker with the exception of
+    adding the source vertex for the traversals. The input file must be
+    a GRAPH_MATRIX file.
+    '''
+    def __init__(self, path, work_method, source=0, ifile_type = Worker.GRAPH_MATRIX ):
+        Worker.__init__(self, path, work_method, ifile_type)
+        self.source = source
+
+    '''
+    Prepend the source vertex and invoke the parent method.
+    '''
+    def __str__(self):
+        string = "Source vertex: {0}\n".format(self.source)
+        return string + super().__str__()
+
+    '''
+    None of the algorithms modify the graph, so tests share the parsed
+    job instead of copying it.
+    '''
+    def _copy_job(self, graph):
+        return graph
+
+    '''
+    Test the graph for nonexistence or a source outside of it. If it is
+    valid, run the selected work method on it.
+    '''
+    def _run_test(self, graph):
+        if ( graph == None or not 0 <= self.source < len( graph ) ):
+            return -1
+
+        eprint("** starting {0} on {1} **".format(self.work_method.__name__, graph), level=Trace.VERBOSE)
+        result = self.work_method( graph, self.source )
+        eprint("** ending {0} **".format(self.work_method.__name__), level=Trace.INFO)
+        return result
+
+    '''
+    Traversal results also depend on the source.
+    '''
+    def _result_key_extra(self):
+        return ( self.source, )
@@ -0,0 +1,223 @@
+#!/usr/bin/python
+
+'''
+File: GraphBackend.py
+Author: Nicholas Russo
+Description: This class is an optional NumPy backend for the Graph
+worker on large graphs.
+
+Floyd-Warshall reads the adjacency matrix a tile at a time (dense
+matrices too large for memory are already memory-mapped by the Loader)
+into an int64 distance matrix, kept in RAM or, once it exceeds
+MEMORY_LIMIT bytes, in an anonymous memory-mapped temporary file. Absent
+paths are the INFINITY sentinel rather than a float inf, so distances
+stay exact. The matrix is processed in blocks of BLOCK_SIZE intermediate
+vertices. For each block, the band of pivot rows is relaxed first; then
+every tile of TILE_BYTES worth of rows is read once, relaxed against all
+the pivot rows of the block (one broadcast min-plus update,
+min(D, D[:,k] + D[k,:]), per k) and written back. The matrix is
+therefore swept n / BLOCK_SIZE times rather than n times, and only one
+tile and one band are resident.
+
+BFS advances a whole frontier per step: NumPy gathers the neighbours of
+every frontier vertex at once from CSR arrays or a boolean adjacency
+matrix. Without NumPy, each adjacency row is a Python int bitset and
+a frontier step is a few big-integer ORs.
+'''
+
+import tempfile
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from GraphData import DenseGraph
+
+class GraphBackend:
+
+    # Distance matrices larger than this (bytes) live in a memory-mapped file
+    MEMORY_LIMIT = 256 * 1024 * 1024
+
+    # Intermediate vertices per pass over the matrix, and the size of the
+    #  row tiles read from it
+    BLOCK_SIZE = 64
+    TILE_BYTES = 16 * 1024 * 1024
+
+    # Distance of an absent path. The sum of two distances stays below
+    #  2^63, and any distance at or above half of it at the end is
+    #  unreachable, so every real path must be shorter than INFINITY // 2
+    INFINITY = 2**62 - 1
+
+    '''
+    Returns True if NumPy could be imported.
+    '''
+    @staticmethod
+    def available():
+        return numpy is not None
+
+    '''
+    Return the rows [start, end) of the adjacency matrix as an int64
+    array with INFINITY for missing edges and 0 on the diagonal.
+    '''
+    @staticmethod
+    def _weight_rows( graph, start, end ):
+        n = len( graph )
+        if( isinstance( graph, DenseGraph ) ):
+            rows = numpy.frombuffer( graph.weights, numpy.int64 )[start * n:end * n]
+            rows = rows.reshape( end - start, n ).copy()
+            rows[rows == 0] = GraphBackend.INFINITY
+        else:
+            rows = numpy.full( ( end - start, n ), GraphBackend.INFINITY, numpy.int64 )
+            offsets = numpy.frombuffer( graph.offsets, numpy.int64 )
+            lo, hi = int( offsets[start] ), int( offsets[end] )
+            targets = numpy.frombuffer( graph.targets, numpy.int64 )[lo:hi]
+            weights = numpy.frombuffer( graph.weights, numpy.int64 )[lo:hi]
+            row_of = numpy.repeat( numpy.arange( end - start ), numpy.diff( offsets[start:end + 1] ) )
+            rows[row_of, targets] = weights
+
+        rows[numpy.arange( end - start ), numpy.arange( start, end )] = 0
+        return rows
+
+    '''
+    Allocate an n x n matrix in RAM, or in a temporary file which is
+    deleted when the matrix is garbage collected.
+    '''
+    @staticmethod
+    def _allocate( n, dtype ):
+        if( n * n * numpy.dtype( dtype ).itemsize <= GraphBackend.MEMORY_LIMIT ):
+            return numpy.empty( ( n, n ), dtype )
+        return numpy.memmap( tempfile.TemporaryFile(), dtype=dtype, mode="w+", shape=( n, n ) )
+
+    '''
+    All-pairs shortest paths by blocked, vectorized Floyd-Warshall (see
+    the file description). Returns the distances as a list of rows with
+    -1 where there is no path, like Graph.floyd_warshall().
+    '''
+    @staticmethod
+    def floyd_warshall( graph ):
+        return GraphBackend.distance_matrix( graph ).tolist()
+
+    '''
+    The n x n int64 distance matrix behind floyd_warshall(), with -1
+    where there is no path. Large matrices are memory-mapped, so callers
+    which can consume the rows a tile at a time should use this instead.
+    Negative edges are allowed; negative cycles are not detected. Raises
+    ValueError if a path could be long enough to reach INFINITY // 2.
+    '''
+    @staticmethod
+    def distance_matrix( graph ):
+        n = len( graph )
+        INF = GraphBackend.INFINITY
+        dist = GraphBackend._allocate( n, numpy.int64 )
+        tile = max( 1, GraphBackend.TILE_BYTES // ( 8 * max( 1, n ) ) )
+        longest = 0
+        for a in range( 0, n, tile ):
+            rows = GraphBackend._weight_rows( graph, a, min( a + tile, n ) )
+            finite = rows[rows != INF]
+            if( finite.size > 0 ):
+                longest = max( longest, int( numpy.abs( finite ).max() ) )
+            dist[a:a + tile] = rows
+
+        # A shortest path has at most n - 1 edges
+        if( longest * max( 1, n - 1 ) >= INF // 2 ):
+            raise ValueError( "paths of up to {0} edges of weight {1} may reach the infinity sentinel".format(
+                n - 1, longest ) )
+
+        for kb in range( 0, n, GraphBackend.BLOCK_SIZE ):
+            ke = min( kb + GraphBackend.BLOCK_SIZE, n )
+
+            # Pivot band first, in k order, so row k is final for step k
+            band = numpy.array( dist[kb:ke] )
+            for k in range( kb, ke ):
+                numpy.minimum( band, band[:, k:k + 1] + band[k - kb], out=band )
+            dist[kb:ke] = band
+
+            # Every other row tile is read and written once per block. Using
+            #  band rows already relaxed by later k of the block only
+            #  substitutes shorter valid paths, so the result is unchanged.
+            for a in range( 0, n, tile ):
+                b = min( a + tile, n )
+                rows = numpy.array( dist[a:b] )
+                for k in range( kb, ke ):
+                    numpy.minimum( rows, rows[:, k:k + 1] + band[k - kb], out=rows )
+                dist[a:b] = rows
+
+        # Sums involving INFINITY drift below it by at most a path length
+        for a in range( 0, n, tile ):
+            rows = numpy.array( dist[a:a + tile] )
+            rows[rows >= INF // 2] = -1
+            dist[a:a + tile] = rows
+        return dist
+
+    '''
+    Breadth-first search one frontier at a time. Returns the number of
+    edges on the shortest path to every vertex, or -1 where there is no
+    path, like Graph.bfs().
+    '''
+    @staticmethod
+    def frontier_bfs( graph, source ):
+        if( numpy is None ):
+            return GraphBackend._bitset_bfs( graph, source )
+
+        n = len( graph )
+        hops = numpy.full( n, -1, numpy.int64 )
+        hops[source] = 0
+        frontier = numpy.array( [source], numpy.int64 )
+
+        if( isinstance( graph, DenseGraph ) ):
+            adjacency = numpy.frombuffer( graph.weights, numpy.int64 ).reshape( n, n ) != 0
+            numpy.fill_diagonal( adjacency, False )
+        else:
+            offsets = numpy.frombuffer( graph.offsets, numpy.int64 )
+            targets = numpy.frombuffer( graph.targets, numpy.int64 )
+
+        level = 0
+        while( len( frontier ) > 0 ):
+            level += 1
+            if( isinstance( graph, DenseGraph ) ):
+                reached = adjacency[frontier].any( axis=0 )
+            else:
+                # Gather the CSR slices of every frontier vertex at once
+                starts = offsets[frontier]
+                counts = offsets[frontier + 1] - starts
+                firsts = numpy.repeat( starts - numpy.cumsum( counts ) + counts, counts )
+                reached = numpy.zeros( n, bool )
+                reached[targets[firsts + numpy.arange( counts.sum() )]] = True
+
+            reached &= hops == -1
+            frontier = numpy.flatnonzero( reached )
+            hops[frontier] = level
+        return hops.tolist()
+
+    '''
+    Pure-Python frontier BFS. Each adjacency row and the frontier are
+    ints used as bitsets, so expanding a frontier ORs whole rows at once.
+    '''
+    @staticmethod
+    def _bitset_bfs( graph, source ):
+        n = len( graph )
+        rows = [0] * n
+        for u, v, w in graph.edges():
+            rows[u] |= 1 << v
+
+        hops = [-1] * n
+        hops[source] = 0
+        visited = frontier = 1 << source
+        level = 0
+        while( frontier ):
+            level += 1
+            reached = 0
+            while( frontier ):
+                low = frontier & -frontier
+                reached |= rows[low.bit_length() - 1]
+                frontier ^= low
+
+            frontier = reached & ~visited
+            visited |= frontier
+            f = frontier
+            while( f ):
+                low = f & -f
+                hops[low.bit_length() - 1] = level
+                f ^= low
+        return hops
@@ -0,0 +1,183 @@
+#!/usr/bin/python
+
+'''
+File: GraphData.py
+Author: Nicholas Russo
+Description: This file defines the two in-memory forms of a weighted,
+directed graph read from an adjacency matrix, where a non-zero entry
+(u, v) off the diagonal is an edge from u to v with that weight:
+
+    DenseGraph:  the n x n matrix as one row-major int64 buffer, an
+                 array.array or a memoryview of a memory-mapped file
+                 (see Loader.iter_matrices())
+    SparseGraph: compressed sparse rows (CSR); the targets and weights
+                 of the edges leaving u are targets[offsets[u]:offsets[u+1]]
+                 and weights[offsets[u]:offsets[u+1]]
+
+Both offer the same methods, so graph algorithms work on either.
+from_matrix() picks the form from the edge density: a dense matrix takes
+8 bytes per vertex pair and CSR 16 bytes per edge, so CSR is chosen
+below DENSE_CUTOFF (half of all pairs), where it is also faster to walk.
+'''
+
+from array import array
+
+# Edge density (edges / possible edges) at or above which DenseGraph is used
+DENSE_CUTOFF = 0.5
+
+# Elements of a matrix buffer copied at a time when counting its edges
+COUNT_CHUNK = 1024 * 1024
+
+'''
+Count the edges of a row-major n x n matrix buffer: the non-zero
+entries off the diagonal. Buffers other than array.array (memory-mapped
+ones) are counted a chunk at a time.
+'''
+def edge_count( n, matrix ):
+    diagonal = sum( 1 for u in range( n ) if matrix[u * n + u] )
+    if( isinstance( matrix, array ) ):
+        return len( matrix ) - matrix.count( 0 ) - diagonal
+
+    zeros = 0
+    for start in range( 0, len( matrix ), COUNT_CHUNK ):
+        chunk = array( "q" )
+        chunk.frombytes( matrix[start:start + COUNT_CHUNK].cast( "B" ) )
+        zeros += chunk.count( 0 )
+    return len( matrix ) - zeros - diagonal
+
+class DenseGraph:
+
+    def __init__(self, n, weights):
+        self.n = n
+        self.weights = weights
+        self.edge_count = edge_count( n, weights )
+
+    def __len__(self):
+        return self.n
+
+    '''
+    Return the weight of edge (u, v), or 0 if there is none.
+    '''
+    def weight(self, u, v):
+        return self.weights[u * self.n + v] if u != v else 0
+
+    '''
+    Return the (target, weight) pairs of the edges leaving u. The row is
+    sliced out in one C-level copy before it is filtered.
+    '''
+    def neighbors(self, u):
+        n = self.n
+        row = self.weights[u * n:( u + 1 ) * n]
+        return [( v, w ) for v, w in enumerate( row ) if w and v != u]
+
+    '''
+    Yield every edge as (source, target, weight).
+    '''
+    def edges(self):
+        for u in range( self.n ):
+            for v, w in self.neighbors( u ):
+                yield ( u, v, w )
+
+    '''
+    Return the matrix as a list of row lists with "missing" for absent
+    edges and 0 on the diagonal, the starting point of all-pairs methods.
+    '''
+    def to_rows(self, missing):
+        n = self.n
+        rows = list()
+        for u in range( n ):
+            row = [w if w else missing for w in self.weights[u * n:( u + 1 ) * n]]
+            row[u] = 0
+            rows.append( row )
+        return rows
+
+    def tobytes(self):
+        return self.weights.tobytes()
+
+    def __str__(self):
+        return "DenseGraph: {0} vertices, {1} edges".format( self.n, self.edge_count )
+
+class SparseGraph:
+
+    def __init__(self, n, offsets, targets, weights):
+        self.n = n
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.edge_count = len( targets )
+
+    '''
+    Build the CSR form from a row-major matrix buffer.
+    '''
+    @staticmethod
+    def from_buffer( n, matrix ):
+        offsets = array( "q", [0] )
+        targets = array( "q" )
+        weights = array( "q" )
+        for u in range( n ):
+            row = matrix[u * n:( u + 1 ) * n]
+            for v, w in enumerate( row ):
+                if( w and v != u ):
+                    targets.append( v )
+                    weights.append( w )
+            offsets.append( len( targets ) )
+        return SparseGraph( n, offsets, targets, weights )
+
+    def __len__(self):
+        return self.n
+
+    '''
+    Return the weight of edge (u, v), or 0 if there is none.
+    '''
+    def weight(self, u, v):
+        for i in range( self.offsets[u], self.offsets[u + 1] ):
+            if( self.targets[i] == v ):
+                return self.weights[i]
+        return 0
+
+    '''
+    Return the (target, weight) pairs of the edges leaving u.
+    '''
+    def neighbors(self, u):
+        start, end = self.offsets[u], self.offsets[u + 1]
+        return list( zip( self.targets[start:end], self.weights[start:end] ) )
+
+    '''
+    Yield every edge as (source, target, weight).
+    '''
+    def edges(self):
+        for u in range( self.n ):
+            for v, w in self.neighbors( u ):
+                yield ( u, v, w )
+
+    '''
+    Return the matrix as a list of row lists with "missing" for absent
+    edges and 0 on the diagonal, the starting point of all-pairs methods.
+    '''
+    def to_rows(self, missing):
+        rows = list()
+        for u in range( self.n ):
+            row = [missing] * self.n
+            for v, w in self.neighbors( u ):
+                row[v] = w
+            row[u] = 0
+            rows.append( row )
+        return rows
+
+    def tobytes(self):
+        return self.offsets.tobytes() + self.targets.tobytes() + self.weights.tobytes()
+
+    def __str__(self):
+        return "SparseGraph: {0} vertices, {1} edges".format( self.n, self.edge_count )
+
+'''
+Wrap a row-major n x n matrix buffer in DenseGraph or SparseGraph,
+whichever suits its edge density.
+'''
+def from_matrix( n, matrix, dense_cutoff=None ):
+    dense_cutoff = DENSE_CUTOFF if dense_cutoff is None else dense_cutoff
+    possible = n * ( n - 1 )
+
+    if( possible > 0 and edge_count( n, matrix ) / possible >= dense_cutoff ):
+        return DenseGraph( n, matrix )
+    return SparseGraph.from_buffer( n, matrix )
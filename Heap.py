@@ -0,0 +1,212 @@
+#!/usr/bin/python
+
+'''
+File: Heap.py
+Author: Nicholas Russo
+Description: This class is an array-backed d-ary min-heap used as a
+priority queue. Each node has "arity" children (node i's children are
+d*i+1 .. d*i+d), so the tree is log_d(n) levels deep: a 4-ary heap does
+half the levels of a binary one when popping and its sibling keys sit
+next to each other in memory. Items are kept alongside their
+priorities, and a position map from item to slot lets decrease_key()
+find an item in O(1). Items must therefore be hashable and unique.
+
+The static *_max helpers run the same d-ary sifts as a max-heap laid
+over a slice of a list or memoryview, in place, for Sort.heap_sort().
+'''
+
+class DaryHeap:
+
+    '''
+    Build a heap from optional (priority, item) pairs in O(n) by
+    sifting down every internal node, last first (Floyd's method).
+    '''
+    def __init__(self, arity=4, pairs=None):
+        if( arity < 2 ):
+            raise ValueError( "arity must be at least 2: {0}".format( arity ) )
+        self.arity = arity
+        self.keys = list()
+        self.items = list()
+        self.position = dict()
+
+        if( pairs is not None ):
+            for priority, item in pairs:
+                if( item in self.position ):
+                    raise KeyError( "item already queued: {0!r}".format( item ) )
+                self.position[item] = len( self.items )
+                self.keys.append( priority )
+                self.items.append( item )
+            for i in range( ( len( self.keys ) - 2 ) // arity, -1, -1 ):
+                self._sift_down( i )
+
+    def __len__(self):
+        return len( self.keys )
+
+    def __contains__(self, item):
+        return item in self.position
+
+    '''
+    Return the priority of a queued item.
+    '''
+    def priority(self, item):
+        return self.keys[self.position[item]]
+
+    '''
+    Return (priority, item) with the smallest priority without removing it.
+    '''
+    def peek(self):
+        return ( self.keys[0], self.items[0] )
+
+    '''
+    Queue an item. Raises KeyError if it is already queued.
+    '''
+    def push(self, item, priority):
+        if( item in self.position ):
+            raise KeyError( "item already queued: {0!r}".format( item ) )
+        self.keys.append( priority )
+        self.items.append( item )
+        self.position[item] = len( self.items ) - 1
+        self._sift_up( len( self.keys ) - 1 )
+
+    '''
+    Remove and return (priority, item) with the smallest priority.
+    '''
+    def pop(self):
+        keys, items = self.keys, self.items
+        top = ( keys[0], items[0] )
+        del self.position[items[0]]
+
+        last_key, last_item = keys.pop(), items.pop()
+        if( keys ):
+            keys[0], items[0] = last_key, last_item
+            self.position[last_item] = 0
+            self._sift_down( 0 )
+        return top
+
+    '''
+    Pop the smallest entry and queue a new one with a single sift,
+    cheaper than pop() followed by push(). Returns the popped entry.
+    '''
+    def replace(self, item, priority):
+        top = ( self.keys[0], self.items[0] )
+        del self.position[self.items[0]]
+        if( item in self.position ):
+            self.position[self.items[0]] = 0
+            raise KeyError( "item already queued: {0!r}".format( item ) )
+
+        self.keys[0], self.items[0] = priority, item
+        self.position[item] = 0
+        self._sift_down( 0 )
+        return top
+
+    '''
+    Lower the priority of a queued item and move it up accordingly.
+    Raises ValueError if the new priority is higher.
+    '''
+    def decrease_key(self, item, priority):
+        i = self.position[item]
+        if( priority > self.keys[i] ):
+            raise ValueError( "priority increased: {0} > {1}".format( priority, self.keys[i] ) )
+        self.keys[i] = priority
+        self._sift_up( i )
+
+    '''
+    Queue the item, or lower its priority if it is queued with a higher
+    one. Returns True if the queue changed (the relax step of Dijkstra).
+    '''
+    def push_or_decrease(self, item, priority):
+        i = self.position.get( item )
+        if( i is None ):
+            self.push( item, priority )
+            return True
+        if( priority < self.keys[i] ):
+            self.keys[i] = priority
+            self._sift_up( i )
+            return True
+        return False
+
+    '''
+    Move the entry at slot i toward the root while its parent is larger.
+    The entry is held aside and parents are shifted down into the hole,
+    one write per level instead of a swap.
+    '''
+    def _sift_up(self, i):
+        keys, items, position = self.keys, self.items, self.position
+        key, item = keys[i], items[i]
+        while( i > 0 ):
+            parent = ( i - 1 ) // self.arity
+            if( keys[parent] <= key ):
+                break
+            keys[i], items[i] = keys[parent], items[parent]
+            position[items[i]] = i
+            i = parent
+        keys[i], items[i] = key, item
+        position[item] = i
+
+    '''
+    Move the entry at slot i away from the root while a child is smaller.
+    The smallest of the (contiguous) children is found with one slice.
+    '''
+    def _sift_down(self, i):
+        keys, items, position = self.keys, self.items, self.position
+        arity = self.arity
+        n = len( keys )
+        key, item = keys[i], items[i]
+        while True:
+            first = arity * i + 1
+            if( first >= n ):
+                break
+            children = keys[first:first + arity]
+            smallest = min( children )
+            if( smallest >= key ):
+                break
+            child = first + children.index( smallest )
+            keys[i], items[i] = smallest, items[child]
+            position[items[i]] = i
+            i = child
+        keys[i], items[i] = key, item
+        position[item] = i
+
+    '''
+    Move array[start + i] down a max-heap of n slots laid over
+    array[start:start + n]. The largest child is found by index rather
+    than by slicing, so "array" may be any mutable sequence, including
+    the memoryviews the parallel sorts work on.
+    '''
+    @staticmethod
+    def sift_down_max( array, start, i, n, arity ):
+        value = array[start + i]
+        while True:
+            first = start + arity * i + 1
+            if( first >= start + n ):
+                break
+            child = first
+            largest = array[first]
+            for j in range( first + 1, min( first + arity, start + n ) ):
+                if( array[j] > largest ):
+                    child, largest = j, array[j]
+            if( largest <= value ):
+                break
+            array[start + i] = largest
+            i = child - start
+        array[start + i] = value
+
+    '''
+    Arrange array[start:start + n] into a max-heap in O(n).
+    '''
+    @staticmethod
+    def heapify_max( array, start, n, arity ):
+        for i in range( ( n - 2 ) // arity, -1, -1 ):
+            DaryHeap.sift_down_max( array, start, i, n, arity )
+
+    '''
+    Heap sort array[start:end] in place, ascending: build a max-heap,
+    then repeatedly swap its root behind the shrinking heap.
+    '''
+    @staticmethod
+    def sort_range( array, start, end, arity ):
+        n = end - start
+        DaryHeap.heapify_max( array, start, n, arity )
+        for last in range( n - 1, 0, -1 ):
+            array[start], array[start + last] = array[start + last], array[start]
+            DaryHeap.sift_down_max( array, start, 0, last, arity )
@@ -0,0 +1,287 @@
+#!/usr/bin/python
+
+'''
+File: IndexedLinkedList.py
+Author: Nicholas Russo
+Description: This class is a linked list for heavy positional editing,
+built as an indexable skip list. Every node has a random number of
+levels (half the nodes reach level 2, a quarter level 3...) and at each
+level it links to the next node of at least that height, along with the
+width of the link: how many bottom-level nodes it skips. Summing widths
+while descending finds any position in O(logn) expected steps, so
+positional get, insert and remove are O(logn) instead of O(n), and a run
+of k values is spliced in by extend()/insert_many() in O(k + logn). The
+LinkedList API is kept (insert(n, i) places the node after the i-th
+one, as LinkedList does); methods accept values or Node objects.
+'''
+
+import random
+import sys
+import time
+
+from LinkedList import LinkedList, Node
+
+class IndexedNode:
+
+    __slots__ = ( "data", "next", "width" )
+
+    def __init__(self, d, levels):
+        self.data = d
+        self.next = [None] * levels
+        self.width = [0] * levels
+
+class IndexedLinkedList:
+
+    # Enough levels for 2**32 nodes
+    MAX_LEVEL = 32
+
+    def __init__(self, *datalist):
+        # The head is a sentinel at position 0; data nodes are at 1..size
+        #  and a missing link (None) stands for position size + 1
+        self.head = IndexedNode( None, IndexedLinkedList.MAX_LEVEL )
+        self.tail = None
+        self.height = 1
+        self.size = 0
+        self.head.width[0] = 1
+
+        # Sanity check; stop processing on empty input
+        if( datalist == None or len(datalist) == 0 ):
+            return
+        self.extend( datalist )
+
+    '''
+    Random node height: one plus the number of trailing zero bits of a
+    random word, so level l is reached with probability 2**-(l-1).
+    '''
+    @staticmethod
+    def _random_level():
+        bits = random.getrandbits( IndexedLinkedList.MAX_LEVEL - 1 ) | ( 1 << ( IndexedLinkedList.MAX_LEVEL - 1 ) )
+        return ( bits & -bits ).bit_length()
+
+    '''
+    For every level, find the last node positioned before p. Returns the
+    nodes and their positions, indexed by level.
+    '''
+    def _path(self, p):
+        update = [None] * self.height
+        positions = [0] * self.height
+        node = self.head
+        pos = 0
+        for l in range( self.height - 1, -1, -1 ):
+            while( pos + node.width[l] < p ):
+                pos += node.width[l]
+                node = node.next[l]
+            update[l] = node
+            positions[l] = pos
+        return update, positions
+
+    '''
+    Raise the list to "levels" levels. The head's new links skip every
+    node, to position size + 1.
+    '''
+    def _grow(self, levels):
+        for l in range( self.height, levels ):
+            self.head.next[l] = None
+            self.head.width[l] = self.size + 1
+        self.height = max( self.height, levels )
+
+    '''
+    Check and normalize a position. Negative positions count from the
+    end, as for lists.
+    '''
+    def _index(self, i):
+        if( i < 0 ):
+            i += self.size
+        if( i < 0 or i >= self.size ):
+            raise IndexError( "index out of range: {0}".format( i ) )
+        return i
+
+    def clone(self):
+        return IndexedLinkedList( *self.make_list() )
+
+    def __str__(self):
+        result = " ".join( str( d ) for d in self.make_list() )
+        head = self.head.next[0]
+        result += " (h={0} t={1} n={2})".format( head.data if head else None,
+            self.tail.data if self.tail else None, self.size )
+        return result
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        return self.get( i )
+
+    def __iter__(self):
+        cur = self.head.next[0]
+        while cur:
+            yield cur.data
+            cur = cur.next[0]
+
+    def __add__(self, other):
+        # Append other to the end of self, copying its values
+        if( other == None ):
+            return None
+        self.extend( other.make_list() )
+        return self
+
+    def get_head(self):
+        return self.head.next[0]
+
+    def get_tail(self):
+        return self.tail
+
+    '''
+    Return the data at index i in O(logn) expected time.
+    '''
+    def get(self, i):
+        p = self._index( i ) + 1
+        node = self.head
+        pos = 0
+        for l in range( self.height - 1, -1, -1 ):
+            while( pos + node.width[l] <= p ):
+                pos += node.width[l]
+                node = node.next[l]
+            if( pos == p ):
+                break
+        return node.data
+
+    '''
+    Insert k values so that the first one ends up at index i, in
+    O(k + logn) expected time: the path to i is found once, then each new
+    node is linked after the last node of its height (only the levels it
+    reaches are touched), and finally the last nodes are linked to what
+    followed the insertion point. Returns the new size.
+    '''
+    def insert_many(self, i, values):
+        values = [d.data if isinstance( d, Node ) else d for d in values]
+        k = len( values )
+        if( k == 0 ):
+            return self.size
+        i = min( max( i, 0 ), self.size )
+        p = i + 1
+
+        heights = [IndexedLinkedList._random_level() for _ in range( k )]
+        self._grow( max( heights ) )
+        last, positions = self._path( p )
+
+        # Where each level continued before the splice, in old positions
+        after = [last[l].next[l] for l in range( self.height )]
+        after_pos = [positions[l] + last[l].width[l] for l in range( self.height )]
+
+        node = None
+        for j in range( k ):
+            h = heights[j]
+            node = IndexedNode( values[j], h )
+            pos = p + j
+            for l in range( h ):
+                last[l].next[l] = node
+                last[l].width[l] = pos - positions[l]
+                last[l] = node
+                positions[l] = pos
+
+        # Close the splice; everything after it moved k positions on
+        for l in range( self.height ):
+            last[l].next[l] = after[l]
+            last[l].width[l] = after_pos[l] + k - positions[l]
+
+        if( after[0] is None ):
+            self.tail = node
+        self.size += k
+        return self.size
+
+    '''
+    Append values to the end in O(k + logn). Returns the new size.
+    '''
+    def extend(self, values):
+        return self.insert_many( self.size, values )
+
+    def append(self, n):
+        return self.insert_many( self.size, [n] )
+
+    def prepend(self, n):
+        return self.insert_many( 0, [n] )
+
+    '''
+    Same placement as LinkedList.insert: the new node follows the node
+    at index i, is prepended for i < 0 and appended for i >= size.
+    '''
+    def insert(self, n, i):
+        if( i < 0 ):
+            return self.prepend( n )
+        return self.insert_many( i + 1, [n] )
+
+    '''
+    Remove the node at index i in O(logn) expected time. Returns the new
+    size.
+    '''
+    def remove_at(self, i):
+        p = self._index( i ) + 1
+        update, positions = self._path( p )
+        target = update[0].next[0]
+
+        for l in range( self.height ):
+            node = update[l]
+            if( node.next[l] is target ):
+                node.width[l] += target.width[l] - 1
+                node.next[l] = target.next[l]
+            else:
+                node.width[l] -= 1
+
+        if( target is self.tail ):
+            self.tail = update[0] if update[0] is not self.head else None
+        self.size -= 1
+        return self.size
+
+    '''
+    Remove the first node holding d. Finding it is a linear scan; the
+    unlinking is O(logn). Returns the new size, or -1 if d is absent.
+    '''
+    def remove(self, d):
+        i = self.find_data( d )
+        if( i == -1 ):
+            return -1
+        return self.remove_at( i )
+
+    def find_data(self, d):
+        cur = self.head.next[0]
+        i = 0
+        while cur:
+            if ( cur.data == d ):
+                return i
+            i += 1
+            cur = cur.next[0]
+        return -1
+
+    def make_list(self):
+        return list( self )
+
+    def make_tuple(self):
+        return tuple( self.make_list() )
+
+    def make_set(self):
+        return set( self.make_list() )
+
+'''
+Time n random positional inserts into each list type.
+'''
+def main():
+    ill = IndexedLinkedList(1,4,2,6,5)
+    ill.insert(Node(3),3)
+    ill.insert_many(1, [7,7,7])
+    print(ill, ill[0], ill[-1])
+    ill.remove(5)
+    ill.remove_at(0)
+    print(ill)
+
+    n = int( sys.argv[1] ) if len( sys.argv ) > 1 else 20000
+    rng = random.Random( 19 )
+    positions = [rng.randrange( i + 1 ) for i in range( n )]
+    for name, lst in ( ( "LinkedList", LinkedList( 0 ) ), ( "IndexedLinkedList", IndexedLinkedList( 0 ) ) ):
+        start = time.perf_counter()
+        for i in positions:
+            lst.insert( Node( i ), i )
+        print( "{0}: {1} positional inserts in {2:.1f} ms".format( name, n, ( time.perf_counter() - start ) * 1000 ) )
+
+if __name__ == "__main__":
+    main()
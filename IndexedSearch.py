@@ -0,0 +1,114 @@
+#!/usr/bin/python
+
+'''
+File: IndexedSearch.py
+Author: Nicholas Russo
+Description: This class extends Search for repeated queries. The work
+method is an index class (see SearchIndex.py): for every job, the index
+is built once and then queried for every target. Build and query stages
+are timed separately so that the cost of preprocessing can be weighed
+against the per-query savings. With an IndexCache, each job's index
+is built on its first query only and reused by later runs until the
+cache evicts it. Entries are keyed on the index class and a hash of the
+job's content, so identical jobs share an index even across files.
+'''
+
+import time
+
+from ResultCache import ResultCache
+from Search import Search
+from SearchIndex import BloomIndex, EytzingerIndex, FenceIndex, HashIndex
+from Worker import Worker
+
+class IndexedSearch(Search):
+
+    # The index classes are registered as the work methods, so that suites
+    #  such as Parallel and Scaling find them through get_work_methods()
+    EytzingerIndex = Worker.register( EytzingerIndex )
+    FenceIndex = Worker.register( FenceIndex )
+    HashIndex = Worker.register( HashIndex )
+    BloomIndex = Worker.register( BloomIndex )
+
+    '''
+    Constructor is a pass-through for Search, except that the target may
+    be a list of targets which are all queried against each job, and an
+    optional IndexCache may be shared with other IndexedSearch objects.
+    '''
+    def __init__(self, path, index_class, targets, ifile_type = Worker.LINEAR, cache=None ):
+        Search.__init__(self, path, index_class, targets, ifile_type)
+        self.targets = list( targets ) if isinstance( targets, ( list, tuple, range ) ) else [targets]
+        self.cache = cache
+
+    '''
+    Clear the build and query times along with the parent's history.
+    '''
+    def clear_time_history(self):
+        Search.clear_time_history(self)
+        self.build_times = list()
+        self.query_times = list()
+
+    '''
+    Returns the index build time of each test, in seconds.
+    '''
+    def get_build_times(self):
+        return self.build_times
+
+    '''
+    Returns the time to answer all targets for each test, in seconds.
+    '''
+    def get_query_times(self):
+        return self.query_times
+
+    '''
+    Append the build and query totals to the parent's output. Stage times
+    are only kept by tests run in this process, so results gathered by
+    Parallel show the test totals alone.
+    '''
+    def __str__(self):
+        queries = max( 1, len( self.query_times ) * len( self.targets ) )
+        string = super().__str__()
+        if( not self.query_times ):
+            return string
+        string += "\nBuild stage: {0} us, query stage: {1} us ({2} us per query)".format(
+            sum( self.build_times ) * Worker.MICRO, sum( self.query_times ) * Worker.MICRO,
+            sum( self.query_times ) * Worker.MICRO / queries )
+        if( self.cache is not None ):
+            string += "\n{0}".format( self.cache )
+        return string
+
+    '''
+    Tests record per-stage state besides their result, so they are never
+    answered from a result cache.
+    '''
+    def _result_key_extra(self):
+        return None
+
+    '''
+    The vectorized batch search takes a single target and no index, so a
+    batch is the same as run_suite().
+    '''
+    def run_batch(self):
+        return self.run_suite()
+
+    '''
+    Build the index for this job (or fetch it from the cache), then query
+    every target. The result is the list of indices, one per target. A
+    cached index costs only the content hash of the job.
+    '''
+    def _run_test(self, array):
+        if ( array == None ):
+            return -1
+
+        start = time.perf_counter()
+        if( self.cache is None ):
+            index = self.work_method( array )
+        else:
+            key = ( self.work_method, ResultCache.content_hash( array ) )
+            index = self.cache.get_or_build( key, lambda: self.work_method( array ) )[0]
+        middle = time.perf_counter()
+        result = [index.query( target ) for target in self.targets]
+        end = time.perf_counter()
+
+        self._store_for_test( self.build_times, middle - start )
+        self._store_for_test( self.query_times, end - middle )
+        return result
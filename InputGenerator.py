@@ -0,0 +1,111 @@
+#!/usr/bin/python
+
+'''
+File: InputGenerator.py
+Author: Nicholas Russo
+Description: This class generates seeded test arrays in several
+distributions which stress different algorithm behaviors (sorted,
+reversed, duplicate-heavy, etc). Arrays can be written in the same
+space-separated format used by the checked-in .input files so that
+any Worker can load them through its normal parsing path.
+'''
+
+import random
+
+class InputGenerator:
+
+    RANDOM = "random"
+    SORTED = "sorted"
+    REVERSE_SORTED = "reverse_sorted"
+    FEW_UNIQUE = "few_unique"
+    ORGAN_PIPE = "organ_pipe"
+    NEARLY_SORTED = "nearly_sorted"
+
+    DISTRIBUTIONS = [
+        RANDOM,
+        SORTED,
+        REVERSE_SORTED,
+        FEW_UNIQUE,
+        ORGAN_PIPE,
+        NEARLY_SORTED,
+        ]
+
+    # Number of distinct values in FEW_UNIQUE arrays
+    FEW_UNIQUE_VALUES = 8
+
+    # Fraction of elements displaced in NEARLY_SORTED arrays
+    NEARLY_SORTED_SWAPS = 0.01
+
+    '''
+    Return geometric sizes from "low" to "high" inclusive, with "steps"
+    sizes per factor of 10. The default gives 10, 100, ... 10^7.
+    '''
+    @staticmethod
+    def sizes( low=10, high=10**7, steps=1 ):
+        result = list()
+        i = 0
+        while True:
+            n = int( round( low * 10 ** ( i / steps ) ) )
+            if( n > high ):
+                break
+            if( len( result ) == 0 or n != result[-1] ):
+                result.append( n )
+            i += 1
+        return result
+
+    '''
+    Generate one array of length n following "distribution". The same
+    (distribution, n, seed) always produces the same array.
+    '''
+    @staticmethod
+    def generate( distribution, n, seed=0 ):
+        rng = random.Random( "{0}:{1}:{2}".format( distribution, n, seed ) )
+
+        if( distribution == InputGenerator.RANDOM ):
+            return [rng.randint( -n, n ) for i in range( n )]
+
+        elif( distribution == InputGenerator.SORTED ):
+            return sorted( rng.randint( -n, n ) for i in range( n ) )
+
+        elif( distribution == InputGenerator.REVERSE_SORTED ):
+            return sorted( ( rng.randint( -n, n ) for i in range( n ) ), reverse=True )
+
+        elif( distribution == InputGenerator.FEW_UNIQUE ):
+            k = InputGenerator.FEW_UNIQUE_VALUES
+            return [rng.randrange( k ) for i in range( n )]
+
+        elif( distribution == InputGenerator.ORGAN_PIPE ):
+            # Ascending to the midpoint, then descending back down
+            half = ( n + 1 ) // 2
+            return list( range( half ) ) + list( range( n - half - 1, -1, -1 ) )
+
+        elif( distribution == InputGenerator.NEARLY_SORTED ):
+            array = list( range( n ) )
+            for s in range( max( 1, int( n * InputGenerator.NEARLY_SORTED_SWAPS ) ) ):
+                i = rng.randrange( n )
+                j = rng.randrange( n )
+                array[i], array[j] = array[j], array[i]
+            return array
+
+        raise ValueError( "unknown distribution: {0}".format( distribution ) )
+
+    '''
+    Write rows (lists of ints) to "path" in the linear .input format,
+    one space-separated row per line.
+    '''
+    @staticmethod
+    def write( path, rows ):
+        with open( path, "w" ) as handle:
+            for row in rows:
+                handle.write( " ".join( map( str, row ) ) )
+                handle.write( "\n" )
+
+    '''
+    Convenience wrapper which generates "count" rows and writes them.
+    Each row uses a different seed derived from "seed".
+    '''
+    @staticmethod
+    def write_generated( path, distribution, n, count=1, seed=0 ):
+        rows = [InputGenerator.generate( distribution, n, seed + i ) for i in range( count )]
+        InputGenerator.write( path, rows )
+        return path
@@ -2,6 +2,10 @@
 
 
 class Node:
+    
+    # No per-instance __dict__; a node is just its two references
+    __slots__ = ( "data", "next" )
+    
     def __init__(self, d, n = None):
         self.data = d
         self.next = n
@@ -47,10 +51,10 @@ class LinkedList:
             else:
                 new_node = Node(datalist[i+1])
                 
-            self.tail.set_next( new_node )
+            self.tail.next = new_node
             
             # Advance the pointer
-            self.tail = self.tail.get_next()
+            self.tail = new_node
             
             # Keep updating the size
             self.size += 1
@@ -58,13 +62,18 @@ class LinkedList:
         
     def clone(self):
         return LinkedList(*self.make_list())
+        
+    # Pickle (and deepcopy) as the flat list of data and rebuild the nodes
+    #  on load; the default would recurse once per node through "next"
+    def __reduce__(self):
+        return ( type(self), tuple( self.make_list() ) )
             
     def __str__(self):
         cur = self.get_head()
         result = ""
         while cur:
-            result += str( cur.get_data() ) + " "
-            cur = cur.get_next()
+            result += str( cur.data ) + " "
+            cur = cur.next
             
         result += "(h={0} t={1} n={2})".format(self.head.get_data(), self.tail.get_data(), self.size)
         return result
@@ -72,6 +81,12 @@ class LinkedList:
     def __len__(self):
         return self.size
         
+    def __iter__(self):
+        cur = self.head
+        while cur:
+            yield cur.data
+            cur = cur.next
+        
     def __add__(self, other):
         # Append other to the end of self
         if( other == None ):
@@ -79,13 +94,15 @@ class LinkedList:
         
         other_head = other.get_head()
         self._sanity_check_node( other_head )
-        self.get_tail().set_next( other_head )
+        self.tail.next = other_head
         
+        # Walk to the end of other; only the last node becomes the tail
         cur = other_head
-        while cur:
-            self._set_tail( cur )
+        while cur.next:
             self.size += 1
-            cur = cur.get_next()
+            cur = cur.next
+        self.size += 1
+        self.tail = cur
         
         return self
         
@@ -116,7 +133,10 @@ class LinkedList:
         
     def append(self, n):
         self._sanity_check_node( n )
-        self.get_tail().set_next( n )
+        if( self.tail is None ):
+            self._set_head( n )
+        else:
+            self.tail.next = n
         self._set_tail( n )
         self.size += 1
         return self.size
@@ -125,6 +145,8 @@ class LinkedList:
         self._sanity_check_node( n )
         n.set_next( self.get_head() )
         self._set_head( n )
+        if( self.tail is None ):
+            self._set_tail( n )
         self.size += 1
         return self.size
         
@@ -139,52 +161,172 @@ class LinkedList:
         
         # Move cur to the previous node right before the
         #  insertion point
-        cur = self.get_head()
+        cur = self.head
         j = 0
         while j < i:
             j += 1
-            cur = cur.get_next()
+            cur = cur.next
         
-        n.set_next( cur.get_next() )
-        cur.set_next( n )
+        n.next = cur.next
+        cur.next = n
+        if( cur is self.tail ):
+            self.tail = n
             
         self.size += 1
         return self.size
         
     def remove(self, d):
-        cur = self.get_head()
-        
-        while cur and cur.get_next():
-            if ( cur.get_next().get_data() == d ):
-                cur.set_next( cur.get_next().get_next() )
+        cur = self.head
+        
+        # The head has no previous node to relink
+        if( cur and cur.data == d ):
+            self.head = cur.next
+            if( self.head is None ):
+                self.tail = None
+            self.size -= 1
+            return self.size
+        
+        while cur and cur.next:
+            nxt = cur.next
+            if ( nxt.data == d ):
+                cur.next = nxt.next
+                if( nxt is self.tail ):
+                    self.tail = cur
                 self.size -= 1
                 return self.size
                 
-            cur = cur.get_next()
+            cur = nxt
             
         return -1
         
     def find_data(self, d):
         
-        cur = self.get_head()
+        cur = self.head
         i = 0
         while cur:
-            if ( cur.get_data() == d ):
+            if ( cur.data == d ):
                 return i
             else:
                 i += 1
-            cur = cur.get_next()
+            cur = cur.next
         return -1
         
     def make_list(self):
         result = list()
-        cur = self.get_head()
+        append = result.append
+        cur = self.head
         while cur:
-            result.append( cur.get_data() )
-            cur = cur.get_next()
+            append( cur.data )
+            cur = cur.next
             
         return result
         
+    '''
+    Sort the list in place, stably, by relinking its nodes: a bottom-up
+    merge sort which merges neighbouring sublists of width 1, 2, 4...
+    in passes over the list. There is no recursion and no node or list
+    is allocated beyond one dummy head, so extra memory is O(1); time is
+    O(nlogn). Returns the list.
+    '''
+    def sort(self):
+        if( self.size < 2 ):
+            return self
+        
+        dummy = Node( None, self.head )
+        width = 1
+        while width < self.size:
+            tail = dummy
+            cur = dummy.next
+            while cur:
+                left = cur
+                right = LinkedList._split( left, width )
+                cur = LinkedList._split( right, width )
+                tail = LinkedList._merge_nodes( left, right, tail )
+            width *= 2
+        
+        self.head = dummy.next
+        self.tail = tail
+        return self
+        
+    '''
+    Natural merge sort: each pass cuts the list into its existing
+    ascending runs and merges them pairwise, so a list made of r runs
+    takes O(n log r) time, and an already sorted list is one O(n) pass.
+    Stable, in place and O(1) extra memory like sort(). Returns the list.
+    '''
+    def natural_sort(self):
+        if( self.size < 2 ):
+            return self
+        
+        dummy = Node( None, self.head )
+        runs = 2
+        while runs > 1:
+            runs = 0
+            tail = dummy
+            cur = dummy.next
+            while cur:
+                left = cur
+                right = LinkedList._cut_run( left )
+                cur = LinkedList._cut_run( right ) if right else None
+                tail = LinkedList._merge_nodes( left, right, tail )
+                runs += 1
+        
+        self.head = dummy.next
+        self.tail = tail
+        return self
+        
+    '''
+    Cut the chain starting at "head" after n nodes and return the rest
+    (None if the chain was not longer than n).
+    '''
+    @staticmethod
+    def _split( head, n ):
+        cur = head
+        for i in range( n - 1 ):
+            if( cur is None ):
+                return None
+            cur = cur.next
+        if( cur is None ):
+            return None
+        rest = cur.next
+        cur.next = None
+        return rest
+        
+    '''
+    Cut the chain starting at "head" after its first ascending run and
+    return the rest.
+    '''
+    @staticmethod
+    def _cut_run( head ):
+        cur = head
+        nxt = cur.next
+        while nxt and nxt.data >= cur.data:
+            cur = nxt
+            nxt = cur.next
+        cur.next = None
+        return nxt
+        
+    '''
+    Merge the sorted chains "a" and "b" after the node "tail". Ties take
+    the node from "a", which keeps the sort stable. Returns the last
+    node of the merged chain.
+    '''
+    @staticmethod
+    def _merge_nodes( a, b, tail ):
+        while a and b:
+            if( b.data < a.data ):
+                tail.next = b
+                b = b.next
+            else:
+                tail.next = a
+                a = a.next
+            tail = tail.next
+        
+        tail.next = a if a else b
+        while tail.next:
+            tail = tail.next
+        return tail
+        
     def make_tuple(self):
         return tuple( self.make_list() )
         
@@ -240,4 +382,5 @@ def main():
     print (ll4)
     print( id(ll1), id(ll4))
     
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
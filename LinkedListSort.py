@@ -0,0 +1,55 @@
+#!/usr/bin/python
+
+'''
+File: LinkedListSort.py
+Author: Nicholas Russo
+Description: This class extends Sort to run the in-place LinkedList
+sorts through the Worker harness. Jobs are parsed as usual, and each
+test gets its own LinkedList built from the job outside the timers, so
+the reports cover only the relinking of nodes. The sorted LinkedList is
+the result of each test. The work methods are prefixed with "linked_"
+so that they do not shadow the list sorts inherited from Sort.
+'''
+
+from LinkedList import LinkedList
+from Sort import Sort
+from Worker import Worker
+
+class LinkedListSort(Sort):
+
+    '''
+    Bottom-up merge sort of a LinkedList, relinking nodes in place.
+    '''
+    @staticmethod
+    @Worker.register
+    def linked_merge_sort( linked ):
+        return linked.sort()
+
+    '''
+    Natural-run merge sort of a LinkedList; one pass if already sorted.
+    '''
+    @staticmethod
+    @Worker.register
+    def linked_natural_merge_sort( linked ):
+        return linked.natural_sort()
+
+    '''
+    Constructor is a pass-through for Sort.
+    '''
+    def __init__(self, path, work_method, ifile_type=Worker.LINEAR):
+        Sort.__init__(self, path, work_method, ifile_type)
+
+    '''
+    Build a fresh LinkedList for every test. LinkedList jobs are cloned.
+    '''
+    def _copy_job(self, array):
+        if( isinstance( array, LinkedList ) ):
+            return array.clone()
+        return LinkedList( *array )
+
+    '''
+    The NumPy batch sorts work on lists, not LinkedLists, so a batch is
+    the same as run_suite().
+    '''
+    def run_batch(self, kind="quicksort"):
+        return self.run_suite()
@@ -0,0 +1,270 @@
+#!/usr/bin/python
+
+'''
+File: Loader.py
+Author: Nicholas Russo
+Description: This class loads linear (1d) jobs quickly. Text .input
+files are memory-mapped and parsed in large chunks rather than line by
+line. Adjacency matrices separated by MATRIX_SENTINEL lines are
+streamed one at a time into row-major buffers; matrices larger than
+MATRIX_MEMORY_LIMIT bytes are written out to a memory-mapped temporary
+file as they are parsed, so they never have to fit in RAM. A compact binary job
+format is also provided:
+
+    header:  8-byte magic "BALGJOBS", uint32 version, 4-byte typecode
+             ("i" for int32 or "q" for int64, space padded), uint64 rows
+    offsets: (rows + 1) int64 element offsets; row i spans
+             payload[offsets[i]:offsets[i+1]]
+    payload: packed native-endian integers of the given typecode
+
+Binary files are memory-mapped and every row is returned as a zero-copy
+memoryview (or NumPy view) of the payload. convert() turns an existing
+.input file into the binary format.
+'''
+
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class Loader:
+
+    MAGIC = b"BALGJOBS"
+    VERSION = 1
+    HEADER = struct.Struct( "=8sI4sQ" )
+
+    # Bytes of text handed to the parser at a time
+    CHUNK_SIZE = 64 * 1024 * 1024
+
+    # Line which ends one adjacency matrix in a graph .input file
+    MATRIX_SENTINEL = b"ZZZ"
+
+    # Bytes of matrix held in memory before the matrix is moved to a
+    #  memory-mapped temporary file
+    MATRIX_MEMORY_LIMIT = 64 * 1024 * 1024
+
+    INT32_MIN = -2**31
+    INT32_MAX = 2**31 - 1
+
+    '''
+    Yield one list of ints per non-blank line of a text .input file. The
+    file is memory-mapped and split into chunks of about CHUNK_SIZE bytes
+    which always end on a line boundary, so memory use is bounded by the
+    chunk size rather than the file size.
+    '''
+    @staticmethod
+    def iter_text( path, chunk_size=None ):
+        chunk_size = chunk_size or Loader.CHUNK_SIZE
+        with open( path, "rb" ) as handle:
+            if( os.fstat( handle.fileno() ).st_size == 0 ):
+                return
+
+            with mmap.mmap( handle.fileno(), 0, access=mmap.ACCESS_READ ) as mm:
+                start = 0
+                size = len( mm )
+                while( start < size ):
+                    end = min( start + chunk_size, size )
+
+                    # Extend to the end of the current line
+                    if( end < size ):
+                        newline = mm.find( b"\n", end )
+                        end = size if newline == -1 else newline + 1
+
+                    for line in mm[start:end].split( b"\n" ):
+                        tokens = line.split()
+                        if( tokens ):
+                            yield list( map( int, tokens ) )
+                    start = end
+
+    '''
+    Parse a whole text .input file into a list of int lists.
+    '''
+    @staticmethod
+    def parse_text( path, chunk_size=None ):
+        return list( Loader.iter_text( path, chunk_size ) )
+
+    '''
+    Yield (n, matrix) for every adjacency matrix in a graph .input file,
+    where matrix is the n x n matrix as a row-major int64 array.array, or
+    for matrices over MATRIX_MEMORY_LIMIT bytes an int64 memoryview of a
+    memory-mapped temporary file. Matrices are separated by
+    MATRIX_SENTINEL lines; blank lines are ignored. The file is read line
+    by line, so at most MATRIX_MEMORY_LIMIT bytes of the matrix being
+    parsed are held in memory. Raises ValueError for non-square input.
+    '''
+    @staticmethod
+    def iter_matrices( path ):
+        matrix = array( "q" )
+        spill = None
+        rows = 0
+        with open( path, "rb" ) as handle:
+            for line in handle:
+                tokens = line.split()
+                if( not tokens ):
+                    continue
+                
+                if( tokens[0] == Loader.MATRIX_SENTINEL ):
+                    if( rows > 0 ):
+                        yield Loader._check_square( path, rows, Loader._finish_matrix( matrix, spill ) )
+                    matrix = array( "q" )
+                    spill = None
+                    rows = 0
+                    continue
+                
+                matrix.extend( map( int, tokens ) )
+                rows += 1
+                
+                # Move what has been parsed so far out to the temporary file
+                if( len( matrix ) * matrix.itemsize >= Loader.MATRIX_MEMORY_LIMIT ):
+                    if( spill is None ):
+                        spill = tempfile.TemporaryFile()
+                    matrix.tofile( spill )
+                    del matrix[:]
+        
+        # The last matrix need not be followed by a sentinel
+        if( rows > 0 ):
+            yield Loader._check_square( path, rows, Loader._finish_matrix( matrix, spill ) )
+
+    '''
+    Return the parsed matrix: the buffer itself, or when part of it was
+    spilled, the rest appended to the temporary file and the file mapped
+    read-only. The file is anonymous, so its space is released once the
+    last view of the mapping is gone.
+    '''
+    @staticmethod
+    def _finish_matrix( matrix, spill ):
+        if( spill is None ):
+            return matrix
+        
+        matrix.tofile( spill )
+        spill.flush()
+        mm = mmap.mmap( spill.fileno(), 0, access=mmap.ACCESS_READ )
+        spill.close()
+        return memoryview( mm ).cast( "q" )
+
+    @staticmethod
+    def _check_square( path, rows, matrix ):
+        if( len( matrix ) != rows * rows ):
+            raise ValueError( "matrix with {0} rows is not square: {1}".format( rows, path ) )
+        return ( rows, matrix )
+
+    '''
+    Return "i" if every value fits in int32, otherwise "q".
+    '''
+    @staticmethod
+    def _typecode_for( low, high ):
+        if( low >= Loader.INT32_MIN and high <= Loader.INT32_MAX ):
+            return "i"
+        return "q"
+
+    '''
+    Write the header and offsets of a binary job file.
+    '''
+    @staticmethod
+    def _write_header( handle, typecode, offsets ):
+        handle.write( Loader.HEADER.pack( Loader.MAGIC, Loader.VERSION,
+            typecode.encode().ljust( 4 ), len( offsets ) - 1 ) )
+        handle.write( offsets.tobytes() )
+
+    '''
+    Write rows (sequences of ints) to a binary job file. The typecode is
+    chosen from the data unless given.
+    '''
+    @staticmethod
+    def write_binary( path, work_list, typecode=None ):
+        if( typecode is None ):
+            values = [v for row in work_list for v in row]
+            typecode = Loader._typecode_for( min( values, default=0 ), max( values, default=0 ) )
+
+        offsets = array( "q", [0] )
+        for row in work_list:
+            offsets.append( offsets[-1] + len( row ) )
+
+        with open( path, "wb" ) as handle:
+            Loader._write_header( handle, typecode, offsets )
+            for row in work_list:
+                handle.write( array( typecode, row ).tobytes() )
+
+    '''
+    Convert a text .input file into a binary job file. The text is read
+    twice, once to size the rows and once to write them, so the whole
+    input never has to be held in memory.
+    '''
+    @staticmethod
+    def convert( text_path, binary_path, typecode=None ):
+        offsets = array( "q", [0] )
+        low, high = 0, 0
+        for row in Loader.iter_text( text_path ):
+            offsets.append( offsets[-1] + len( row ) )
+            if( row ):
+                low = min( low, min( row ) )
+                high = max( high, max( row ) )
+
+        typecode = typecode or Loader._typecode_for( low, high )
+        with open( binary_path, "wb" ) as handle:
+            Loader._write_header( handle, typecode, offsets )
+            for row in Loader.iter_text( text_path ):
+                handle.write( array( typecode, row ).tobytes() )
+
+        return binary_path
+
+    '''
+    Memory-map a binary job file and return (mmap, typecode, offsets,
+    payload start). The caller owns the mmap.
+    '''
+    @staticmethod
+    def _map_binary( path ):
+        with open( path, "rb" ) as handle:
+            mm = mmap.mmap( handle.fileno(), 0, access=mmap.ACCESS_READ )
+
+        magic, version, typecode, rows = Loader.HEADER.unpack_from( mm, 0 )
+        if( magic != Loader.MAGIC or version != Loader.VERSION ):
+            mm.close()
+            raise ValueError( "not a version {0} job file: {1}".format( Loader.VERSION, path ) )
+
+        typecode = typecode.decode().strip()
+        start = Loader.HEADER.size
+        offsets = memoryview( mm )[start:start + 8 * ( rows + 1 )].cast( "q" )
+        return mm, typecode, offsets, start + 8 * ( rows + 1 )
+
+    '''
+    Load a binary job file as a list of memoryviews, one per row, all
+    pointing into the memory-mapped payload (no copies are made). The
+    mapping stays open for as long as any row view is alive.
+    '''
+    @staticmethod
+    def load_binary( path ):
+        mm, typecode, offsets, start = Loader._map_binary( path )
+        payload = memoryview( mm )[start:].cast( typecode )
+        return [payload[offsets[i]:offsets[i + 1]] for i in range( len( offsets ) - 1 )]
+
+    '''
+    Yield the rows of a binary job file one at a time as memoryviews.
+    Only the pages of rows actually touched are read from disk.
+    '''
+    @staticmethod
+    def iter_binary( path ):
+        mm, typecode, offsets, start = Loader._map_binary( path )
+        payload = memoryview( mm )[start:].cast( typecode )
+        for i in range( len( offsets ) - 1 ):
+            yield payload[offsets[i]:offsets[i + 1]]
+
+    '''
+    Load a binary job file as a list of read-only NumPy arrays viewing
+    the memory-mapped payload. Requires NumPy.
+    '''
+    @staticmethod
+    def load_binary_numpy( path ):
+        if( numpy is None ):
+            raise ImportError( "numpy is required for load_binary_numpy()" )
+
+        mm, typecode, offsets, start = Loader._map_binary( path )
+        dtype = numpy.int32 if typecode == "i" else numpy.int64
+        payload = numpy.frombuffer( mm, dtype=dtype, offset=start )
+        return [payload[offsets[i]:offsets[i + 1]] for i in range( len( offsets ) - 1 )]
@@ -0,0 +1,171 @@
+#!/usr/bin/python
+
+'''
+File: Parallel.py
+Author: Nicholas Russo
+Description: This class runs the (algorithm x job) matrix of a Worker
+suite across a process pool. Each child process parses the input file
+once, then runs chunks of jobs for one work method at a time and times
+every test locally. Results are merged back into one Worker object per
+work method, in job order, so the usual __str__ and getters apply.
+'''
+
+import math
+import multiprocessing
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Trace import Trace
+
+# Worker instance owned by each child process, built by _init_child()
+_child_worker = None
+
+'''
+Child process initializer. Optionally pins the process to one CPU
+taken from "cpu_queue", matches the parent's trace level, and parses
+the input file once for all tasks this process will run. Each task sets
+its own work method, so the worker is built without one.
+'''
+def _init_child( worker_class, path, worker_args, trace_level, cpu_queue ):
+    global _child_worker
+
+    if( cpu_queue is not None and hasattr( os, "sched_setaffinity" ) ):
+        os.sched_setaffinity( 0, { cpu_queue.get() } )
+
+    Trace.set_level( trace_level )
+    _child_worker = worker_class( path, None, *worker_args )
+
+'''
+Run one chunk of jobs with one work method inside a child process. The
+method is the name of a registered work method, or the work method
+itself (an object such as an ExternalSort, pickled by the parent).
+Returns a list of (job index, result, elapsed seconds, Stats or None,
+report or None).
+'''
+def _run_chunk( method, job_indices, benchmark ):
+    worker = _child_worker
+    if( isinstance( method, str ) ):
+        method = getattr( type( worker ), method )
+    worker.set_work_method( method )
+
+    output = list()
+    for j in job_indices:
+        array = worker.work_list[j]
+        if( benchmark is not None ):
+            result, stats = benchmark.measure( worker._run_test, lambda: worker._copy_job( array ) )
+            output.append( ( j, result, stats.median / 1e9, stats, _report( method ) ) )
+            continue
+
+        copy = worker._copy_job( array )
+        start = time.perf_counter()
+        result = worker._run_test( copy )
+        end = time.perf_counter()
+        output.append( ( j, result, end - start, None, _report( method ) ) )
+
+    return output
+
+def _report( method ):
+    return method.report() if hasattr( method, "report" ) else None
+
+class Parallel:
+
+    '''
+    Constructor stores the suite definition. "work_methods" defaults to
+    every registered work method of "worker_class". Registered methods
+    are found by name in the children; any other work method (such as a
+    Sort work method given to Pipeline, or an ExternalSort object) must
+    be picklable. Raises ValueError when there are no work methods and
+    TypeError for one which cannot be pickled, rather than failing in
+    the pool. "max_workers" defaults to the CPU count. With "pin_cpus",
+    each child is bound to its own CPU to reduce scheduler migrations
+    during timing.
+    '''
+    def __init__(self, worker_class, path, work_methods=None, worker_args=(),
+        max_workers=None, pin_cpus=False, benchmark=None, chunks_per_worker=4):
+
+        self.worker_class = worker_class
+        self.path = path
+        self.work_methods = work_methods or worker_class.get_work_methods()
+        if( not self.work_methods ):
+            raise ValueError( "no work methods given and {0} registers none".format( worker_class.__name__ ) )
+        for method in self.work_methods:
+            self._sendable( method )
+        self.worker_args = worker_args
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pin_cpus = pin_cpus
+        self.benchmark = benchmark
+        self.chunks_per_worker = chunks_per_worker
+
+    '''
+    Run the full matrix and return a list of Worker objects, one per
+    work method in the order given. Every Worker holds results and
+    timings in job order, exactly as a serial run_suite() would. The
+    suite start/end times are those of the whole parallel run. Only the
+    children hold the parsed jobs: the parent streams through the input
+    once to count them, and the Workers it returns have no work_list.
+    '''
+    def run(self):
+        workers = [self.worker_class( None, m, *self.worker_args ) for m in self.work_methods]
+        job_count = sum( 1 for job in workers[0]._iter_jobs( self.path ) )
+
+        # Split jobs into contiguous chunks; several per process balances load
+        chunk = max( 1, math.ceil( job_count / ( self.max_workers * self.chunks_per_worker ) ) )
+        chunks = [list( range( i, min( i + chunk, job_count ) ) ) for i in range( 0, job_count, chunk )]
+
+        cpu_queue = None
+        if( self.pin_cpus and hasattr( os, "sched_getaffinity" ) ):
+            cpu_queue = multiprocessing.Queue()
+            cpus = sorted( os.sched_getaffinity( 0 ) )
+            for i in range( self.max_workers ):
+                cpu_queue.put( cpus[i % len( cpus )] )
+
+        init_args = ( self.worker_class, self.path, self.worker_args, Trace.level, cpu_queue )
+        suite_start = time.perf_counter()
+        with ProcessPoolExecutor( self.max_workers, initializer=_init_child, initargs=init_args ) as pool:
+            futures = list()
+            for w, method in enumerate( self.work_methods ):
+                method = self._sendable( method )
+                for indices in chunks:
+                    futures.append( ( w, pool.submit( _run_chunk, method, indices, self.benchmark ) ) )
+
+            # Slots keep results in job order regardless of completion order
+            slots = [[None] * job_count for m in self.work_methods]
+            for w, future in futures:
+                for output in future.result():
+                    slots[w][output[0]] = output
+        suite_end = time.perf_counter()
+
+        for w, worker in enumerate( workers ):
+            worker.clear_all_history()
+            worker.suite_start_time = suite_start
+            worker.suite_end_time = suite_end
+            for j, result, elapsed, stats, report in slots[w]:
+                worker.result_list.append( result )
+                worker.test_start_times.append( 0 )
+                worker.test_end_times.append( elapsed )
+                if( stats is not None ):
+                    worker.test_stats.append( stats )
+                if( report is not None ):
+                    worker.test_reports.append( report )
+                worker.test_count += 1
+
+        return workers
+
+    '''
+    Return the form in which a work method is sent to the children:
+    registered methods of the worker class travel by name, and other
+    callables are pickled. Raises TypeError for a work method which
+    cannot be pickled, such as a lambda or a nested function.
+    '''
+    def _sendable(self, method):
+        name = getattr( method, "__name__", None )
+        if( name is not None and getattr( self.worker_class, name, None ) is method ):
+            return name
+        try:
+            pickle.dumps( method )
+        except ( pickle.PicklingError, AttributeError, TypeError ) as error:
+            raise TypeError( "work method {0!r} cannot be sent to child processes: {1}".format(
+                name or method, error ) )
+        return method
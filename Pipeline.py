@@ -0,0 +1,148 @@
+#!/usr/bin/python
+
+'''
+File: Pipeline.py
+Author: Nicholas Russo
+Description: This class extends Worker by chaining a sort and a batch
+of searches. Each job is sorted once with a Sort work method and the
+sorted form is cached, then every target is looked up against it. The
+lookups use a Search work method, or by default a single merge-style
+walk of the sorted targets against the array in O(n + k). Sort and
+search stages are timed separately. Further batches of targets can be
+answered with query() without sorting again.
+'''
+
+import time
+
+from Worker import Worker
+
+class Pipeline(Worker):
+
+    '''
+    Merge-style batch lookup. The targets are sorted (remembering their
+    original positions) and walked together with the sorted array, so
+    every target is resolved in one pass. Returns one index per target,
+    in the original target order: the first occurrence, or -1.
+    '''
+    @staticmethod
+    def merge_lookup( array, targets ):
+        order = sorted( range( len( targets ) ), key=targets.__getitem__ )
+        results = [-1] * len( targets )
+        n = len( array )
+        i = 0
+        for t in order:
+            target = targets[t]
+            while( i < n and array[i] < target ):
+                i += 1
+            if( i < n and array[i] == target ):
+                results[t] = i
+        return results
+
+    '''
+    Constructor adds the targets and an optional Search work method to
+    the Worker arguments. The work method given to Worker is the sort.
+    '''
+    def __init__(self, path, sort_method, targets, search_method=None, ifile_type=Worker.LINEAR):
+        Worker.__init__(self, path, sort_method, ifile_type)
+        self.targets = list( targets )
+        self.search_method = search_method
+
+    '''
+    Clear the per-stage times along with the parent's time history.
+    '''
+    def clear_time_history(self):
+        Worker.clear_time_history(self)
+        self.sort_times = list()
+        self.search_times = list()
+        self.query_times = list()
+
+    '''
+    Clear the cached sorted jobs along with the rest of the history.
+    '''
+    def clear_all_history(self):
+        Worker.clear_all_history(self)
+        self.sorted_jobs = list()
+
+    '''
+    Answer a new batch of targets against the jobs sorted by the last
+    run_suite(), without sorting again. Returns one list of indices per
+    job; the time spent on each job is appended to the query times.
+    '''
+    def query(self, targets):
+        results = list()
+        for array in self.sorted_jobs:
+            start = time.perf_counter()
+            results.append( self._lookup( array, targets ) )
+            self.query_times.append( time.perf_counter() - start )
+        return results
+
+    '''
+    Returns the sort stage time of each test, in seconds.
+    '''
+    def get_sort_times(self):
+        return self.sort_times
+
+    '''
+    Returns the search stage time of each test, in seconds.
+    '''
+    def get_search_times(self):
+        return self.search_times
+
+    '''
+    Returns the time spent on each job by query() calls, in seconds.
+    '''
+    def get_query_times(self):
+        return self.query_times
+
+    '''
+    Prepend the targets and search method, and append the stage totals,
+    to the parent's output. Stage times are only kept by tests run in
+    this process, so results gathered by Parallel show the test totals
+    alone.
+    '''
+    def __str__(self):
+        search = self.search_method.__name__ if self.search_method else "merge_lookup"
+        string = "Targets: {0} via {1}\n".format( len( self.targets ), search )
+        string += super().__str__()
+        if( not self.search_times ):
+            return string
+        lookups = max( 1, len( self.search_times ) * len( self.targets ) )
+        string += "\nSort stage: {0} us, search stage: {1} us ({2} us per lookup)".format(
+            sum( self.sort_times ) * Worker.MICRO, sum( self.search_times ) * Worker.MICRO,
+            sum( self.search_times ) * Worker.MICRO / lookups )
+        return string
+
+    '''
+    Tests record per-stage state besides their result, so they are never
+    answered from a result cache.
+    '''
+    def _result_key_extra(self):
+        return None
+
+    '''
+    Look every target up in one sorted array.
+    '''
+    def _lookup(self, array, targets):
+        if( self.search_method is None ):
+            return Pipeline.merge_lookup( array, targets )
+        return [self.search_method( array, target ) for target in targets]
+
+    '''
+    Sort the job once, cache it, then answer every target against it.
+    The result is the list of indices, one per target. When a Benchmark
+    repeats a test, the cache and stage times keep only the last run.
+    '''
+    def _run_test(self, array):
+        if ( array == None ):
+            raise ValueError ("Sanity failure: array was None")
+
+        start = time.perf_counter()
+        array = self.work_method( array ) or array
+        middle = time.perf_counter()
+        result = self._lookup( array, self.targets )
+        end = time.perf_counter()
+
+        self._store_for_test( self.sorted_jobs, array )
+        self._store_for_test( self.sort_times, middle - start )
+        self._store_for_test( self.search_times, end - middle )
+        return result
@@ -0,0 +1,215 @@
+#!/usr/bin/python
+
+'''
+File: ResultCache.py
+Author: Nicholas Russo
+Description: This class remembers the results of work methods so that
+re-running an identical suite skips the computation. Results are keyed
+on the algorithm identity (module, qualified name and a hash of the
+source of its module and of the project modules that module uses, so
+editing an algorithm, one of its helpers or a tuning constant
+invalidates its entries), a hash of the job content and any extra
+parts the worker adds, such as a search target. There are two tiers:
+an in-memory LRU holding up to max_entries results, and an optional
+on-disk tier of pickle files under a cache directory which is trimmed,
+least recently used first, once it exceeds disk_budget bytes. Results are copied on the way in and out of
+the memory tier, so callers may modify them freely. Attach a cache with
+Worker.set_result_cache().
+'''
+
+import copy
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+from array import array
+from collections import OrderedDict
+
+class ResultCache:
+
+    def __init__(self, max_entries=4096, directory=None, disk_budget=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.disk_budget = disk_budget
+        self.entries = OrderedDict()
+        self.identities = dict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_used = 0
+
+        if( directory is not None ):
+            os.makedirs( directory, exist_ok=True )
+            self.disk_used = self._trim_disk()
+
+    '''
+    Identify an algorithm by where it is defined and by a hash of the
+    source of its module plus every module from the same directory that
+    the module refers to (Heap.py for Sort.py, for example). Classes and
+    callable objects are identified by their class. Without source
+    (e.g. built-ins), the name alone is used.
+    '''
+    @staticmethod
+    def algorithm_identity( func ):
+        target = func if inspect.isroutine( func ) or inspect.isclass( func ) else type( func )
+        digest = hashlib.blake2b( digest_size=8 )
+        for module in ResultCache._source_modules( inspect.getmodule( target ) ):
+            try:
+                digest.update( inspect.getsource( module ).encode() )
+            except ( OSError, TypeError ):
+                pass
+        name = "{0}.{1}".format( getattr( target, "__module__", "" ),
+            getattr( target, "__qualname__", repr( target ) ) )
+        return name + ":" + digest.hexdigest()
+
+    '''
+    Return "module" followed by the modules defined in its directory
+    which it imports or takes names from, sorted by name. Returns an
+    empty list for modules without a source file.
+    '''
+    @staticmethod
+    def _source_modules( module ):
+        path = getattr( module, "__file__", None )
+        if( path is None ):
+            return list()
+
+        directory = os.path.dirname( os.path.abspath( path ) )
+        used = dict()
+        for value in vars( module ).values():
+            other = value if inspect.ismodule( value ) else sys.modules.get( getattr( value, "__module__", None ) )
+            other_path = getattr( other, "__file__", None )
+            if( other is not module and other_path is not None and
+                os.path.dirname( os.path.abspath( other_path ) ) == directory ):
+                used[other.__name__] = other
+        return [module] + [used[name] for name in sorted( used )]
+
+    '''
+    Hash the content of one job. Integer jobs are packed as int64 (so a
+    list and a memoryview of the same values hash alike); jobs which are
+    not sequences (such as graphs) hash their tobytes(), and anything
+    else falls back to its repr.
+    '''
+    @staticmethod
+    def content_hash( job ):
+        try:
+            data = array( "q", job ).tobytes()
+        except ( TypeError, OverflowError ):
+            if( hasattr( job, "tobytes" ) ):
+                data = job.tobytes()
+            else:
+                data = repr( list( job ) ).encode()
+        return hashlib.blake2b( data, digest_size=16 ).hexdigest()
+
+    '''
+    Build the key for running "func" on "job". The identity of each
+    function is computed once, since reading its source is slow.
+    '''
+    def key(self, func, job, extra=()):
+        identity = self.identities.get( func )
+        if( identity is None ):
+            identity = ResultCache.algorithm_identity( func )
+            self.identities[func] = identity
+        parts = "{0}|{1}|{2!r}".format( identity, ResultCache.content_hash( job ), extra )
+        return hashlib.blake2b( parts.encode(), digest_size=20 ).hexdigest()
+
+    '''
+    Return (True, result) for a cached key, or (False, None). Results
+    found on disk are promoted into the memory tier. Every hit returns a
+    fresh copy of the result.
+    '''
+    def get(self, key):
+        if( key in self.entries ):
+            self.entries.move_to_end( key )
+            self.hits += 1
+            return True, copy.deepcopy( self.entries[key] )
+
+        path = self._path( key )
+        if( path is not None and os.path.isfile( path ) ):
+            try:
+                with open( path, "rb" ) as handle:
+                    result = pickle.load( handle )
+            except ( OSError, EOFError, pickle.UnpicklingError ):
+                self.misses += 1
+                return False, None
+
+            # Touch the file so that disk eviction sees it as recently used
+            os.utime( path )
+            self._remember( key, copy.deepcopy( result ) )
+            self.hits += 1
+            self.disk_hits += 1
+            return True, result
+
+        self.misses += 1
+        return False, None
+
+    '''
+    Store a copy of a result in memory and, when a directory is set, on
+    disk.
+    '''
+    def put(self, key, result):
+        self._remember( key, copy.deepcopy( result ) )
+        path = self._path( key )
+        if( path is None ):
+            return
+
+        # Write to a temporary name first so readers never see half a file;
+        #  an overwritten entry no longer counts toward the disk budget
+        old_size = os.path.getsize( path ) if os.path.isfile( path ) else 0
+        temp = path + ".tmp"
+        with open( temp, "wb" ) as handle:
+            pickle.dump( result, handle, protocol=pickle.HIGHEST_PROTOCOL )
+        os.replace( temp, path )
+        self.disk_used += os.path.getsize( path ) - old_size
+        if( self.disk_used > self.disk_budget ):
+            self.disk_used = self._trim_disk()
+
+    '''
+    Forget every cached result, in memory and on disk.
+    '''
+    def clear(self):
+        self.entries.clear()
+        if( self.directory is not None ):
+            for name in os.listdir( self.directory ):
+                if( name.endswith( ".pkl" ) ):
+                    os.remove( os.path.join( self.directory, name ) )
+            self.disk_used = 0
+
+    def __str__(self):
+        return "Result cache: {0} hits ({1} from disk), {2} misses".format(
+            self.hits, self.disk_hits, self.misses )
+
+    '''
+    Add a result to the memory tier, evicting the least recently used.
+    '''
+    def _remember(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end( key )
+        while( len( self.entries ) > self.max_entries ):
+            self.entries.popitem( last=False )
+
+    def _path(self, key):
+        if( self.directory is None ):
+            return None
+        return os.path.join( self.directory, key + ".pkl" )
+
+    '''
+    Delete the least recently used files until the disk tier fits
+    within disk_budget bytes. Returns the bytes left in use.
+    '''
+    def _trim_disk(self):
+        files = list()
+        total = 0
+        for entry in os.scandir( self.directory ):
+            if( entry.name.endswith( ".pkl" ) ):
+                stat = entry.stat()
+                files.append( ( stat.st_mtime, stat.st_size, entry.path ) )
+                total += stat.st_size
+
+        files.sort()
+        for mtime, size, path in files:
+            if( total <= self.disk_budget ):
+                break
+            os.remove( path )
+            total -= size
+        return total
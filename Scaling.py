@@ -0,0 +1,256 @@
+#!/usr/bin/python
+
+'''
+File: Scaling.py
+Author: Nicholas Russo
+Description: This class measures how the registered work methods of a
+Worker subclass scale with input size. Inputs are produced by
+InputGenerator at geometric sizes, written to temporary .input files,
+and run through the normal Worker/Benchmark path. Measured medians are
+fitted against constant, logn, n, nlogn and n^2 cost models (or
+reported as inconclusive when the timings do not single one out), and
+can be compared with a saved baseline to flag regressions. Tracing is
+turned off for the duration of a run.
+'''
+
+import json
+import math
+import os
+import tempfile
+
+from Benchmark import Benchmark
+from InputGenerator import InputGenerator
+from Trace import Trace
+
+class Scaling:
+
+    # Cost models available for fitting, as functions of n, cheapest first
+    MODELS = [
+        ( "1", lambda n: 1 ),
+        ( "logn", lambda n: math.log2( n ) ),
+        ( "n", lambda n: n ),
+        ( "nlogn", lambda n: n * math.log2( n ) ),
+        ( "n^2", lambda n: n * n ),
+        ]
+
+    # Fastest runs are batched so that every timing sample lasts at least
+    #  this many seconds; without it, microsecond searches are fitted to
+    #  clock noise and the reported model changes from run to run
+    MIN_SAMPLE_TIME = 0.001
+
+    # A cheaper model is reported when its relative RMS error is within
+    #  this much of the best fit; every model nests the constant one, so
+    #  the costlier fits are never worse and must earn their place
+    FIT_SLACK = 0.02
+
+    # A fit is reported as INCONCLUSIVE when its relative RMS error
+    #  exceeds FIT_NOISE, or when a model outside FIT_SLACK of it has
+    #  less than FIT_GAP times its error: the timings then do not single
+    #  out a model (noise, or cache effects on fast searches)
+    FIT_NOISE = 0.10
+    FIT_GAP = 2.0
+    INCONCLUSIVE = "inconclusive"
+
+    '''
+    Constructor stores the suite definition. "worker_class" is Sort,
+    Search, or any other Worker subclass; its registered work methods
+    are measured unless "work_methods" narrows the list. "worker_args"
+    are passed to the constructor after the work method (the target for
+    Search, for example). An algorithm stops growing once one median
+    exceeds "time_budget" seconds, which keeps the O(n^2) sorts from
+    running for hours on 10^7 elements. The default Benchmark batches
+    runs into samples of at least MIN_SAMPLE_TIME.
+    '''
+    def __init__(self, worker_class, distributions=None, sizes=None, seed=0,
+        time_budget=1.0, benchmark=None, work_methods=None, worker_args=()):
+
+        self.worker_class = worker_class
+        self.distributions = distributions or InputGenerator.DISTRIBUTIONS
+        self.sizes = sizes or InputGenerator.sizes()
+        self.seed = seed
+        self.time_budget = time_budget
+        self.benchmark = benchmark or Benchmark( warmup=1, min_repeats=3,
+            max_repeats=50, confidence=0.05, max_time=time_budget,
+            min_sample_time=Scaling.MIN_SAMPLE_TIME )
+        self.work_methods = work_methods or worker_class.get_work_methods()
+        self.worker_args = worker_args
+
+        # results[algorithm][distribution] = [(n, median_ns), ...]
+        self.results = dict()
+
+        # (algorithm, distribution, n) triples which hit the recursion limit
+        self.failures = list()
+
+    '''
+    Run every algorithm against every distribution and size. Each
+    generated input is written once and shared by all algorithms. The
+    trace level is restored afterwards.
+    '''
+    def run(self):
+        level = Trace.level
+        Trace.set_level( Trace.OFF )
+        try:
+            return self._run()
+        finally:
+            Trace.set_level( level )
+
+    def _run(self):
+        self.results = dict()
+        self.failures = list()
+        for method in self.work_methods:
+            self.results[method.__name__] = dict()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for dist in self.distributions:
+                active = list( self.work_methods )
+
+                for n in self.sizes:
+                    if( len( active ) == 0 ):
+                        break
+
+                    path = os.path.join( tmpdir, "{0}_{1}.input".format( dist, n ) )
+                    InputGenerator.write_generated( path, dist, n, seed=self.seed )
+
+                    for method in list( active ):
+                        worker = self.worker_class( path, method, *self.worker_args )
+
+                        # Deep recursion (quick_sort on sorted input, for example)
+                        #  ends the algorithm's run for this distribution
+                        try:
+                            worker.run_suite( self.benchmark )
+                        except RecursionError:
+                            self.failures.append( ( method.__name__, dist, n ) )
+                            active.remove( method )
+                            continue
+
+                        median = worker.get_test_stats()[0].median
+                        self.results[method.__name__].setdefault( dist, list() ).append( ( n, median ) )
+
+                        # Too slow to keep growing; drop it for this distribution
+                        if( median / 1e9 > self.time_budget ):
+                            active.remove( method )
+
+                    os.remove( path )
+
+        return self.results
+
+    '''
+    Fit (n, time) points to each cost model using least squares on
+    time = a + c * f(n), weighting each point by 1/time^2 so that small
+    and large sizes count equally; the constant model is time = a.
+    Returns (model name, c, error) where the error is the RMS residual
+    relative to measured time, for the cheapest model within FIT_SLACK
+    of the best error. When the best error exceeds FIT_NOISE, or the
+    runner-up model is within FIT_GAP of it, the model name is
+    INCONCLUSIVE and c is 0; so it is for two points, which every model
+    fits exactly.
+    '''
+    @staticmethod
+    def fit( points ):
+        if( len( points ) < 2 ):
+            return ( None, 0.0, 0.0 )
+
+        # Every model passes exactly through two points
+        if( len( points ) == 2 ):
+            return ( Scaling.INCONCLUSIVE, 0.0, 0.0 )
+
+        fitted = list()
+        for name, model in Scaling.MODELS:
+            xs = [model( max( n, 2 ) ) for n, t in points]
+            ts = [max( t, 1 ) for n, t in points]
+            ws = [1.0 / ( t * t ) for t in ts]
+            sw = sum( ws )
+            mx = sum( w * x for w, x in zip( ws, xs ) ) / sw
+            mt = sum( w * t for w, t in zip( ws, ts ) ) / sw
+            sxx = sum( w * ( x - mx ) ** 2 for w, x in zip( ws, xs ) )
+            if( sxx == 0 ):
+                a, c = mt, 0.0
+            else:
+                c = sum( w * ( x - mx ) * ( t - mt ) for w, x, t in zip( ws, xs, ts ) ) / sxx
+                a = mt - c * mx
+
+                # Negative growth is meaningless here; skip that model
+                if( c <= 0 ):
+                    continue
+
+            error = math.sqrt( sum( ( ( a + c * x - t ) / t ) ** 2 for x, t in zip( xs, ts ) ) / len( xs ) )
+            fitted.append( ( name, c, error ) )
+
+        best = min( error for name, c, error in fitted )
+        others = [error for name, c, error in fitted if error > best + Scaling.FIT_SLACK]
+        if( best > Scaling.FIT_NOISE or ( others and min( others ) < best * Scaling.FIT_GAP ) ):
+            return ( Scaling.INCONCLUSIVE, 0.0, best )
+        for name, c, error in fitted:
+            if( error <= best + Scaling.FIT_SLACK ):
+                return ( name, c, error )
+
+    '''
+    Return {algorithm: {distribution: (model, c, error)}} for the last run.
+    '''
+    def fits(self):
+        fitted = dict()
+        for alg, dists in self.results.items():
+            fitted[alg] = dict()
+            for dist, points in dists.items():
+                fitted[alg][dist] = Scaling.fit( points )
+        return fitted
+
+    '''
+    Write the last run to a JSON baseline file for later comparison.
+    '''
+    def save(self, path):
+        with open( path, "w" ) as handle:
+            json.dump( self.results, handle, indent=1 )
+
+    '''
+    Compare the last run with a baseline file written by save(). A
+    regression is any (algorithm, distribution, n) whose median grew
+    by more than "tolerance", or whose fitted model became a costlier
+    one (inconclusive fits are not compared). Returns a list of
+    human-readable regression lines.
+    '''
+    def regressions(self, baseline_path, tolerance=0.10):
+        with open( baseline_path ) as handle:
+            baseline = json.load( handle )
+
+        names = [name for name, model in Scaling.MODELS]
+        flagged = list()
+        for alg, dists in self.results.items():
+            for dist, points in dists.items():
+                old_points = baseline.get( alg, dict() ).get( dist )
+                if( not old_points ):
+                    continue
+
+                old_times = dict( ( int( n ), t ) for n, t in old_points )
+                for n, t in points:
+                    old = old_times.get( n )
+                    if( old and t > old * ( 1 + tolerance ) ):
+                        flagged.append( "{0} {1} n={2}: {3:.1f} us -> {4:.1f} us (+{5:.0f}%)".format(
+                            alg, dist, n, old / 1000, t / 1000, ( t / old - 1 ) * 100 ) )
+
+                old_model = Scaling.fit( [( int( n ), t ) for n, t in old_points] )[0]
+                new_model = Scaling.fit( points )[0]
+                if( old_model in names and new_model in names and
+                    names.index( new_model ) > names.index( old_model ) ):
+                    flagged.append( "{0} {1}: complexity {2} -> {3}".format(
+                        alg, dist, old_model, new_model ) )
+
+        return flagged
+
+    '''
+    Return a string with one line per (algorithm, distribution) giving
+    the largest size reached, its median, and the fitted model.
+    '''
+    def __str__(self):
+        string = "Scaling: {0}\n".format( self.worker_class.__name__ )
+        fitted = self.fits()
+        for alg, dists in self.results.items():
+            string += "Algorithm: {0}\n".format( alg )
+            for dist, points in dists.items():
+                n, t = points[-1]
+                model, c, error = fitted[alg][dist]
+                string += "  {0}: up to n={1} in {2:.1f} us, fits {3} (err {4:.1f}%)\n".format(
+                    dist, n, t / 1000, model, error * 100 )
+        for alg, dist, n in self.failures:
+            string += "Failed: {0} {1} n={2} (recursion limit)\n".format( alg, dist, n )
+        return string.rstrip( "\n" )
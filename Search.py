@@ -8,9 +8,15 @@ used for searching. It defines several static methods which can
 be passed to the constructor for execution during a test series.
 '''
 
+import time
+from bisect import bisect_left, bisect_right
+
 from Worker import Worker
+from Trace import Trace
+from Vectorized import Vectorized
 eprint = Worker.eprint
 
+@Trace.traceable
 class Search(Worker):
    
     '''
@@ -19,9 +25,10 @@ class Search(Worker):
     state of the array.
     '''
     @staticmethod
+    @Worker.register
     def linear_search( array, target ):
         
-        eprint("** starting linear_search **")
+        eprint("** starting linear_search **", level=Trace.INFO)
         
         # Iterate over the list front to back
         for i in range(len(array)):
@@ -29,59 +36,182 @@ class Search(Worker):
             # If we find the element, return the array index
             if( array[i] == target ):
                 eprint("found target at index {0}".format(i))
-                eprint("** ending linear_search **")
+                eprint("** ending linear_search **", level=Trace.INFO)
                 return i
         
         # Element not found, return -1
         eprint("target not found, returning -1")
-        eprint("** ending linear_search **")
+        eprint("** ending linear_search **", level=Trace.INFO)
         return -1
     
     '''
-    Recursively divide the array into halves to quickly find the
+    Repeatedly divide the array into halves to quickly find the
     target value. This algorithm ONLY works on sorted arrays.
     The input must be sorted from smallest to largest or else
     the algorithm will not return the correct value. This method
     does not test for sorted-ness as this defeats the purpose of
-    having an efficient search algorithm in the first place.
+    having an efficient search algorithm in the first place. The
+    window [left, right] shrinks in a loop rather than by recursion,
+    so there is no call overhead or stack depth per step.
     '''
     @staticmethod    
-    def binary_search( array, target, left=0, right=-1 ):
+    @Worker.register
+    def binary_search( array, target, left=0, right=None ):
         
-        # Need to initialize the right boundary, but only once
-        #  Would have been cool to use "right=len(array)-1 in the method line
-        #  but this technique is not supported
-        if( right == -1 ):       
-            eprint("** starting binary_search **")
+        # None is the marker for "end of the array" because -1 is also a
+        #  legitimate right boundary once the search moves left of index 0
+        #  (a target smaller than every element).
+        eprint("** starting binary_search **", level=Trace.INFO)
+        if( right is None ):       
             right = len(array) - 1
-            
-        # Compute the middle index by finding the midpoint between
-        #  left and right limits, and removing any floating point   
-        middle = int((left+right)/2)
-        eprint("invoked binary_search. l={0}, r={1}, m={2}".format(left, right, middle))
         
-        # The element was not found; prevent infinite recursio
-        if( left > right ):
-            eprint("base case; target not found, returning -1")
-            eprint("** ending binary_search **")
-            return -1
-            
-        # If array[middle] is less than the target, go right
-        elif( array[middle] < target ):
-            eprint("move right; a[m] ({0}) < t ({1})".format(array[middle], target))
-            return Search.binary_search( array, target, middle + 1, right)
+        # The element is not found once the window is empty
+        while( left <= right ):
             
-        # If array[middle] is greater than the target, go left
-        elif( array[middle] > target ):
-            eprint("move left; a[m] ({0}) > t ({1})".format(array[middle], target))
-            return Search.binary_search( array, target, left, middle - 1)
+            # Compute the middle index by finding the midpoint between
+            #  left and right limits using integer division   
+            middle = (left + right) // 2
+            eprint("binary_search window l={0}, r={1}, m={2}".format(left, right, middle))
             
-        # We must have found the proper value
-        else:
-            eprint( "found target at index {0}".format( middle ))
-            eprint("** ending binary_search **")
-            return middle 
+            # If array[middle] is less than the target, go right
+            if( array[middle] < target ):
+                eprint("move right; a[m] ({0}) < t ({1})".format(array[middle], target))
+                left = middle + 1
+                
+            # If array[middle] is greater than the target, go left
+            elif( array[middle] > target ):
+                eprint("move left; a[m] ({0}) > t ({1})".format(array[middle], target))
+                right = middle - 1
+                
+            # We must have found the proper value
+            else:
+                eprint( "found target at index {0}".format( middle ))
+                eprint("** ending binary_search **", level=Trace.INFO)
+                return middle 
+        
+        eprint("window empty; target not found, returning -1")
+        eprint("** ending binary_search **", level=Trace.INFO)
+        return -1
     
+    '''
+    Iteratively find the FIRST index of the target in a sorted array,
+    or -1. The lower bound (the first position whose value is not less
+    than the target) is found with the C-implemented bisect module, so
+    there is no Python-level recursion or per-step overhead.
+    '''
+    @staticmethod
+    @Worker.register
+    def lower_bound( array, target ):
+        i = bisect_left( array, target )
+        if( i < len(array) and array[i] == target ):
+            return i
+        return -1
+
+    '''
+    Iteratively find the LAST index of the target in a sorted array, or
+    -1. The upper bound is the first position whose value is greater
+    than the target; the last match is just before it.
+    '''
+    @staticmethod
+    @Worker.register
+    def upper_bound( array, target ):
+        i = bisect_right( array, target )
+        if( i > 0 and array[i - 1] == target ):
+            return i - 1
+        return -1
+
+    '''
+    Find the range of indices holding the target in a sorted array with
+    two O(logn) searches. Returns (first, last + 1), so the number of
+    occurrences is the difference of the two. When the target is absent
+    the range is empty, (i, i), where i is the position at which it
+    would be inserted.
+    '''
+    @staticmethod
+    @Worker.register
+    def equal_range( array, target ):
+        low = bisect_left( array, target )
+        if( low == len(array) or array[low] != target ):
+            return ( low, low )
+        return ( low, bisect_right( array, target, low ) )
+
+    '''
+    Binary search written to avoid data-dependent branches. The window
+    [base, base + n] always contains the lower bound; each step halves n
+    and advances base by half the window only when the probe is smaller
+    than the target, using the comparison result (0 or 1) as a multiplier
+    instead of an if/else. The loop always runs log2(n) times. Returns the
+    first index of the target, or -1.
+    '''
+    @staticmethod
+    @Worker.register
+    def branchless_search( array, target ):
+        n = len(array)
+        if( n == 0 ):
+            return -1
+
+        base = 0
+        while( n > 1 ):
+            half = n // 2
+            base += half * ( array[base + half] < target )
+            n -= half
+        eprint("branchless_search settled on base={0}".format(base), level=Trace.INFO)
+
+        base += array[base] < target
+        if( base < len(array) and array[base] == target ):
+            return base
+        return -1
+
+    '''
+    Exponential (galloping) search for targets near the front of a sorted
+    array. The probe index doubles (1, 2, 4, 8...) until it passes the
+    target, then the bracketed range is bisected. Costs O(log i) where i
+    is the target's position, instead of O(log n). Returns the first
+    index of the target, or -1.
+    '''
+    @staticmethod
+    @Worker.register
+    def exponential_search( array, target ):
+        n = len(array)
+        if( n == 0 ):
+            return -1
+
+        bound = 1
+        while( bound < n and array[bound] < target ):
+            bound *= 2
+        eprint("exponential_search bracketed {0},{1}".format(bound // 2, min(bound + 1, n)), level=Trace.INFO)
+
+        i = bisect_left( array, target, bound // 2, min( bound + 1, n ) )
+        if( i < n and array[i] == target ):
+            return i
+        return -1
+
+    '''
+    Interpolation search for sorted integer arrays with roughly uniform
+    values. Instead of the midpoint, each probe is placed where the target
+    would be if values rose linearly between the window's end points,
+    which takes O(loglogn) probes on uniform data (O(n) when skewed).
+    Returns an index of the target (not necessarily the first), or -1.
+    '''
+    @staticmethod
+    @Worker.register
+    def interpolation_search( array, target ):
+        low, high = 0, len(array) - 1
+        while( low <= high and array[low] <= target <= array[high] ):
+            if( array[high] == array[low] ):
+                return low
+
+            # Integer-only probe position; no floating point division
+            probe = low + ( target - array[low] ) * ( high - low ) // ( array[high] - array[low] )
+            eprint("interpolation probe l={0}, r={1}, p={2}".format(low, high, probe))
+            if( array[probe] < target ):
+                low = probe + 1
+            elif( array[probe] > target ):
+                high = probe - 1
+            else:
+                return probe
+        return -1
+
     '''
     Constructor is a pass-through for Worker with the exception of
     adding a target. This "target" is the value that the search
@@ -100,6 +230,25 @@ class Search(Worker):
         return string + super().__str__()
 
 
+    '''
+    Search every job for the target with one vectorized searchsorted()
+    call and store one index per job in result_list. Like binary_search(),
+    this requires sorted jobs; the index returned is the first occurrence.
+    Without NumPy, or when a value does not fit in int64, this is the
+    same as run_suite() with the current work method.
+    '''
+    def run_batch(self):
+        if( not Vectorized.available() ):
+            return self.run_suite()
+        
+        start = time.perf_counter()
+        try:
+            results = Vectorized.search_rows( self.work_list, self.target )
+        except OverflowError:
+            # Some value does not fit in int64; only the Python path can run it
+            return self.run_suite()
+        self._record_batch( results, start, time.perf_counter() )
+
     '''
     Test the array for nonexistence. If it is valid, run the
     selected work method to find the target value
@@ -108,4 +257,10 @@ class Search(Worker):
         if ( array == None ):
             return -1
         return self.work_method( array, self.target )
+
+    '''
+    Search results also depend on the target.
+    '''
+    def _result_key_extra(self):
+        return ( self.target, )
         
\ No newline at end of file
@@ -0,0 +1,255 @@
+#!/usr/bin/python
+
+'''
+File: SearchIndex.py
+Author: Nicholas Russo
+Description: This file defines prebuilt search indexes over a sorted
+array. Each index class is constructed once per array (the build stage)
+and then answers query(target) as many times as needed (the query
+stage), returning the first index of the target in the original array
+or -1. The classes can be passed to IndexedSearch as its work method.
+EytzingerIndex, FenceIndex and BloomIndex require sorted arrays;
+HashIndex works on unsorted ones. IndexCache keeps built indexes across
+runs within a memory budget, keyed on the job's content, so
+memory_size() counts the objects an index holds, not only its
+containers.
+'''
+
+import math
+import sys
+from bisect import bisect_left
+from collections import OrderedDict
+
+'''
+Size in bytes of a container plus the objects it holds, for the
+memory_size() of the indexes. The items are not followed further.
+'''
+def _deep_size( container ):
+    return sys.getsizeof( container ) + sum( map( sys.getsizeof, container ) )
+
+'''
+Eytzinger (BFS order) layout of a sorted array. Slot 1 holds the root
+of an implicit binary search tree, and the children of slot k are slots
+2k and 2k+1, so the first levels of every search touch the same few
+slots at the front of the list, and the next probe is computed rather
+than branched to. Building is O(n); queries are O(logn).
+'''
+class EytzingerIndex:
+
+    def __init__(self, array):
+        n = len( array )
+        self.n = n
+        self.keys = [None] * ( n + 1 )
+        self.positions = [0] * ( n + 1 )
+
+        # In-order walk of the implicit tree assigns the sorted values
+        #  to slots in ascending order; done with a stack, not recursion
+        stack = list()
+        k = 1
+        i = 0
+        while( stack or k <= n ):
+            while( k <= n ):
+                stack.append( k )
+                k = 2 * k
+            k = stack.pop()
+            self.keys[k] = array[i]
+            self.positions[k] = i
+            i += 1
+            k = 2 * k + 1
+
+    '''
+    Descend the tree, going right whenever the key is smaller than the
+    target. The final slot encodes the whole path; shifting off its
+    trailing ones (right turns) and one more bit recovers the last left
+    turn, which is the lower bound.
+    '''
+    def query(self, target):
+        keys = self.keys
+        n = self.n
+        k = 1
+        while( k <= n ):
+            k = 2 * k + ( keys[k] < target )
+        k >>= ( ~k & ( k + 1 ) ).bit_length()
+
+        if( k == 0 or keys[k] != target ):
+            return -1
+        return self.positions[k]
+
+    def memory_size(self):
+        return _deep_size( self.keys ) + _deep_size( self.positions )
+
+'''
+Sparse fence-pointer index. Only the first key of every block of
+BLOCK_SIZE elements is kept in memory; a query bisects the fences to
+pick one block and then bisects inside that block. The array itself is
+not copied, so it may be a memory-mapped view (see Loader) much larger
+than the fences. Building is O(n / BLOCK_SIZE); queries are O(logn).
+'''
+class FenceIndex:
+
+    BLOCK_SIZE = 64
+
+    def __init__(self, array, block_size=None):
+        self.array = array
+        self.block = block_size or FenceIndex.BLOCK_SIZE
+        self.fences = [array[i] for i in range( 0, len( array ), self.block )]
+
+    '''
+    The lower bound lies after the last fence smaller than the target and
+    no later than the first fence not smaller than it.
+    '''
+    def query(self, target):
+        b = bisect_left( self.fences, target )
+        low = ( b - 1 ) * self.block if b > 0 else 0
+        high = min( b * self.block, len( self.array ) )
+        i = bisect_left( self.array, target, low, high )
+
+        if( i < len( self.array ) and self.array[i] == target ):
+            return i
+        return -1
+
+    def memory_size(self):
+        return _deep_size( self.fences )
+
+'''
+Hash index mapping each value to the index of its first occurrence.
+Works on unsorted arrays. Building is O(n); queries are O(1) on average,
+at the cost of a dictionary entry per distinct value.
+'''
+class HashIndex:
+
+    def __init__(self, array):
+        first = dict()
+        for i in range( len( array ) - 1, -1, -1 ):
+            first[array[i]] = i
+        self.first = first
+
+    def query(self, target):
+        return self.first.get( target, -1 )
+
+    def memory_size(self):
+        return _deep_size( self.first ) + _deep_size( self.first.values() )
+
+'''
+Bloom filter: a bit array in which every added value sets "hashes"
+bits. A value whose bits are not all set was definitely never added; a
+value whose bits are all set was probably added (false positives occur
+at a rate set by bits_per_item, about 1% at 10 bits).
+'''
+class BloomFilter:
+
+    def __init__(self, capacity, bits_per_item=10):
+        self.size = max( 8, capacity * bits_per_item )
+        self.bits = bytearray( ( self.size + 7 ) // 8 )
+        self.hashes = max( 1, round( bits_per_item * math.log( 2 ) ) )
+
+    '''
+    Bit positions for a value, by double hashing: the two halves of one
+    well-mixed 64-bit hash give h1 + i*h2 for i in 0..hashes-1.
+    '''
+    def _positions(self, value):
+        h = hash( ( value, ) ) & 0xFFFFFFFFFFFFFFFF
+        h1 = h & 0xFFFFFFFF
+        h2 = ( h >> 32 ) | 1
+        return [( h1 + i * h2 ) % self.size for i in range( self.hashes )]
+
+    def add(self, value):
+        for p in self._positions( value ):
+            self.bits[p >> 3] |= 1 << ( p & 7 )
+
+    '''
+    Same positions as _positions(), computed one at a time: about half
+    the bits of a well-sized filter are clear, so a value which was
+    never added is usually rejected on the first or second probe.
+    '''
+    def might_contain(self, value):
+        h = hash( ( value, ) ) & 0xFFFFFFFFFFFFFFFF
+        p = h & 0xFFFFFFFF
+        step = ( h >> 32 ) | 1
+        bits, size = self.bits, self.size
+        for i in range( self.hashes ):
+            q = p % size
+            if( not bits[q >> 3] & ( 1 << ( q & 7 ) ) ):
+                return False
+            p += step
+        return True
+
+    def memory_size(self):
+        return sys.getsizeof( self.bits )
+
+'''
+Bloom filter in front of a sorted array, for arrays which are mostly
+queried for values they do not contain. Only the filter's bits are kept
+in memory (bits_per_item per element, about 1% false positives at 10);
+like FenceIndex, the array is not copied and may be memory-mapped. A
+miss is usually rejected from a bit or two without touching the array,
+and only a "maybe" answer pays for a binary search of it. Building is
+O(n); queries are O(1) for rejected targets and O(logn) otherwise.
+'''
+class BloomIndex:
+
+    BITS_PER_ITEM = 10
+
+    def __init__(self, array, bits_per_item=None):
+        self.array = array
+        self.filter = BloomFilter( len( array ), bits_per_item or BloomIndex.BITS_PER_ITEM )
+        for value in array:
+            self.filter.add( value )
+
+    def query(self, target):
+        if( not self.filter.might_contain( target ) ):
+            return -1
+        i = bisect_left( self.array, target )
+        if( i < len( self.array ) and self.array[i] == target ):
+            return i
+        return -1
+
+    def memory_size(self):
+        return self.filter.memory_size()
+
+'''
+Least-recently-used cache of built indexes, keyed by the caller (see
+IndexedSearch, which uses the index class and the job's content hash so
+that one cache can be shared between files). Indexes are
+built only when a job is first queried; once the total memory_size() of
+the cached indexes would exceed memory_budget bytes, the least recently
+used ones are evicted.
+'''
+class IndexCache:
+
+    def __init__(self, memory_budget=64 * 1024 * 1024):
+        self.memory_budget = memory_budget
+        self.entries = OrderedDict()
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    '''
+    Return the cached index for "key", or build it with factory() on a
+    miss. Returns (index, built) so callers can time builds separately.
+    '''
+    def get_or_build(self, key, factory):
+        entry = self.entries.get( key )
+        if( entry is not None ):
+            self.entries.move_to_end( key )
+            self.hits += 1
+            return entry[0], False
+
+        self.misses += 1
+        index = factory()
+        size = index.memory_size()
+        while( self.entries and self.used + size > self.memory_budget ):
+            old_index, old_size = self.entries.popitem( last=False )[1]
+            self.used -= old_size
+            self.evictions += 1
+
+        # An index larger than the whole budget is used but not kept
+        if( size <= self.memory_budget ):
+            self.entries[key] = ( index, size )
+            self.used += size
+        return index, True
+
+    def __str__(self):
+        return "Index cache: {0} hits, {1} misses, {2} evictions, {3} entries in {4} bytes".format(
+            self.hits, self.misses, self.evictions, len( self.entries ), self.used )
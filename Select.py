@@ -0,0 +1,124 @@
+#!/usr/bin/python
+
+'''
+File: Select.py
+Author: Nicholas Russo
+Description: This class extends Sort for callers who only need an order
+statistic or the top of each job (a median, a p99, a top-100) rather
+than a full ordering. It adds a rank "k": an int is a 0-based position
+in sorted order, negative ints count from the largest (-100 is the
+100th largest), and a float in (0, 1) is a quantile, resolved per job
+by the nearest-rank method. Every work method takes (array, rank) and
+returns the value at that rank, or for partial_sort_select and
+top_k_select the run of values which ends at it. Full sorting is kept as a baseline. Since
+-1 is a valid value here, a test fails by returning None instead.
+'''
+
+import math
+
+from Sort import Sort
+from Worker import Worker
+
+class Select(Sort):
+
+    '''
+    Introselect: expected O(n), and worst case O(n) by switching to
+    median of medians when the range stops halving (Musser's rule).
+    '''
+    @staticmethod
+    @Worker.register
+    def quickselect( array, rank ):
+        return Sort.nth_element( array, rank )[rank]
+
+    '''
+    Deterministic selection with median-of-medians pivots throughout.
+    '''
+    @staticmethod
+    @Worker.register
+    def median_of_medians_select( array, rank ):
+        return Sort.nth_element( array, rank, deterministic=True )[rank]
+
+    '''
+    Returns the rank + 1 smallest values in sorted order.
+    '''
+    @staticmethod
+    @Worker.register
+    def partial_sort_select( array, rank ):
+        return Sort.partial_sort( array, rank + 1 )[:rank + 1]
+
+    '''
+    Returns the values from the largest down to the rank, streamed
+    through a bounded heap.
+    '''
+    @staticmethod
+    @Worker.register
+    def top_k_select( array, rank ):
+        return Sort.top_k( iter( array ), len( array ) - rank )
+
+    '''
+    Baseline: sort everything with intro_sort() and index the result.
+    '''
+    @staticmethod
+    @Worker.register
+    def sort_select( array, rank ):
+        return Sort.intro_sort( array )[rank]
+
+    '''
+    Constructor is a pass-through for Sort with the exception of adding
+    the rank "k" (see the file description).
+    '''
+    def __init__(self, path, work_method, k, ifile_type=Worker.LINEAR):
+        Sort.__init__(self, path, work_method, ifile_type)
+        self.k = k
+
+    '''
+    Prepend the rank and invoke the parent method.
+    '''
+    def __str__(self):
+        string = "Rank: {0}\n".format(self.k)
+        return string + super().__str__()
+
+    '''
+    Resolve k into a 0-based rank for a job of n elements, or None if
+    it does not fall inside the job.
+    '''
+    def get_rank(self, n):
+        if( isinstance( self.k, float ) ):
+            rank = math.ceil( self.k * n ) - 1
+        elif( self.k < 0 ):
+            rank = n + self.k
+        else:
+            rank = self.k
+        return rank if 0 <= rank < n else None
+
+    '''
+    The NumPy batch sorts produce full orderings, so a batch is the same
+    as run_suite().
+    '''
+    def run_batch(self, kind="quicksort"):
+        return self.run_suite()
+
+    '''
+    Test the array for nonexistence or a rank outside of it. If it is
+    valid, run the selected work method at that rank.
+    '''
+    def _run_test(self, array):
+        if ( array == None ):
+            raise ValueError ("Sanity failure: array was None")
+
+        rank = self.get_rank( len( array ) )
+        if( rank is None ):
+            return None
+        return self.work_method( array, rank )
+
+    '''
+    A test fails only when the rank was outside of the job.
+    '''
+    def _passed(self, result):
+        return result is not None
+
+    '''
+    Selection results also depend on the rank.
+    '''
+    def _result_key_extra(self):
+        return ( self.k, )
@@ -7,11 +7,54 @@ Description: This class extends Worker. It defines several static methods
 which can be passed to the constructor for execution during a test series.
 '''
 
+import array as arrays
+import heapq
+import multiprocessing
+import os
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+from Heap import DaryHeap
 from Worker import Worker
+from Trace import Trace
+from Vectorized import Vectorized
 eprint = Worker.eprint
 
+# Shared buffers inherited by the parallel sort pool, see _attach_shared()
+_shared_views = None
+
+@Trace.traceable
 class Sort(Worker):
     
+    # Parallel sorts run sequentially below this many elements, and the
+    #  pieces handed to each process are never smaller than this either
+    PARALLEL_CUTOFF = 50000
+    
+    # Process count for the parallel sorts; None means os.cpu_count()
+    PARALLEL_WORKERS = None
+    
+    # intro_sort() finishes partitions of this size or less with insertion
+    #  sort, and uses a ninther (median of medians of three) pivot above
+    #  NINTHER_CUTOFF elements
+    INSERTION_CUTOFF = 16
+    NINTHER_CUTOFF = 128
+    
+    # tim_sort() enters galloping mode after this many consecutive wins
+    MIN_GALLOP = 7
+    
+    # radix_sort() digit width, and the widest value range (as a multiple
+    #  of n) for which integer_sort() picks counting_sort()
+    RADIX_BITS = 8
+    COUNTING_RANGE_FACTOR = 4
+    
+    # Children per node of the heap used by heap_sort() and intro_sort()
+    HEAP_ARITY = 4
+    
+    # nth_element() switches to median of medians pivots once this many
+    #  partitions in a row have failed to halve the range
+    SELECT_PATIENCE = 3
+    
     '''
     This algorithm sorts "array" by sinking big numbers to the right (bottom)
     by swapping adjacent elements. Each iteration guarantees that the largest
@@ -22,6 +65,7 @@ class Sort(Worker):
         space complexity: constant (sort in place), no recursion
     '''
     @staticmethod
+    @Worker.register
     def sinking_sort( array ):
         
         # Needed to initialize the first iteration
@@ -44,7 +88,7 @@ class Sort(Worker):
                     
                     # It was; swap the entries to sink big numbers
                     array[i], array[i-1] = array[i-1], array[i]
-                    eprint("after swap: {0}".format( array ) )
+                    eprint("after swap: {0}".format( array ), level=Trace.VERBOSE)
                     
                     # Record that a swap occured to indicate that
                     #  we are not done. Note that this sort requires
@@ -64,6 +108,7 @@ class Sort(Worker):
         space complexity: constant (sort in place), no recursion
     '''   
     @staticmethod
+    @Worker.register
     def bubble_sort( array ):
         
         # Needed to initialize the first iteration
@@ -86,7 +131,7 @@ class Sort(Worker):
                     
                     # It was; swap the entries to bubble up small numbers
                     array[i], array[i+1] = array[i+1], array[i]
-                    eprint("after swap: {0}".format( array ) )
+                    eprint("after swap: {0}".format( array ), level=Trace.VERBOSE)
                     
                     # Record that a swap occured to indicate that
                     #  we are not done. Note that this sort requires
@@ -108,6 +153,7 @@ class Sort(Worker):
         space complexity: constant (sort in place), no recursion
     '''
     @staticmethod
+    @Worker.register
     def selection_sort( array ):
         
         # We can stop short since we are searching for the minimum
@@ -135,7 +181,7 @@ class Sort(Worker):
             if( imin != i):
                 array[i], array[imin] = array[imin], array[i]
                 eprint("select {0} and swap with {1}".format(array[imin], array[i]))
-                eprint("after swap: {0}".format( array ) )
+                eprint("after swap: {0}".format( array ), level=Trace.VERBOSE)
         
         # Return the newly-sorted array 
         return array
@@ -149,6 +195,7 @@ class Sort(Worker):
         space complexity: constant (sort in place), no recursion
     '''    
     @staticmethod
+    @Worker.register
     def insertion_sort( array ):
 
         # Begin iterating through the array
@@ -165,7 +212,7 @@ class Sort(Worker):
             while( j > 0 and array[j-1] > array[j]):
                 eprint("insert {0} by swapping with {1}. j={2}".format( array[j], array[j-1], j) )
                 array[j-1], array[j] = array[j], array[j-1]
-                eprint("after swap: {0}".format( array ) )
+                eprint("after swap: {0}".format( array ), level=Trace.VERBOSE)
                 j -= 1
         
         # Return the newly-sorted array 
@@ -182,6 +229,7 @@ class Sort(Worker):
         space complexity: linear (copy subarrays), log(n) recursion stack
     '''    
     @staticmethod
+    @Worker.register
     def merge_sort( array ):
         an = len( array )
 
@@ -192,11 +240,11 @@ class Sort(Worker):
         # Populate left array from 0 to the midpoint (not inclusive)
         #  In odd-length arrays, left will always be smaller
         left = [array[i] for i in range(0,int(an/2))]
-        eprint ("left", left)
+        eprint ("left", left, level=Trace.VERBOSE)
         
         # Populate right array from the midpoint (inclusive) to the end
         right = [array[i] for i in range(int(an/2),an)]
-        eprint ("right", right)
+        eprint ("right", right, level=Trace.VERBOSE)
 
         # sanity check, lenl + lenr == lena
         if( len(left) + len(right) != len(array) ):
@@ -206,10 +254,10 @@ class Sort(Worker):
         # Sort the left and right sides independently
         #  The left sub array will be completely sorted before
         #  the right sub array even begins to be split.
-        eprint ("Recursive left to merge_sort({0})".format(left))
+        eprint ("Recursive left to merge_sort({0})".format(left), level=Trace.VERBOSE)
         Sort.merge_sort(left)
         
-        eprint ("Recursive right to merge_sort({0})".format(right))
+        eprint ("Recursive right to merge_sort({0})".format(right), level=Trace.VERBOSE)
         Sort.merge_sort(right)
         
         # Merge the two halves back into the higher-level array
@@ -219,6 +267,470 @@ class Sort(Worker):
         # Return the newly-sorted array 
         return array
     
+    """
+    This algorithm is merge sort without per-level allocation. A single
+    scratch copy of the array is made up front, and each recursion level
+    sorts its halves into the other buffer and merges them back, so the
+    two buffers trade roles ("ping-pong") instead of building new lists.
+    When the halves are already in order the merge is replaced by a plain
+    copy, and short runs are finished with binary insertion sort. Equal
+    elements keep their original order (stable).
+    Characteristics:
+        time complexity: best Ω(n), average Θ(nlogn), worst O(nlogn)
+        space complexity: linear (one scratch buffer), log(n) recursion stack
+    """
+    @staticmethod
+    @Worker.register
+    def buffered_merge_sort( array ):
+        if( len(array) > 1 ):
+            scratch = list( array )
+            Sort._merge_sort_into( scratch, array, 0, len(array) )
+        return array
+
+    """
+    Sort the elements of src[lo:hi] into dst[lo:hi]. On entry both slices
+    hold the same elements; src is free to be used as scratch space.
+    """
+    @staticmethod
+    def _merge_sort_into( src, dst, lo, hi ):
+        if( hi - lo <= Sort.INSERTION_CUTOFF ):
+            Sort._binary_insertion_sort( dst, lo, hi )
+            return
+
+        # Sort each half into src, using dst as the scratch space
+        mid = ( lo + hi ) // 2
+        Sort._merge_sort_into( dst, src, lo, mid )
+        Sort._merge_sort_into( dst, src, mid, hi )
+
+        # Halves already in order; copy rather than merge
+        if( src[mid - 1] <= src[mid] ):
+            eprint( "skip merge {0},{1}: {2} <= {3}".format(lo, hi, src[mid - 1], src[mid]))
+            for k in range( lo, hi ):
+                dst[k] = src[k]
+            return
+
+        # Merge src[lo:mid] and src[mid:hi] into dst[lo:hi], left first on ties
+        li, ri, k = lo, mid, lo
+        while( li < mid and ri < hi ):
+            if( src[ri] < src[li] ):
+                dst[k] = src[ri]
+                ri += 1
+            else:
+                dst[k] = src[li]
+                li += 1
+            k += 1
+        while( li < mid ):
+            dst[k] = src[li]
+            li += 1
+            k += 1
+        while( ri < hi ):
+            dst[k] = src[ri]
+            ri += 1
+            k += 1
+
+    """
+    Stable binary insertion sort of array[lo:hi] in place. Elements before
+    "start" (default lo + 1) are assumed to be sorted already. The insertion
+    point is found by binary search (after any equal elements) and the
+    larger elements are shifted right one slot each.
+    """
+    @staticmethod
+    def _binary_insertion_sort( array, lo, hi, start=None ):
+        for i in range( lo + 1 if start is None else start, hi ):
+            value = array[i]
+            pos = bisect_right( array, value, lo, i )
+            j = i
+            while( j > pos ):
+                array[j] = array[j - 1]
+                j -= 1
+            array[pos] = value
+
+    """
+    This algorithm (Timsort) takes advantage of order already present in
+    the array. It scans for natural runs: ascending runs are kept and
+    strictly descending runs are reversed in place. Runs shorter than a
+    computed minimum are extended with binary insertion sort. Runs are
+    pushed on a stack whose lengths are kept decreasing faster than the
+    Fibonacci numbers, so merges stay balanced. Each merge first skips
+    the elements already in place, then merges normally until one side
+    keeps winning, at which point it switches to galloping (exponential
+    search) to move whole blocks at once. The sort is stable.
+    Characteristics:
+        time complexity: best Ω(n), average Θ(nlogn), worst O(nlogn)
+        space complexity: linear (merge buffer up to n/2), no recursion
+    """
+    @staticmethod
+    @Worker.register
+    def tim_sort( array ):
+        n = len(array)
+        if( n < 2 ):
+            return array
+
+        minrun = Sort._min_run( n )
+        runs = list()
+
+        # Galloping threshold, adapted by merges; shared through a list
+        gallop = [Sort.MIN_GALLOP]
+
+        lo = 0
+        while( lo < n ):
+            run = Sort._count_run( array, lo, n )
+
+            # Extend short runs to minrun with binary insertion sort
+            if( run < minrun ):
+                force = min( minrun, n - lo )
+                Sort._binary_insertion_sort( array, lo, lo + force, lo + run )
+                run = force
+
+            eprint( "run at {0} of length {1}".format(lo, run))
+            runs.append( [lo, run] )
+            Sort._merge_collapse( array, runs, gallop )
+            lo += run
+
+        # Merge whatever remains on the stack, newest first
+        while( len( runs ) > 1 ):
+            i = len( runs ) - 2
+            if( i > 0 and runs[i - 1][1] < runs[i + 1][1] ):
+                i -= 1
+            Sort._merge_at( array, runs, i, gallop )
+
+        return array
+
+    """
+    Return the minimum run length for n elements: n itself below 64,
+    otherwise a value in [32, 64] chosen so that n / minrun is a power
+    of two or slightly less, which keeps the final merges balanced.
+    """
+    @staticmethod
+    def _min_run( n ):
+        r = 0
+        while( n >= 64 ):
+            r |= n & 1
+            n >>= 1
+        return n + r
+
+    """
+    Return the length of the natural run starting at array[lo]. A
+    strictly descending run is reversed in place (strictness keeps the
+    sort stable), so on return the run is always ascending.
+    """
+    @staticmethod
+    def _count_run( array, lo, hi ):
+        i = lo + 1
+        if( i == hi ):
+            return 1
+
+        if( array[i] < array[lo] ):
+            while( i + 1 < hi and array[i + 1] < array[i] ):
+                i += 1
+            left, right = lo, i
+            while( left < right ):
+                array[left], array[right] = array[right], array[left]
+                left += 1
+                right -= 1
+        else:
+            while( i + 1 < hi and not array[i + 1] < array[i] ):
+                i += 1
+
+        return i - lo + 1
+
+    """
+    Merge runs on the stack until its invariants hold again: for the top
+    three run lengths X, Y, Z (Z newest), X > Y + Z and Y > Z. The check
+    also looks one run deeper, which closes the known gap in the
+    original formulation of these invariants.
+    """
+    @staticmethod
+    def _merge_collapse( array, runs, gallop ):
+        while( len( runs ) > 1 ):
+            i = len( runs ) - 2
+            if( ( i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1] ) or
+                ( i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1] ) ):
+                if( runs[i - 1][1] < runs[i + 1][1] ):
+                    i -= 1
+            elif( runs[i][1] > runs[i + 1][1] ):
+                break
+            Sort._merge_at( array, runs, i, gallop )
+
+    """
+    Merge the adjacent runs at stack positions i and i + 1. Elements of
+    the first run which are already smaller than the whole second run,
+    and elements of the second run already larger than the whole first
+    run, are found by galloping and left where they are.
+    """
+    @staticmethod
+    def _merge_at( array, runs, i, gallop ):
+        a_start, la = runs[i]
+        b_start, lb = runs[i + 1]
+        runs[i][1] = la + lb
+        del runs[i + 1]
+
+        # Where does B[0] belong in A? Everything before that is in place
+        k = Sort._gallop( array[b_start], array, a_start, la, 0, True )
+        a_start += k
+        la -= k
+        if( la == 0 ):
+            return
+
+        # Where does A[-1] belong in B? Everything after that is in place
+        lb = Sort._gallop( array[a_start + la - 1], array, b_start, lb, lb - 1, False )
+        if( lb == 0 ):
+            return
+
+        eprint( "merge {0}+{1} at {2}".format(la, lb, a_start))
+        if( la <= lb ):
+            Sort._merge_lo( array, a_start, la, b_start, lb, gallop )
+        else:
+            Sort._merge_hi( array, a_start, la, b_start, lb, gallop )
+
+    """
+    Locate "key" in the sorted slice array[base:base+n] by galloping out
+    from base + hint in steps of 1, 3, 7, 15... and then bisecting the
+    bracketed range. Returns the offset k of the insertion point: to the
+    right of equal elements when "right" is true, else to the left.
+    """
+    @staticmethod
+    def _gallop( key, array, base, n, hint, right ):
+        bisect = bisect_right if right else bisect_left
+        pos = base + hint
+
+        # Does array[pos] belong before the insertion point?
+        if( array[pos] <= key if right else array[pos] < key ):
+            last = hint
+            ofs = 1
+            while( hint + ofs < n ):
+                value = array[base + hint + ofs]
+                if( not ( value <= key if right else value < key ) ):
+                    break
+                last = hint + ofs
+                ofs = 2 * ofs + 1
+            lo, hi = last + 1, min( hint + ofs, n )
+        else:
+            hi = hint
+            ofs = 1
+            while( hint - ofs >= 0 ):
+                value = array[base + hint - ofs]
+                if( value <= key if right else value < key ):
+                    break
+                hi = hint - ofs
+                ofs = 2 * ofs + 1
+            lo = max( hint - ofs + 1, 0 )
+
+        return bisect( array, key, base + lo, base + hi ) - base
+
+    """
+    Merge adjacent runs A = array[a_start:a_start+la] and B (which
+    follows it) when A is the shorter one. A is copied out and the merge
+    fills the array from the left. After MIN_GALLOP consecutive wins by
+    one side the merge gallops; the threshold shrinks while galloping
+    pays off and grows when it stops paying off.
+    """
+    @staticmethod
+    def _merge_lo( array, a_start, la, b_start, lb, gallop ):
+        tmp = array[a_start:a_start + la]
+        i, j, dest = 0, b_start, a_start
+        b_end = b_start + lb
+        min_gallop = gallop[0]
+
+        while( i < la and j < b_end ):
+
+            # One element at a time until one side wins min_gallop times
+            acount = bcount = 0
+            while( i < la and j < b_end and acount < min_gallop and bcount < min_gallop ):
+                if( array[j] < tmp[i] ):
+                    array[dest] = array[j]
+                    j += 1
+                    bcount += 1
+                    acount = 0
+                else:
+                    array[dest] = tmp[i]
+                    i += 1
+                    acount += 1
+                    bcount = 0
+                dest += 1
+
+            # Gallop while either side keeps winning in long blocks
+            while( i < la and j < b_end ):
+                k = Sort._gallop( array[j], tmp, i, la - i, 0, True )
+                array[dest:dest + k] = tmp[i:i + k]
+                dest += k
+                i += k
+                acount = k
+                if( i == la ):
+                    break
+
+                k = Sort._gallop( tmp[i], array, j, b_end - j, 0, False )
+                array[dest:dest + k] = array[j:j + k]
+                dest += k
+                j += k
+                bcount = k
+                if( j == b_end ):
+                    break
+
+                if( acount < Sort.MIN_GALLOP and bcount < Sort.MIN_GALLOP ):
+                    break
+                min_gallop = max( 0, min_gallop - 1 )
+            min_gallop += 1
+
+        # Whatever is left of B is already in place
+        array[dest:dest + la - i] = tmp[i:la]
+        gallop[0] = max( 1, min_gallop )
+
+    """
+    Mirror image of _merge_lo() for when B is the shorter run. B is
+    copied out and the merge fills the array from the right.
+    """
+    @staticmethod
+    def _merge_hi( array, a_start, la, b_start, lb, gallop ):
+        tmp = array[b_start:b_start + lb]
+        i, j, dest = a_start + la - 1, lb - 1, b_start + lb - 1
+        min_gallop = gallop[0]
+
+        while( i >= a_start and j >= 0 ):
+
+            # One element at a time; on ties B goes last to stay stable
+            acount = bcount = 0
+            while( i >= a_start and j >= 0 and acount < min_gallop and bcount < min_gallop ):
+                if( tmp[j] < array[i] ):
+                    array[dest] = array[i]
+                    i -= 1
+                    acount += 1
+                    bcount = 0
+                else:
+                    array[dest] = tmp[j]
+                    j -= 1
+                    bcount += 1
+                    acount = 0
+                dest -= 1
+
+            while( i >= a_start and j >= 0 ):
+                # Elements of A greater than tmp[j] move right as a block
+                k = Sort._gallop( tmp[j], array, a_start, i - a_start + 1, i - a_start, True )
+                count = i - a_start + 1 - k
+                array[dest - count + 1:dest + 1] = array[i - count + 1:i + 1]
+                dest -= count
+                i -= count
+                acount = count
+                if( i < a_start ):
+                    break
+
+                # Elements of B not less than array[i] follow it as a block
+                k = Sort._gallop( array[i], tmp, 0, j + 1, j, False )
+                count = j + 1 - k
+                array[dest - count + 1:dest + 1] = tmp[k:j + 1]
+                dest -= count
+                j -= count
+                bcount = count
+                if( j < 0 ):
+                    break
+
+                if( acount < Sort.MIN_GALLOP and bcount < Sort.MIN_GALLOP ):
+                    break
+                min_gallop = max( 0, min_gallop - 1 )
+            min_gallop += 1
+
+        # Whatever is left of A is already in place
+        array[dest - j:dest + 1] = tmp[0:j + 1]
+        gallop[0] = max( 1, min_gallop )
+
+    """
+    This algorithm sorts integers without comparing them. It counts how
+    many times each value between the minimum and maximum occurs, then
+    rewrites the array by emitting each value as many times as it was
+    counted. It is only practical when the value range (k) is narrow,
+    like the -20..20 values in the sample inputs; when k is more than
+    COUNTING_RANGE_FACTOR * n the counters would dominate (or not fit in
+    memory at all), so radix_sort() is used instead.
+    Characteristics:
+        time complexity: best Ω(n+k), average Θ(n+k), worst O(n+k)
+        space complexity: O(k) counters, no recursion
+    """
+    @staticmethod
+    @Worker.register
+    def counting_sort( array ):
+        if( len(array) < 2 ):
+            return array
+
+        low = min( array )
+        span = max( array ) - low + 1
+        if( span > Sort.COUNTING_RANGE_FACTOR * len(array) ):
+            eprint( "range {0} too wide for n={1}; radix sort".format(span, len(array)), level=Trace.INFO)
+            return Sort.radix_sort( array )
+
+        counts = [0] * span
+        for value in array:
+            counts[value - low] += 1
+
+        # Rewrite the array in order from the counters
+        i = 0
+        for offset in range( len( counts ) ):
+            count = counts[offset]
+            if( count ):
+                array[i:i + count] = [low + offset] * count
+                i += count
+
+        return array
+
+    """
+    This algorithm sorts integers digit by digit, least significant digit
+    first, using RADIX_BITS-bit digits (base 256 by default). Each pass
+    distributes the array into buckets by one digit and collects them in
+    bucket order; because every pass is stable, the order from earlier
+    passes is kept among equal digits. Negative numbers are handled by
+    sorting value - minimum, which is never negative, so the number of
+    passes depends on the value range (w bits) rather than the magnitude.
+    Characteristics:
+        time complexity: O(n * w / RADIX_BITS) for every input
+        space complexity: linear (buckets), no recursion
+    """
+    @staticmethod
+    @Worker.register
+    def radix_sort( array ):
+        if( len(array) < 2 ):
+            return array
+
+        low = min( array )
+        span = max( array ) - low
+        bits = Sort.RADIX_BITS
+        mask = ( 1 << bits ) - 1
+
+        keys = array
+        shift = 0
+        while( ( span >> shift ) > 0 ):
+            buckets = [list() for b in range( mask + 1 )]
+            for value in keys:
+                buckets[ ( ( value - low ) >> shift ) & mask ].append( value )
+            keys = [value for bucket in buckets for value in bucket]
+            eprint( "radix pass shift={0}: {1}".format(shift, keys), level=Trace.VERBOSE)
+            shift += bits
+
+        if( keys is not array ):
+            array[:] = keys
+        return array
+
+    """
+    This method chooses an integer sort from the observed value range.
+    When the range k is at most COUNTING_RANGE_FACTOR * n, counting_sort()
+    does O(n+k) work with tiny constants; wider ranges would make its
+    counter array dominate, so radix_sort() is used instead.
+    Characteristics:
+        time complexity: O(n+k) or O(n * w / RADIX_BITS), whichever is chosen
+        space complexity: see counting_sort() and radix_sort()
+    """
+    @staticmethod
+    @Worker.register
+    def integer_sort( array ):
+        if( len(array) < 2 ):
+            return array
+
+        span = max( array ) - min( array ) + 1
+        if( span <= Sort.COUNTING_RANGE_FACTOR * len(array) ):
+            eprint( "range {0} for n={1}; counting sort".format(span, len(array)), level=Trace.INFO)
+            return Sort.counting_sort( array )
+
+        eprint( "range {0} for n={1}; radix sort".format(span, len(array)), level=Trace.INFO)
+        return Sort.radix_sort( array )
+
     """
     This method merges left and right sub arrays into the main
     array. Iteration begins at the beginning and compares the lowest
@@ -228,7 +740,7 @@ class Sort(Worker):
     """    
     @staticmethod
     def _merge(array, left, right):
-        eprint("_merge_fast begin: {0} and {1}".format( left, right ))
+        eprint("_merge_fast begin: {0} and {1}".format( left, right ), level=Trace.VERBOSE)
         
         # Initiate three iterators for each array
         ai, li, ri = 0, 0, 0
@@ -261,7 +773,7 @@ class Sort(Worker):
             ri += 1
             ai += 1
             
-        eprint("_merge_fast complete: {0}".format(array))
+        eprint("_merge_fast complete: {0}".format(array), level=Trace.VERBOSE)
     
     """
     This technique selects the last element in the array as a "pivot"
@@ -275,6 +787,7 @@ class Sort(Worker):
         space complexity: constant (sort in place), log(n) recursion stack
     """    
     @staticmethod
+    @Worker.register
     def quick_sort( array, start=0, end=-1 ):
         
         # Used to initialize "end" only once
@@ -306,7 +819,7 @@ class Sort(Worker):
     def _partition( array, start, end ):
         # First, choose the pivot (last value)
         
-        eprint( "_partition {0} s={1} e={2}".format(array[start:end+1], start, end))
+        eprint( "_partition {0} s={1} e={2}".format(array[start:end+1], start, end), level=Trace.VERBOSE)
         
         # Initialize the pivot value and partition index
         pivot = array[end]
@@ -326,17 +839,528 @@ class Sort(Worker):
                 # Swap happened, so move the partition index to the right
                 #  to set up for the next swap operation
                 part += 1
-                eprint( " after swap: {0}, part={1}".format(array,part))
+                eprint( " after swap: {0}, part={1}".format(array,part), level=Trace.VERBOSE)
         
         # The value at the current iterator is known to be greater than the pivot,
         #  so perform this final swap. This places the pivot in its final location.
         eprint ("final partition step; swap {0} and {1}".format(array[end], array[part]))  
         array[end], array[part] = array[part], array[end]
-        eprint( "after swap: {0}, part={1}".format(array,part))
+        eprint( "after swap: {0}, part={1}".format(array,part), level=Trace.VERBOSE)
         
         # Return the partition index. quick_sort() needs this for recursive calls
         return part
     
+    """
+    This technique hardens quick_sort() for production inputs. The pivot
+    is the median of three elements (or a ninther on large partitions),
+    so sorted and reverse-sorted arrays split evenly. Partitioning is
+    three-way, grouping every element equal to the pivot in the middle so
+    duplicate-heavy arrays finish quickly. Only the smaller side is
+    recursed into, keeping the stack O(logn), and if recursion passes
+    2*log(n) levels the remaining partition is heap sorted instead, which
+    caps the worst case. Small partitions are finished by insertion sort.
+    Characteristics:
+        time complexity: best Ω(n), average Θ(nlogn), worst O(nlogn)
+        space complexity: constant (sort in place), log(n) recursion stack
+    """
+    @staticmethod
+    @Worker.register
+    def intro_sort( array ):
+        depth = 2 * max( 1, len(array) ).bit_length()
+        Sort._intro_sort_range( array, 0, len(array) - 1, depth )
+        return array
+    
+    """
+    Sort array[start..end] (inclusive) for intro_sort(), with "depth"
+    partitioning levels allowed before falling back to heap sort.
+    """
+    @staticmethod
+    def _intro_sort_range( array, start, end, depth ):
+        while( end - start >= Sort.INSERTION_CUTOFF ):
+            
+            # Too many bad splits; heap sort guarantees O(nlogn) from here
+            if( depth == 0 ):
+                eprint( "depth limit hit; heap sort {0},{1}".format(start, end), level=Trace.INFO)
+                Sort._heap_sort_range( array, start, end )
+                return
+            depth -= 1
+            
+            pivot = Sort._choose_pivot( array, start, end )
+            lt, gt = Sort._partition_three_way( array, start, end, pivot )
+            eprint( "pivot {0} splits {1},{2} into {3},{4}".format(pivot, start, end, lt, gt))
+            
+            # Recurse on the smaller side and loop on the larger one
+            if( lt - start < end - gt ):
+                Sort._intro_sort_range( array, start, lt - 1, depth )
+                start = gt + 1
+            else:
+                Sort._intro_sort_range( array, gt + 1, end, depth )
+                end = lt - 1
+        
+        Sort._insertion_sort_range( array, start, end )
+    
+    """
+    Return a pivot value for array[start..end]: the median of the first,
+    middle and last elements, or on large partitions the median of three
+    such medians taken from evenly spaced positions (Tukey's ninther).
+    """
+    @staticmethod
+    def _choose_pivot( array, start, end ):
+        mid = ( start + end ) // 2
+        if( end - start < Sort.NINTHER_CUTOFF ):
+            return Sort._median_of_three( array[start], array[mid], array[end] )
+        
+        step = ( end - start ) // 8
+        return Sort._median_of_three(
+            Sort._median_of_three( array[start], array[start + step], array[start + 2*step] ),
+            Sort._median_of_three( array[mid - step], array[mid], array[mid + step] ),
+            Sort._median_of_three( array[end - 2*step], array[end - step], array[end] ) )
+    
+    """
+    Return the middle value of a, b and c.
+    """
+    @staticmethod
+    def _median_of_three( a, b, c ):
+        if( a < b ):
+            if( b < c ):
+                return b
+            return c if a < c else a
+        if( a < c ):
+            return a
+        return c if b < c else b
+    
+    """
+    Dutch national flag partition of array[start..end] around "pivot".
+    Afterward array[start..lt-1] < pivot, array[lt..gt] == pivot and
+    array[gt+1..end] > pivot. Returns (lt, gt).
+    """
+    @staticmethod
+    def _partition_three_way( array, start, end, pivot ):
+        lt, i, gt = start, start, end
+        while( i <= gt ):
+            value = array[i]
+            if( value < pivot ):
+                array[lt], array[i] = value, array[lt]
+                lt += 1
+                i += 1
+            elif( value > pivot ):
+                array[gt], array[i] = value, array[gt]
+                gt -= 1
+            else:
+                i += 1
+        return lt, gt
+    
+    """
+    Insertion sort of array[start..end]. Larger elements are shifted
+    right instead of swapped, one write per step.
+    """
+    @staticmethod
+    def _insertion_sort_range( array, start, end ):
+        for i in range( start + 1, end + 1 ):
+            value = array[i]
+            j = i - 1
+            while( j >= start and array[j] > value ):
+                array[j + 1] = array[j]
+                j -= 1
+            array[j + 1] = value
+    
+    """
+    Heap sort of array[start..end] (inclusive) for intro_sort() past its
+    depth limit, on a HEAP_ARITY-ary max-heap (see Heap.py).
+    """
+    @staticmethod
+    def _heap_sort_range( array, start, end ):
+        DaryHeap.sort_range( array, start, end + 1, Sort.HEAP_ARITY )
+    
+    """
+    This algorithm arranges the array into a max-heap in place, then
+    repeatedly swaps the largest element (the root) to the end of the
+    shrinking heap and sifts the new root down. The heap is HEAP_ARITY-ary
+    (4 by default): each sift-down visits half the levels of a binary heap,
+    finding the largest of four adjacent children in one pass.
+    Characteristics:
+        time complexity: best Ω(n) (all equal), average Θ(nlogn), worst O(nlogn)
+        space complexity: constant (sort in place), no recursion
+    """
+    @staticmethod
+    @Worker.register
+    def heap_sort( array ):
+        DaryHeap.sort_range( array, 0, len(array), Sort.HEAP_ARITY )
+        return array
+    
+    """
+    heap_sort() on a classic binary heap, for comparison.
+    Characteristics:
+        time complexity: best Ω(n) (all equal), average Θ(nlogn), worst O(nlogn)
+        space complexity: constant (sort in place), no recursion
+    """
+    @staticmethod
+    @Worker.register
+    def binary_heap_sort( array ):
+        DaryHeap.sort_range( array, 0, len(array), 2 )
+        return array
+    
+    """
+    Heap sort with the C-implemented heapq module as the baseline for
+    heap_sort(): heapify a copy, then pop every element back into the
+    array in order.
+    Characteristics:
+        time complexity: average Θ(nlogn), worst O(nlogn)
+        space complexity: linear (heap copy)
+    """
+    @staticmethod
+    @Worker.register
+    def heapq_sort( array ):
+        heap = list( array )
+        heapq.heapify( heap )
+        pop = heapq.heappop
+        for i in range( len(array) ):
+            array[i] = pop( heap )
+        return array
+    
+    """
+    Rearrange "array" so that array[k] holds the value it would hold if
+    the array were sorted, every element before it is no greater and
+    every element after it is no smaller (C++ nth_element). This is
+    introselect: intro_sort()'s pivot choice and three-way partition,
+    following only the side holding k, so the expected time is O(n).
+    If SELECT_PATIENCE partitions in a row fail to halve the range
+    (Musser's rule), or with deterministic=True from the start, pivots
+    come from the median of medians instead. Either way the range
+    shrinks geometrically, which guarantees O(n). Returns the array.
+    Characteristics:
+        time complexity: average Θ(n), worst O(n)
+        space complexity: constant (in place), log(n) recursion stack
+    """
+    @staticmethod
+    def nth_element( array, k, deterministic=False ):
+        if( not 0 <= k < len(array) ):
+            raise IndexError( "rank out of range: {0}".format(k) )
+        Sort._select_range( array, 0, len(array) - 1, k, deterministic )
+        return array
+    
+    """
+    Rearrange "array" so that its first k elements are its k smallest,
+    in sorted order; the rest are left in unspecified order. Selection
+    isolates them in O(n), then only they are sorted. Returns the array.
+    Characteristics:
+        time complexity: average Θ(n + klogk), worst O(n + klogk)
+        space complexity: constant (sort in place), log(n) recursion stack
+    """
+    @staticmethod
+    def partial_sort( array, k ):
+        k = min( k, len(array) )
+        if( k <= 0 ):
+            return array
+        if( k < len(array) ):
+            Sort.nth_element( array, k - 1 )
+        Sort._intro_sort_range( array, 0, k - 1, 2 * k.bit_length() )
+        return array
+    
+    """
+    Return the k largest values of any iterable, largest first. Only a
+    min-heap of the k best values so far is kept, and each new value
+    replaces its root only when larger, so a stream (a generator, a
+    memory-mapped row) is consumed in one pass without being stored.
+    Characteristics:
+        time complexity: O(nlogk)
+        space complexity: O(k)
+    """
+    @staticmethod
+    def top_k( iterable, k ):
+        if( k <= 0 ):
+            return list()
+        
+        heap = list()
+        for value in iterable:
+            if( len(heap) < k ):
+                heapq.heappush( heap, value )
+            elif( value > heap[0] ):
+                heapq.heapreplace( heap, value )
+        heap.sort( reverse=True )
+        return heap
+    
+    """
+    Introselect over array[start..end] (inclusive) for nth_element().
+    "target" is half the size of the range when the current run of
+    partitions began; once SELECT_PATIENCE of them leave the range above
+    it, every later pivot comes from _median_of_medians().
+    """
+    @staticmethod
+    def _select_range( array, start, end, k, deterministic ):
+        target = ( end - start + 1 ) // 2
+        misses = 0
+        while( end - start >= Sort.INSERTION_CUTOFF ):
+            if( deterministic ):
+                pivot = Sort._median_of_medians( array, start, end )
+            else:
+                pivot = Sort._choose_pivot( array, start, end )
+            
+            lt, gt = Sort._partition_three_way( array, start, end, pivot )
+            eprint( "select {0}: pivot {1} splits {2},{3} into {4},{5}".format(k, pivot, start, end, lt, gt))
+            if( k < lt ):
+                end = lt - 1
+            elif( k > gt ):
+                start = gt + 1
+            else:
+                return
+            
+            if( end - start + 1 <= target ):
+                target = ( end - start + 1 ) // 2
+                misses = 0
+            else:
+                misses += 1
+                if( misses == Sort.SELECT_PATIENCE and not deterministic ):
+                    eprint( "select {0}: range not halving; median of medians".format(k), level=Trace.INFO)
+                    deterministic = True
+        
+        Sort._insertion_sort_range( array, start, end )
+    
+    """
+    Return a pivot for array[start..end] which has at least 30% of the
+    elements on each side: the median of the medians of groups of five.
+    Each group is insertion sorted and its median swapped to the front
+    of the range, then the median of those is selected recursively.
+    """
+    @staticmethod
+    def _median_of_medians( array, start, end ):
+        m = start
+        for g in range( start, end + 1, 5 ):
+            ge = min( g + 4, end )
+            Sort._insertion_sort_range( array, g, ge )
+            mid = ( g + ge ) // 2
+            array[m], array[mid] = array[mid], array[m]
+            m += 1
+        
+        mid = start + ( m - 1 - start ) // 2
+        Sort._select_range( array, start, m - 1, mid, True )
+        return array[mid]
+    
+    """
+    This algorithm runs every level of merge sort across a process pool.
+    The array is copied once into a shared int64 buffer and cut into one
+    contiguous segment per process; each process sorts its segment in
+    place on the buffer with buffered_merge_sort(). The sorted segments
+    are then merged pairwise, level by level, from one shared buffer into
+    a second one and back. Every pairwise merge is cut into independent
+    pieces by co-ranking (see _co_rank()), so all processes stay busy up
+    to the last level. The parent copies the result back once. Inputs
+    shorter than the cutoff, or holding values outside int64, are sorted
+    sequentially.
+    Characteristics:
+        time complexity: O(nlogn / p) per process, in logp merge levels
+        space complexity: linear (two shared buffers)
+    """
+    @staticmethod
+    @Worker.register
+    def parallel_merge_sort( array ):
+        bounds = Sort._segment_bounds( len(array), 1 )
+        if( bounds is None ):
+            return Sort.buffered_merge_sort( array )
+        
+        shared = Sort._share( array, 2 )
+        if( shared is None ):
+            return Sort.buffered_merge_sort( array )
+        
+        workers = len(bounds)
+        with Sort._pool( shared, workers ) as pool:
+            Sort._run_pool( pool, Sort._sort_shared_segment,
+                [( start, end, "buffered_merge_sort" ) for start, end in bounds] )
+            
+            # Merge neighboring runs until one is left; "src" is the buffer
+            #  holding the current runs and the merges write the other one
+            src = 0
+            while( len(bounds) > 1 ):
+                tasks = list()
+                merged = list()
+                for i in range( 0, len(bounds), 2 ):
+                    lo, mid = bounds[i]
+                    hi = bounds[i + 1][1] if i + 1 < len(bounds) else mid
+                    
+                    # A trailing run without a partner is merged with an
+                    #  empty one, which copies it across
+                    pieces = max( 1, ( workers * ( hi - lo ) ) // len(array) )
+                    size = -(-( hi - lo ) // pieces)
+                    for k in range( 0, hi - lo, size ):
+                        tasks.append( ( src, lo, mid, hi, k, min( k + size, hi - lo ) ) )
+                    merged.append( ( lo, hi ) )
+                
+                Sort._run_pool( pool, Sort._merge_shared_piece, tasks )
+                src = 1 - src
+                bounds = merged
+        
+        array[:] = Sort._view( shared[src] ).tolist()
+        return array
+    
+    """
+    Return how many of the first k elements of the stable merge of
+    src[lo:mid] and src[mid:hi] come from the left run, by binary search.
+    Ties go to the left run, as in _merge_sort_into().
+    """
+    @staticmethod
+    def _co_rank( src, lo, mid, hi, k ):
+        low = max( 0, k - ( hi - mid ) )
+        high = min( k, mid - lo )
+        while( low < high ):
+            i = ( low + high ) // 2
+            if( src[lo + i] <= src[mid + k - i - 1] ):
+                low = i + 1
+            else:
+                high = i
+        return low
+    
+    """
+    This algorithm performs the top level of quick sort as a multi-way
+    partition: pivots are sampled from the array, and every element is
+    placed in the bucket between its neighboring pivots. The buckets
+    are laid out back to back in a shared int64 buffer and sorted in
+    place by separate processes with intro_sort(). Because buckets are already ordered
+    relative to each other, no merge is needed afterward.
+    Characteristics:
+        time complexity: O(nlogp) partition plus O(nlogn / p) per process
+        space complexity: linear (buckets plus shared buffer)
+    """
+    @staticmethod
+    @Worker.register
+    def parallel_quick_sort( array ):
+        bounds = Sort._segment_bounds( len(array), 1 )
+        if( bounds is None ):
+            return Sort.intro_sort( array )
+        
+        # Choose p-1 pivots from an evenly spaced sample of the array
+        parts = len( bounds )
+        step = max( 1, len(array) // ( parts * 32 ) )
+        sample = sorted( array[::step] )
+        pivots = [sample[ ( i * len(sample) ) // parts ] for i in range( 1, parts )]
+        
+        buckets = [list() for i in range( parts )]
+        for value in array:
+            buckets[ bisect_right( pivots, value ) ].append( value )
+        
+        # Lay the buckets out back to back and record their boundaries
+        bounds = list()
+        start = 0
+        for i in range( parts ):
+            array[start:start + len(buckets[i])] = buckets[i]
+            bounds.append( ( start, start + len(buckets[i]) ) )
+            start += len(buckets[i])
+        buckets = None
+        
+        shared = Sort._share( array, 1 )
+        if( shared is None ):
+            return Sort.intro_sort( array )
+        
+        with Sort._pool( shared, len(bounds) ) as pool:
+            Sort._run_pool( pool, Sort._sort_shared_segment,
+                [( start, end, "intro_sort" ) for start, end in bounds] )
+        
+        array[:] = Sort._view( shared[0] ).tolist()
+        return array
+    
+    """
+    Return (start, end) bounds splitting n elements into one segment per
+    process, or None when the input is too small to be worth splitting
+    or when this process is itself a pool worker which may not fork.
+    """
+    @staticmethod
+    def _segment_bounds( n, minimum ):
+        workers = Sort.PARALLEL_WORKERS or os.cpu_count() or 1
+        parts = min( workers, n // max( Sort.PARALLEL_CUTOFF, minimum ) )
+        if( parts < 2 or multiprocessing.current_process().daemon ):
+            return None
+        
+        size = -(-n // parts)
+        return [( i, min( i + size, n ) ) for i in range( 0, n, size )]
+    
+    """
+    Return "count" shared int64 buffers the length of "array", the first
+    holding a copy of it, or None if any value does not fit in int64, in
+    which case the caller should sort sequentially.
+    """
+    @staticmethod
+    def _share( array, count ):
+        try:
+            packed = arrays.array( "q", array )
+        except OverflowError:
+            return None
+        
+        shared = [multiprocessing.RawArray( "q", len(array) ) for i in range( count )]
+        Sort._view( shared[0] )[:] = packed
+        return shared
+    
+    """
+    Return a typed int64 memoryview of a shared buffer.
+    """
+    @staticmethod
+    def _view( shared ):
+        return memoryview( shared ).cast( "B" ).cast( "q" )
+    
+    """
+    Return a process pool of "workers" processes which inherit the
+    shared buffers.
+    """
+    @staticmethod
+    def _pool( shared, workers ):
+        return ProcessPoolExecutor( workers, initializer=Sort._attach_shared,
+            initargs=tuple( shared ) )
+    
+    """
+    Run func(*task) for every task on the pool and wait for all of them,
+    re-raising the first failure.
+    """
+    @staticmethod
+    def _run_pool( pool, func, tasks ):
+        futures = [pool.submit( func, *task ) for task in tasks]
+        for future in futures:
+            future.result()
+    
+    """
+    Pool initializer; keeps typed views of the inherited shared buffers.
+    """
+    @staticmethod
+    def _attach_shared( *shared ):
+        global _shared_views
+        _shared_views = [Sort._view( buffer ) for buffer in shared]
+    
+    """
+    Runs inside a pool process. Sorts the first shared buffer's
+    [start:end] in place, through a memoryview, with the Sort work method
+    named "leaf".
+    """
+    @staticmethod
+    def _sort_shared_segment( start, end, leaf ):
+        getattr( Sort, leaf )( _shared_views[0][start:end] )
+    
+    """
+    Runs inside a pool process. Writes elements [k0, k1) of the stable
+    merge of runs [lo, mid) and [mid, hi) of shared buffer "src" to the
+    same positions (offset by lo) of the other shared buffer.
+    """
+    @staticmethod
+    def _merge_shared_piece( src, lo, mid, hi, k0, k1 ):
+        a = _shared_views[src]
+        out = _shared_views[1 - src]
+        
+        i = lo + Sort._co_rank( a, lo, mid, hi, k0 )
+        j = mid + k0 - ( i - lo )
+        i_end = lo + Sort._co_rank( a, lo, mid, hi, k1 )
+        j_end = mid + k1 - ( i_end - lo )
+        
+        k = lo + k0
+        while( i < i_end and j < j_end ):
+            if( a[j] < a[i] ):
+                out[k] = a[j]
+                j += 1
+            else:
+                out[k] = a[i]
+                i += 1
+            k += 1
+        
+        # At most one run has elements left; copy them as a block
+        out[k:k + i_end - i] = a[i:i_end]
+        k += i_end - i
+        out[k:k + j_end - j] = a[j:j_end]
+    
     '''
     Constructor is a pass-through for Worker. No additional
     information is added within the Sort class at this time.
@@ -344,6 +1368,24 @@ class Sort(Worker):
     def __init__(self, path, work_method, ifile_type=Worker.LINEAR):
         Worker.__init__(self, path, work_method, ifile_type)
 
+    '''
+    Sort every job in one batched NumPy call of the given kind (see
+    Vectorized.KINDS) and store the sorted rows in result_list. Without
+    NumPy, or when a value does not fit in int64, this is the same as
+    run_suite() with the current work method.
+    '''
+    def run_batch(self, kind="quicksort"):
+        if( not Vectorized.available() ):
+            return self.run_suite()
+        
+        start = time.perf_counter()
+        try:
+            results = Vectorized.sort_rows( self.work_list, kind )
+        except OverflowError:
+            # Some value does not fit in int64; only the Python path can run it
+            return self.run_suite()
+        self._record_batch( results, start, time.perf_counter() )
+
     '''
     Test the array for nonexistence. If it is valid, run the
     selected work method to sort the specific array.
@@ -352,11 +1394,11 @@ class Sort(Worker):
         if ( array == None ):
             raise ValueError ("Sanity failure: array was None")
             
-        eprint("** starting {0} **".format(self.work_method.__name__))
-        eprint("initial array: {0}".format(array))  
+        eprint("** starting {0} **".format(self.work_method.__name__), level=Trace.INFO)
+        eprint("initial array: {0}".format(array), level=Trace.VERBOSE)  
           
         result = self.work_method( array )
         
-        eprint("sorted array: {0}".format(result)) 
-        eprint("** ending {0} **".format(self.work_method.__name__))
+        eprint("sorted array: {0}".format(result), level=Trace.VERBOSE) 
+        eprint("** ending {0} **".format(self.work_method.__name__), level=Trace.INFO)
         return result
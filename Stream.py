@@ -0,0 +1,130 @@
+#!/usr/bin/python
+
+'''
+File: Stream.py
+Author: Nicholas Russo
+Description: This file holds the pieces used by Worker.run_stream().
+StreamStats accumulates pass/fail counts, timing moments and a timing
+histogram one test at a time, so nothing grows with the input size.
+The sink classes receive each (job index, result) pair as soon as it is
+produced: FileSink writes it out, CallbackSink hands it to a function,
+and BufferSink keeps only the most recent results.
+'''
+
+import math
+from collections import deque
+
+class StreamStats:
+
+    '''
+    Constructor initializes empty statistics. The histogram has one
+    bucket per power of two nanoseconds, so it never exceeds ~64 entries.
+    '''
+    def __init__(self):
+        self.count = 0
+        self.passes = 0
+        self.min = None
+        self.max = None
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.histogram = dict()
+
+    '''
+    Add one test outcome. Mean and variance use Welford's method, which
+    is numerically stable and needs no sample storage.
+    '''
+    def add(self, passed, elapsed_ns):
+        self.count += 1
+        if( passed ):
+            self.passes += 1
+
+        if( self.min is None or elapsed_ns < self.min ):
+            self.min = elapsed_ns
+        if( self.max is None or elapsed_ns > self.max ):
+            self.max = elapsed_ns
+
+        delta = elapsed_ns - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * ( elapsed_ns - self.mean )
+
+        bucket = int( elapsed_ns ).bit_length()
+        self.histogram[bucket] = self.histogram.get( bucket, 0 ) + 1
+
+    '''
+    Returns the sample standard deviation of the elapsed times.
+    '''
+    def stddev(self):
+        if( self.count < 2 ):
+            return 0.0
+        return math.sqrt( self._m2 / ( self.count - 1 ) )
+
+    '''
+    Returns the number of failed tests.
+    '''
+    def fails(self):
+        return self.count - self.passes
+
+    '''
+    Return a summary plus one histogram line per occupied bucket, where
+    bucket b holds times in [2^(b-1), 2^b) nanoseconds.
+    '''
+    def __str__(self):
+        if( self.count == 0 ):
+            return "Stream: no tests"
+
+        string = "Stream: {0}/{1} passed, min {2:.3f} mean {3:.3f} max {4:.3f} sd {5:.3f} us\n".format(
+            self.passes, self.count, self.min / 1000, self.mean / 1000, self.max / 1000,
+            self.stddev() / 1000 )
+        for bucket in sorted( self.histogram ):
+            low = ( 1 << ( bucket - 1 ) ) if bucket > 0 else 0
+            string += "  [{0:.3f}, {1:.3f}) us: {2}\n".format(
+                low / 1000, ( 1 << bucket ) / 1000, self.histogram[bucket] )
+        return string.rstrip( "\n" )
+
+'''
+Writes each result to a text file as "index: result". List results are
+written space separated, like the .input format.
+'''
+class FileSink:
+
+    def __init__(self, path):
+        self.handle = open( path, "w" )
+
+    def write(self, index, result):
+        if( isinstance( result, ( list, tuple ) ) ):
+            result = " ".join( map( str, result ) )
+        self.handle.write( "{0}: {1}\n".format( index, result ) )
+
+    def close(self):
+        self.handle.close()
+
+'''
+Passes each (index, result) pair to a callback function.
+'''
+class CallbackSink:
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write(self, index, result):
+        self.callback( index, result )
+
+    def close(self):
+        pass
+
+'''
+Keeps only the last "capacity" (index, result) pairs in memory.
+'''
+class BufferSink:
+
+    def __init__(self, capacity=1000):
+        self.buffer = deque( maxlen=capacity )
+
+    def write(self, index, result):
+        self.buffer.append( ( index, result ) )
+
+    def close(self):
+        pass
+
+    def get_results(self):
+        return list( self.buffer )
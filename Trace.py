@@ -0,0 +1,209 @@
+#!/usr/bin/python
+
+'''
+File: Trace.py
+Author: Nicholas Russo
+Description: This class provides leveled tracing for the algorithms
+in this project. Algorithms call eprint() freely in their hot loops,
+tagging each call with a level (DEBUG unless "level=" says otherwise).
+Classes decorated with Trace.traceable keep one build of every method
+which calls eprint() per trace level: each build is recompiled with the
+eprint() statements above that level removed from the syntax tree, and
+the build at VERBOSE is the source as written. Switching levels swaps
+the builds in place, so calls above the current level are never
+evaluated (or formatted) at all.
+'''
+
+import ast
+import inspect
+import sys
+import textwrap
+
+class Trace:
+
+    OFF = 0
+    INFO = 1
+    DEBUG = 2
+    VERBOSE = 3
+    LEVELS = ( OFF, INFO, DEBUG, VERBOSE )
+    NAMES = { "OFF": OFF, "INFO": INFO, "DEBUG": DEBUG, "VERBOSE": VERBOSE }
+
+    # Current trace level and the callable that receives trace output
+    level = OFF
+    sink = None
+
+    # Every class registered via traceable(), used when the level changes
+    _classes = list()
+
+    '''
+    Default output sink. Writes the message to stderr, which keeps
+    trace output separate from the results printed on stdout.
+    '''
+    @staticmethod
+    def stderr_sink( *args, **kwargs ):
+        print( *args, file=sys.stderr, **kwargs )
+
+    '''
+    Returns True if messages at "level" are currently emitted.
+    '''
+    @staticmethod
+    def enabled( level ):
+        return level <= Trace.level
+
+    '''
+    Emit a message at the given level. The message may be a callable,
+    in which case it is only invoked (and formatted) when the level is
+    enabled. This is the lazy alternative for code which is not
+    compiled through traceable().
+    '''
+    @staticmethod
+    def emit( level, *args, **kwargs ):
+        if( level <= Trace.level ):
+            if( len( args ) == 1 and callable( args[0] ) ):
+                args = ( args[0](), )
+            Trace.sink( *args, **kwargs )
+
+    '''
+    Replace the output sink. Passing None restores stderr output. A sink
+    takes the same arguments as print(), so structured sinks (lists,
+    loggers, event queues) are easy to plug in.
+    '''
+    @staticmethod
+    def set_sink( sink ):
+        Trace.sink = Trace.stderr_sink if sink is None else sink
+
+    '''
+    Change the trace level and swap the traced/untraced builds of every
+    registered class accordingly.
+    '''
+    @staticmethod
+    def set_level( level ):
+        Trace.level = level
+        for cls in Trace._classes:
+            Trace._bind( cls )
+
+    '''
+    Class decorator. Every method (static or instance) whose body calls
+    eprint() gets a build compiled from its source for each trace level.
+    All builds are kept on the class so that set_level() can switch
+    between them.
+    '''
+    @staticmethod
+    def traceable( cls ):
+        cls._level_builds = { level: dict() for level in Trace.LEVELS }
+
+        for name, attr in list( vars(cls).items() ):
+            is_static = isinstance( attr, staticmethod )
+            func = attr.__func__ if is_static else attr
+            if( not inspect.isfunction( func ) ):
+                continue
+
+            # A method with nothing to remove even at OFF has no eprint()
+            builds = { level: Trace._strip( func, level ) for level in Trace.LEVELS }
+            if( builds[Trace.OFF] is None ):
+                continue
+
+            for level, stripped in builds.items():
+                if( stripped is None ):
+                    stripped = attr
+
+                # Keep the descriptor type so calls behave identically
+                elif( is_static ):
+                    stripped = staticmethod( stripped )
+                cls._level_builds[level][name] = stripped
+
+        Trace._classes.append( cls )
+        Trace._bind( cls )
+        return cls
+
+    '''
+    Install the builds matching the current level on a registered class.
+    '''
+    @staticmethod
+    def _bind( cls ):
+        level = max( Trace.OFF, min( Trace.level, Trace.VERBOSE ) )
+        for name, attr in cls._level_builds[level].items():
+            setattr( cls, name, attr )
+
+    '''
+    Recompile "func" with every eprint(...) expression statement above
+    "level" removed. Returns None when no statement is removed or when
+    the source is unavailable (in which case the original is used).
+    '''
+    @staticmethod
+    def _strip( func, level ):
+        try:
+            source = textwrap.dedent( inspect.getsource( func ) )
+        except ( OSError, TypeError ):
+            return None
+
+        tree = ast.parse( source )
+        fdef = tree.body[0]
+        stripper = _EprintStripper( level )
+        stripper.visit( fdef )
+        if( stripper.removed == 0 ):
+            return None
+
+        # Decorators are applied by traceable(), and the line numbers are
+        #  moved so that tracebacks still point into the original file
+        fdef.decorator_list = list()
+        ast.increment_lineno( tree, func.__code__.co_firstlineno - 1 )
+        ast.fix_missing_locations( tree )
+
+        # Define the function in a scratch namespace, but keep the module
+        #  globals so names like "Sort" resolve exactly as before
+        namespace = dict()
+        code = compile( tree, func.__code__.co_filename, "exec" )
+        exec( code, func.__globals__, namespace )
+
+        stripped = namespace[ fdef.name ]
+        stripped.__qualname__ = func.__qualname__
+        stripped.__doc__ = func.__doc__
+        stripped.__dict__.update( func.__dict__ )
+        return stripped
+
+'''
+Syntax tree transformer used by Trace._strip(). Removes statements of
+the form "eprint(...)" whose level is above "level" and pads any block
+left empty with "pass". The level of a call is its "level=" keyword,
+written as Trace.<NAME> or an int, and DEBUG without one. Calls with
+any other level expression are only removed at OFF.
+'''
+class _EprintStripper(ast.NodeTransformer):
+
+    def __init__(self, level):
+        self.level = level
+        self.removed = 0
+
+    def visit_Expr(self, node):
+        call = node.value
+        if( isinstance( call, ast.Call ) and isinstance( call.func, ast.Name )
+            and call.func.id == "eprint" and self._call_level( call ) > self.level ):
+            self.removed += 1
+            return None
+        return node
+
+    '''
+    The static level of an eprint() call, as described above.
+    '''
+    @staticmethod
+    def _call_level( call ):
+        for keyword in call.keywords:
+            if( keyword.arg != "level" ):
+                continue
+            value = keyword.value
+            if( isinstance( value, ast.Attribute ) and value.attr in Trace.NAMES ):
+                return Trace.NAMES[value.attr]
+            if( isinstance( value, ast.Constant ) and isinstance( value.value, int ) ):
+                return value.value
+            return Trace.INFO
+        return Trace.DEBUG
+
+    def generic_visit(self, node):
+        super().generic_visit( node )
+        body = getattr( node, "body", None )
+        if( isinstance( body, list ) and len( body ) == 0 ):
+            body.append( ast.Pass() )
+        return node
+
+Trace.set_sink( None )
@@ -0,0 +1,137 @@
+#!/usr/bin/python
+
+'''
+File: Vectorized.py
+Author: Nicholas Russo
+Description: This class is an optional NumPy backend which processes a
+whole work_list at once instead of one row at a time. Rows are packed
+into a single int64 array (2-D when every row has the same length,
+otherwise flat with row offsets). Sorting is one batched numpy.sort()
+call and searching is one searchsorted() call across every row. When
+NumPy is not installed, available() returns False and callers should
+use the pure-Python work methods instead. The same goes for rows
+holding values outside int64, which raise OverflowError here.
+'''
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class Vectorized:
+
+    # Sort kinds accepted by numpy.sort()
+    KINDS = ( "quicksort", "mergesort", "heapsort", "stable" )
+
+    '''
+    Returns True if NumPy could be imported.
+    '''
+    @staticmethod
+    def available():
+        return numpy is not None
+
+    '''
+    Pack a list of integer rows into (values, offsets), where row i is
+    values[offsets[i]:offsets[i+1]]. Raises OverflowError if any value
+    does not fit in int64.
+    '''
+    @staticmethod
+    def pack( work_list ):
+        lengths = numpy.fromiter( ( len( row ) for row in work_list ), numpy.int64, len( work_list ) )
+        offsets = numpy.zeros( len( work_list ) + 1, numpy.int64 )
+        numpy.cumsum( lengths, out=offsets[1:] )
+
+        values = numpy.empty( int( offsets[-1] ), numpy.int64 )
+        for i, row in enumerate( work_list ):
+            values[offsets[i]:offsets[i + 1]] = row
+        return values, offsets
+
+    '''
+    Return row-keyed copies of "values" so that a single global sort or
+    search handles every row at once: key = (value - low) + row * span.
+    Rows then occupy disjoint, increasing key ranges. Returns None if the
+    keys would overflow int64.
+    '''
+    @staticmethod
+    def _row_keys( values, offsets ):
+        rows = len( offsets ) - 1
+        if( len( values ) == 0 ):
+            return None
+        low = int( values.min() )
+        span = int( values.max() ) - low + 1
+        if( span * rows >= 2**63 ):
+            return None
+
+        row_ids = numpy.repeat( numpy.arange( rows, dtype=numpy.int64 ), numpy.diff( offsets ) )
+        return ( values - low ) + row_ids * span, row_ids, low, span
+
+    '''
+    Sort every row of "work_list" and return the sorted rows as lists of
+    Python ints. Equal-length rows are sorted as a 2-D array along axis 1;
+    ragged rows are sorted as one flat array of row keys. Raises
+    OverflowError if any value does not fit in int64.
+    '''
+    @staticmethod
+    def sort_rows( work_list, kind="quicksort" ):
+        if( kind not in Vectorized.KINDS ):
+            raise ValueError( "unknown sort kind: {0}".format( kind ) )
+        if( len( work_list ) == 0 ):
+            return list()
+
+        lengths = set( len( row ) for row in work_list )
+        if( len( lengths ) == 1 ):
+            matrix = numpy.array( work_list, dtype=numpy.int64 )
+            return numpy.sort( matrix, axis=1, kind=kind ).tolist()
+
+        values, offsets = Vectorized.pack( work_list )
+        keyed = Vectorized._row_keys( values, offsets )
+        if( keyed is None ):
+            # Keys would overflow; sort row slices one by one instead
+            for i in range( len( work_list ) ):
+                values[offsets[i]:offsets[i + 1]].sort( kind=kind )
+        else:
+            keys, row_ids, low, span = keyed
+            keys.sort( kind=kind )
+            values = keys - row_ids * span + low
+
+        flat = values.tolist()
+        return [flat[offsets[i]:offsets[i + 1]] for i in range( len( work_list ) )]
+
+    '''
+    Find "target" in every row of "work_list", which must be sorted like
+    the input to Search.binary_search(). Returns one index per row: the
+    first occurrence of target, or -1 when the row does not contain it.
+    Raises OverflowError if any value does not fit in int64.
+    '''
+    @staticmethod
+    def search_rows( work_list, target ):
+        if( len( work_list ) == 0 ):
+            return list()
+
+        values, offsets = Vectorized.pack( work_list )
+        keyed = Vectorized._row_keys( values, offsets )
+        rows = len( work_list )
+        if( keyed is None ):
+            return [Vectorized._search_slice( values[offsets[i]:offsets[i + 1]], target )
+                for i in range( rows )]
+
+        keys, row_ids, low, span = keyed
+        if( target < low or target >= low + span ):
+            return [-1] * rows
+
+        # One target key per row; searchsorted answers them all at once
+        wanted = ( target - low ) + numpy.arange( rows, dtype=numpy.int64 ) * span
+        pos = numpy.searchsorted( keys, wanted, side="left" )
+        found = pos < offsets[1:]
+        found &= keys[ numpy.minimum( pos, len( keys ) - 1 ) ] == wanted
+        return numpy.where( found, pos - offsets[:-1], -1 ).tolist()
+
+    '''
+    Search a single sorted row; used when row keys would overflow.
+    '''
+    @staticmethod
+    def _search_slice( row, target ):
+        pos = int( numpy.searchsorted( row, target, side="left" ) )
+        if( pos < len( row ) and row[pos] == target ):
+            return pos
+        return -1
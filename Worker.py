@@ -11,23 +11,64 @@ The class maintains several timers and pass/fail statistics which
 help for comparing algorithmic performance.
 '''
 
-import time
 import sys
+import time
+import tracemalloc
+import GraphData
+from Loader import Loader
+from Stream import StreamStats
+from Trace import Trace
 
-DEBUG_TOGGLE = True
+# Initial trace level. Use Trace.set_level() to change it at runtime;
+#  timings are only meaningful with tracing off
+DEBUG_TOGGLE = False
+Trace.set_level( Trace.DEBUG if DEBUG_TOGGLE else Trace.OFF )
 
 class Worker:
     
+    NANO = 1000000000
     MICRO = 1000000
     MILLI = 1000
     LINEAR = 1
     GRAPH_MATRIX = 2
+    LINEAR_BINARY = 3
     
+    '''
+    Emit trace output at "level": INFO for decisions made once per call,
+    DEBUG for steps inside loops and VERBOSE for dumps of whole arrays.
+    Hot loops should call this through a class decorated with
+    Trace.traceable so that builds below the level drop the call (and
+    the formatting of its arguments) entirely. The level must then be
+    written as Trace.<NAME> or an int so it can be read from the source.
+    '''
     @staticmethod
-    def eprint( *args, **kwargs):
-        if DEBUG_TOGGLE:
-            print( *args, file=sys.stderr, **kwargs )
+    def eprint( *args, level=Trace.DEBUG, **kwargs):
+        Trace.emit( level, *args, **kwargs )
     
+    '''
+    Decorator which marks a static method as a work method. Work methods
+    are the algorithms a Worker subclass offers; get_work_methods() finds
+    them so that suites can cover every algorithm automatically. Apply it
+    beneath @staticmethod.
+    '''
+    @staticmethod
+    def register( func ):
+        func.is_work_method = True
+        return func
+
+    '''
+    Return every registered work method defined directly on this class,
+    in definition order.
+    '''
+    @classmethod
+    def get_work_methods(cls):
+        methods = list()
+        for name in vars(cls):
+            attr = getattr( cls, name )
+            if( getattr( attr, "is_work_method", False ) ):
+                methods.append( attr )
+        return methods
+
     '''
     Base constructor which initializes relevant variables. The
     ifile_type is relevant as it determines how to parse the file.
@@ -35,7 +76,9 @@ class Worker:
     matrix (2d) arrays or even linked data structures. The work_method
     is the actual algorithm that gets run during each iteration or
     a test suite. This can be a search, sort, etc. The history data
-    is statistics on passes, fails, elapsed times, etc.
+    is statistics on passes, fails, elapsed times, etc. A path of None
+    skips parsing, which is useful when jobs are only ever streamed
+    through run_stream().
     '''
     def __init__(self, path, work_method, ifile_type):
          
@@ -44,9 +87,13 @@ class Worker:
             parse_path = self._parse_linear
         elif( ifile_type == Worker.GRAPH_MATRIX ):
             parse_path = self._parse_graph_matrix
+        elif( ifile_type == Worker.LINEAR_BINARY ):
+            parse_path = self._parse_linear_binary
             
-        self.work_list = parse_path( path )
+        self.ifile_type = ifile_type
+        self.work_list = parse_path( path ) if path is not None else list()
         self.set_work_method( work_method )
+        self.result_cache = None
         
         # Quick way to initialize variables
         self.clear_all_history()
@@ -61,6 +108,11 @@ class Worker:
         self.suite_end_time = 0
         self.test_start_times = list()
         self.test_end_times = list()
+        self.test_stats = list()
+        self.test_memory = list()
+        self.test_reports = list()
+        self.test_cached = list()
+        self.stream_stats = None
     
     '''
     Clear the time history plus the results. This method does not
@@ -80,6 +132,15 @@ class Worker:
     def set_work_method(self, work_method):
         self.work_method = work_method
         
+    '''
+    Attach a ResultCache (or None to detach). run_suite() then returns
+    cached results for jobs it has already run with the same algorithm
+    and arguments instead of running them again. Benchmarked suites
+    always run every test.
+    '''
+    def set_result_cache(self, result_cache):
+        self.result_cache = result_cache
+
     '''
     If only the results are required, use this method. "results"
     this context refers to whatever was returned by the work_method.
@@ -94,18 +155,37 @@ class Worker:
     Algorithm: (work_method name)
     Test R: P in T us (C = test run number, P = passes, T = elapsed time in us)
     Total of P/C tests passed in T us (C = total test cases, P = passes, T = elapsed time in us)
+    When the suite was run with a Benchmark, T is the median and each
+    test line is followed by its full statistics. Tests answered by the
+    result cache are marked, since T then times the lookup rather than
+    the algorithm. Work methods which are objects with a report() method
+    add its report for every test.
     '''        
     def __str__(self):
         string = "Algorithm: {0}\n".format(self.work_method.__name__)
         count = 1
         times = self.get_test_elapsed_times()
         for i in range( len( times ) ):
-            passed = self.result_list[i] != -1
-            string += "Test {0}: {1} in {2} us\n".format(count, passed, times[i] * Worker.MICRO)
+            passed = self._passed( self.result_list[i] )
+            cached = " (cached result)" if len( self.test_cached ) > i and self.test_cached[i] else ""
+            string += "Test {0}: {1} in {2} us{3}\n".format(count, passed, times[i] * Worker.MICRO, cached)
+            if( len( self.test_stats ) > i ):
+                string += "  {0}\n".format( self.test_stats[i] )
+            if( len( self.test_memory ) > i ):
+                peak, blocks = self.test_memory[i]
+                string += "  peak {0:.1f} KiB, {1} blocks retained\n".format( peak / 1024, blocks )
+            if( len( self.test_reports ) > i ):
+                string += "  {0}\n".format( self.test_reports[i].replace( "\n", "\n  " ) )
             count += 1
             if passed:
                 self.pass_count += 1
         
+        if( self.stream_stats is not None ):
+            string += "{0}\n".format( self.stream_stats )
+        
+        if( self.result_cache is not None ):
+            string += "{0}\n".format( self.result_cache )
+        
         suite_time = self.get_suite_elapsed_time() * Worker.MICRO
         string += "Total of {0}/{1} tests passed in {2} us".format( self.pass_count, self.test_count, suite_time )
         return string
@@ -119,8 +199,13 @@ class Worker:
     '''
     Return a list of all elapsed times per test. The list returned has the same length
     as the start/end time lists; it represents the difference of the two.
+    If the suite was run with a Benchmark, the median of each test is
+    returned instead (in seconds, like the single-sample times).
     '''        
     def get_test_elapsed_times(self):
+        if( len( self.test_stats ) > 0 ):
+            return [stats.median / Worker.NANO for stats in self.test_stats]
+
         # Assert lengths are the same
         test_elapsed_times = list()
         for t in range( len( self.test_start_times ) ):
@@ -133,6 +218,28 @@ class Worker:
     
         return test_elapsed_times
     
+    '''
+    Return the list of Benchmark Stats objects, one per test. This list
+    is empty unless run_suite() was given a Benchmark.
+    '''
+    def get_test_stats(self):
+        return self.test_stats
+
+    '''
+    Return a list of (peak bytes, retained blocks) tuples, one per test.
+    This list is empty unless run_suite() was called with memory=True.
+    '''
+    def get_test_memory(self):
+        return self.test_memory
+
+    '''
+    Return a list of booleans, one per test, which are True for tests
+    answered by the result cache instead of the work method. Their
+    elapsed times are those of the cache lookup.
+    '''
+    def get_test_cached(self):
+        return self.test_cached
+
     '''
     Returns the total number of tests run.
     '''    
@@ -154,26 +261,193 @@ class Worker:
     '''
     Runs the entire test suite. Each test contained within the work_list
     is executed with its results stored in a list. This method is also
-    the timer for both test suite and individual test run times.
+    the timer for both test suite and individual test run times. Without
+    a benchmark, each test is timed once with perf_counter(). With a
+    Benchmark object, each test is warmed up and repeated until its
+    confidence interval is met, and the Stats are kept per test.
+    With memory=True, each test is also run once more outside of the
+    timers under tracemalloc to record its memory profile.
     '''
-    def run_suite(self):
+    def run_suite(self, benchmark=None, memory=False):
         self.test_count = 0
-        self.suite_start_time = time.time()
+        self.suite_start_time = time.perf_counter()
         for array in self.work_list:
             
+            if( memory ):
+                self.test_memory.append( self._profile_memory( self._copy_job( array ) ) )
+
+            if( benchmark is not None ):
+                # The benchmark copies the array before every run, outside the timer
+                result, stats = benchmark.measure( self._run_test, lambda: self._copy_job( array ) )
+                self.result_list.append( result )
+                self.test_stats.append( stats )
+                self._store_report()
+                self.test_count += 1
+                continue
+
             # Copy the array so that the algorithms don't have to
             #  This is performed before the timer starts
-            copy = list( array )
+            copy = self._copy_job( array )
+            key = self._result_key( copy )
             
-            # Start timer and test
-            self.test_start_times.append( time.time() )
-            self.result_list.append( self._run_test( copy ) )
+            # Start timer and test; a cache hit replaces the test
+            self.test_start_times.append( time.perf_counter() )
+            hit, result = self.result_cache.get( key ) if key is not None else ( False, None )
+            if( not hit ):
+                result = self._run_test( copy )
             
             # Stop timer and increment test count
-            self.test_end_times.append( time.time() )
+            self.test_end_times.append( time.perf_counter() )
+            self.result_list.append( result )
+            self.test_cached.append( hit )
+            if( key is not None and not hit ):
+                self.result_cache.put( key, result )
+            self._store_report()
             self.test_count += 1
             
-        self.suite_end_time = time.time()
+        self.suite_end_time = time.perf_counter()
+        
+    '''
+    Stream every job in the file at "path" through the work method
+    without materializing the work list or the results. Jobs are parsed
+    lazily, each result is handed to "sink" (see Stream.py) as soon as
+    it exists, and only incremental statistics are kept, so memory stays
+    flat regardless of input size. Returns the StreamStats, which are
+    also shown by __str__.
+    '''
+    def run_stream(self, path, sink=None):
+        stats = StreamStats()
+        self.stream_stats = stats
+        self.test_count = 0
+        self.pass_count = 0
+        self.suite_start_time = time.perf_counter()
+        
+        for index, array in enumerate( self._iter_jobs( path ) ):
+            copy = self._copy_job( array )
+            start = time.perf_counter_ns()
+            result = self._run_test( copy )
+            elapsed = time.perf_counter_ns() - start
+            
+            stats.add( self._passed( result ), elapsed )
+            if( sink is not None ):
+                sink.write( index, result )
+            self.test_count += 1
+        
+        self.suite_end_time = time.perf_counter()
+        self.pass_count = stats.passes
+        if( sink is not None ):
+            sink.close()
+        return stats
+    
+    '''
+    A test passes unless its result is -1. Results may be any object,
+    including arrays whose comparison with -1 would be element-wise.
+    Workers whose results can legitimately be -1 override this.
+    '''
+    def _passed(self, result):
+        return not ( isinstance( result, int ) and result == -1 )
+
+    '''
+    Return the private copy of a job that one test runs on, so that work
+    methods may modify their input. Always called outside the timers.
+    Subclasses whose work methods take other structures than lists
+    override this to build them.
+    '''
+    def _copy_job(self, array):
+        return list( array )
+
+    '''
+    Lazily yield the jobs in "path" according to this worker's ifile_type.
+    '''
+    def _iter_jobs(self, path):
+        if( self.ifile_type == Worker.LINEAR ):
+            return Loader.iter_text( path )
+        elif( self.ifile_type == Worker.LINEAR_BINARY ):
+            return Loader.iter_binary( path )
+        elif( self.ifile_type == Worker.GRAPH_MATRIX ):
+            return ( GraphData.from_matrix( n, matrix ) for n, matrix in Loader.iter_matrices( path ) )
+        raise NotImplementedError( "streaming is not supported for this file type" )
+    
+    '''
+    Store "value" as the entry of the test currently running in a per-test
+    list kept by a subclass (stage times, caches, etc). When a Benchmark
+    repeats a test, the entry is overwritten so only the last run is kept.
+    '''
+    def _store_for_test(self, values, value):
+        if( len( values ) > self.test_count ):
+            values[self.test_count] = value
+        else:
+            values.append( value )
+
+    '''
+    Keep the work method's report() for the current test, if it has one.
+    Such work methods describe their latest call, so with a Benchmark
+    this is the report of the last timed run.
+    '''
+    def _store_report(self):
+        if( hasattr( self.work_method, "report" ) ):
+            self._store_for_test( self.test_reports, self.work_method.report() )
+
+    '''
+    Return the result cache key for running the work method on "array",
+    or None when no cache is attached or the worker opts out. Work
+    methods with a report() are never cached, since a hit would leave
+    nothing to report.
+    '''
+    def _result_key(self, array):
+        extra = self._result_key_extra()
+        if( self.result_cache is None or extra is None or hasattr( self.work_method, "report" ) ):
+            return None
+        return self.result_cache.key( self.work_method, array, extra )
+
+    '''
+    Arguments other than the job which the result depends on, as a tuple
+    added to the result cache key. Workers whose tests have side effects
+    beyond their result (stage timers, cached jobs) return None so that
+    their tests are never skipped.
+    '''
+    def _result_key_extra(self):
+        return ()
+
+    '''
+    Record the results of a batch which processed every job in one call
+    between "start" and "end" (perf_counter() values). There are no
+    per-test timings in a batch, so each test is charged an equal share
+    of the batch time.
+    '''
+    def _record_batch(self, results, start, end):
+        self.test_count = 0
+        self.suite_start_time = start
+        self.suite_end_time = end
+        share = ( end - start ) / max( 1, len( results ) )
+        for i in range( len( results ) ):
+            self.result_list.append( results[i] )
+            self.test_start_times.append( start + i * share )
+            self.test_end_times.append( start + ( i + 1 ) * share )
+            self.test_count += 1
+
+    '''
+    Run one test under tracemalloc and return (peak bytes, blocks), where
+    peak is the highest traced memory above the starting point and blocks
+    is the net change in allocated memory blocks (what the test kept).
+    CPython has no counter of total allocations, so transient churn shows
+    up in the peak rather than in the block count.
+    '''
+    def _profile_memory(self, copy):
+        was_tracing = tracemalloc.is_tracing()
+        if( not was_tracing ):
+            tracemalloc.start()
+        
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        blocks = sys.getallocatedblocks()
+        self._run_test( copy )
+        peak = tracemalloc.get_traced_memory()[1] - base
+        blocks = sys.getallocatedblocks() - blocks
+        
+        if( not was_tracing ):
+            tracemalloc.stop()
+        return ( peak, blocks )
         
     '''
     Private method which is not implemented deliberately, rather than
@@ -186,26 +460,27 @@ class Worker:
     '''
     Reads lines from a file and breaks individual elements apart
     into arrays for every row. The input should be values separated
-    by single spaces, such as "1 5 7 0 -5 567".
+    by single spaces, such as "1 5 7 0 -5 567". The file is memory-mapped
+    and parsed in large chunks by the Loader.
     '''        
     def _parse_linear(self, path):
-        with open( path ) as handle:
-            line = "start"
-            
-            work_list = list()
-            while line is not "":
-                line = handle.readline().strip()
-                if line is not "":
-                    work_list.append( [int(s) for s in line.split()] )       
-        
-        return work_list
+        return Loader.parse_text( path )
+    
+    '''
+    Maps a binary job file written by Loader.write_binary() or
+    Loader.convert(). Every job is a zero-copy memoryview of the file;
+    run_suite() copies each one into a list before running a test.
+    '''
+    def _parse_linear_binary(self, path):
+        return Loader.load_binary( path )
     
     '''
     Reads lines from a file and breaks individual elements apart
     into matrixes for every chunk of input. Matrices are separated
-    by the sentinel "ZZZ" in the input files.
+    by the sentinel "ZZZ" in the input files. Each matrix becomes a
+    DenseGraph or SparseGraph (see GraphData.py) depending on how many
+    of its entries are edges.
     '''    
     def _parse_graph_matrix(self, path):
-        # TODO
-        raise NotImplementedError()
+        return [GraphData.from_matrix( n, matrix ) for n, matrix in Loader.iter_matrices( path )]
  
\ No newline at end of file
@@ -10,14 +10,16 @@ this project.
 
 import os
 import sys
+from Parallel import Parallel
+from ResultCache import ResultCache
 from Search import Search
 from Sort import Sort
 
 def main( argv ):
     
-    # Test for 2 CLI arguments (script name and input file)
+    # Test for 2 or 3 CLI arguments (script name, input file, optional worker count)
     # Test for existence of the input file
-    if( len( argv ) != 2 or not os.path.isfile( argv[1] ) ):
+    if( len( argv ) not in ( 2, 3 ) or not os.path.isfile( argv[1] ) ):
         raise ValueError( "Invalid arguments: length or input file" )
     
     # Define the sort algorithms to test
@@ -30,12 +32,25 @@ def main( argv ):
         Sort.bubble_sort,
         ]
     
+    # With a worker count, fan the algorithm x job matrix out over processes
+    if( len( argv ) == 3 ):
+        parallel = Parallel( Sort, argv[1], sort_alg_list, max_workers=int( argv[2] ) )
+        for sort in parallel.run():
+            print(sort)
+            print()
+        return
+    
+    # Results are remembered across runs when RESULT_CACHE_DIR is set
+    cache_dir = os.environ.get( "RESULT_CACHE_DIR" )
+    cache = ResultCache( directory=cache_dir ) if cache_dir else None
+    
     # Iterate over all algorithms specified above    
     for sort_alg in sort_alg_list:
         
         # Create a new instance of a sort object with the input file
         #  and the specific sorting algorithm
         sort = Sort(argv[1], sort_alg)
+        sort.set_result_cache( cache )
         
         # Run all tests
         sort.run_suite()
@@ -45,4 +60,5 @@ def main( argv ):
         print()
 
 # Executation starts here
-main( sys.argv )
\ No newline at end of file
+if __name__ == "__main__":
+    main( sys.argv )
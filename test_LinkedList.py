@@ -0,0 +1,36 @@
+#!/usr/bin/python
+
+'''
+File: test_LinkedList.py
+Author: Nicholas Russo
+Description: Checks that a LinkedList longer than the recursion limit
+survives pickling, which is how Parallel returns LinkedListSort results
+from its child processes, and deep copying, which the result cache does.
+'''
+
+import copy
+import pickle
+import sys
+import unittest
+
+from LinkedList import LinkedList
+
+class TestLongLinkedList(unittest.TestCase):
+
+    def setUp(self):
+        self.data = list( range( sys.getrecursionlimit() * 3, 0, -1 ) )
+        self.linked = LinkedList( *self.data ).sort()
+
+    def _check(self, linked):
+        self.assertEqual( linked.make_list(), sorted( self.data ) )
+        self.assertEqual( len( linked ), len( self.data ) )
+        self.assertEqual( linked.get_tail().get_data(), max( self.data ) )
+
+    def test_pickle_round_trip(self):
+        self._check( pickle.loads( pickle.dumps( self.linked ) ) )
+
+    def test_deepcopy(self):
+        self._check( copy.deepcopy( self.linked ) )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/python
+
+'''
+File: test_Sort.py
+Author: Nicholas Russo
+Description: Checks for the Sort work methods which the parallel sorts
+run in place on memoryviews of their shared int64 buffers.
+'''
+
+import array as arrays
+import random
+import unittest
+
+from Heap import DaryHeap
+from Sort import Sort
+
+class TestSharedLeaves(unittest.TestCase):
+
+    # Work methods _sort_shared_segment() is handed by the parallel sorts
+    LEAVES = ( "buffered_merge_sort", "intro_sort" )
+
+    '''
+    Return a typed int64 memoryview over a copy of "values", the same
+    kind of view Sort._view() gives the pool processes.
+    '''
+    @staticmethod
+    def _view( values ):
+        return memoryview( arrays.array( "q", values ) )
+
+    def setUp(self):
+        rng = random.Random( 5 )
+        self.inputs = [
+            list(),
+            [7],
+            [rng.randrange( -1000, 1000 ) for i in range( 2000 )],
+            [rng.randrange( 4 ) for i in range( 500 )],
+            list( range( 300, 0, -1 ) ),
+            ]
+
+    def test_leaves_sort_memoryviews(self):
+        for leaf in self.LEAVES:
+            for values in self.inputs:
+                view = self._view( values )
+                getattr( Sort, leaf )( view )
+                self.assertEqual( view.tolist(), sorted( values ), leaf )
+
+    def test_intro_sort_heap_fallback_on_memoryview(self):
+        # Always pick the smallest value as the pivot, so the depth limit
+        #  is hit and the rest is heap sorted
+        choose_pivot = Sort._choose_pivot
+        Sort._choose_pivot = staticmethod( lambda array, start, end: min( array[start:end + 1] ) )
+        try:
+            for values in self.inputs:
+                view = self._view( values )
+                Sort.intro_sort( view )
+                self.assertEqual( view.tolist(), sorted( values ) )
+        finally:
+            Sort._choose_pivot = choose_pivot
+
+    def test_heap_sort_range_on_memoryview(self):
+        values = self.inputs[2]
+        for arity in ( 2, 3, 4, 8 ):
+            view = self._view( values )
+            DaryHeap.sort_range( view, 100, 1500, arity )
+            self.assertEqual( view.tolist(),
+                values[:100] + sorted( values[100:1500] ) + values[1500:] )
+
+if __name__ == "__main__":
+    unittest.main()